@@ -13,4 +13,6 @@ celery_app = Celery(
     broker=broker_url,
     backend=backend_url,
 )
-celery_app.autodiscover_tasks(["app.tasks"])
\ No newline at end of file
+celery_app.autodiscover_tasks(["app.tasks"])
+# prefork 워커 프로세스 수 (0이면 Celery 기본값인 CPU 코어 수); 태스크별 병렬 예산도 이 값으로 나눈다
+celery_app.conf.worker_concurrency = int(os.getenv("CELERY_WORKER_CONCURRENCY", "0")) or None
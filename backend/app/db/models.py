@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, UniqueConstraint, func
+from sqlalchemy import JSON, BigInteger, Column, Integer, String, DateTime, Float, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -47,3 +47,32 @@ class OHLCVRange(Base):
     @property
     def as_tuple(self) -> tuple[datetime, datetime]:
         return self.start_timestamp, self.end_timestamp
+
+
+class MarketSnapshot(Base):
+    # 봉 마감 직후 미리 계산한 차트 지표/로컬 점수/모델 예측 (symbol은 "KRW-BTC" 형식)
+    __tablename__ = "market_snapshot"
+    timeframe = Column(String(20), primary_key=True)
+    symbol = Column(String(50), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    chart_features = Column(JSON, nullable=False)
+    scores = Column(JSON, nullable=False)
+    # "모델+파라미터" -> {"prediction", "prediction_percentile", "recommendation"}
+    predictions = Column(JSON, nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
+
+
+class ModelOutput(Base):
+    # /decide 입력 창(inference_time 직전 inference_window개 봉)에 대한 모델 출력
+    __tablename__ = "model_output"
+    model_name = Column(String(50), primary_key=True)
+    param_name = Column(String(100), primary_key=True)
+    timeframe = Column(String(20), primary_key=True)
+    symbol = Column(String(50), primary_key=True)
+    inference_time = Column(DateTime, primary_key=True)
+    # 파라미터 파일 mtime; 모델이 교체되면 다른 값이 되어 기존 행은 무시된다
+    artifact_mtime_ns = Column(BigInteger, nullable=False)
+    output = Column(Float, nullable=True)
+    # 창의 마지막 종가 (매수 수량 계산용)
+    price = Column(Float, nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
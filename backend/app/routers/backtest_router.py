@@ -2,18 +2,38 @@ from fastapi import APIRouter, HTTPException
 
 from app.celery_app import celery_app
 from app.schemas.backtest_schema import BacktestRequest, BacktestResponse, BacktestTaskResponse, BacktestResult
+from app.schemas.backtest_schema import BacktestSweepRequest, BacktestSweepRow, BacktestSweepTaskResponse
 from app.tasks.backtest_task import backtest_task
+from app.tasks.backtest_sweep_task import backtest_sweep_task, expand_param_grid
+from app.utils.model_load_utils import get_strategy_class
 
 router = APIRouter()
 
 @router.post("/", response_model=BacktestResponse)
 async def backtest(req: BacktestRequest) -> BacktestResponse:
     backtest_start, backtest_end = req.start.isoformat(), req.end.isoformat()
-    task = backtest_task.delay(req.model_name, req.param_name, req.coin_symbol, req.timeframe, backtest_start, backtest_end)
+    task = backtest_task.delay(req.model_name, req.param_name, req.coin_symbol, req.timeframe, backtest_start, backtest_end, req.engine)
     return BacktestResponse(task_id=task.id)
 
 @router.get("/{task_id}", response_model=BacktestTaskResponse)
 async def get_backtest_task_status(task_id: str) -> BacktestTaskResponse:
     task = backtest_task.AsyncResult(task_id, app=celery_app)
     results = BacktestResult(**task.result) if task.successful() else None
-    return BacktestTaskResponse(task_id=task.id, status=task.status, results=results)
\ No newline at end of file
+    return BacktestTaskResponse(task_id=task.id, status=task.status, results=results)
+
+@router.post("/sweep/", response_model=BacktestResponse)
+async def backtest_sweep(req: BacktestSweepRequest) -> BacktestResponse:
+    # 잘못된 그리드는 task를 띄우기 전에 거절한다
+    try:
+        expand_param_grid(get_strategy_class(req.model_name).hyperparam_schema, req.param_grid)
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    sweep_start, sweep_end = req.start.isoformat(), req.end.isoformat()
+    task = backtest_sweep_task.delay(req.model_name, req.param_name, req.coin_symbol, req.timeframe, sweep_start, sweep_end, req.param_grid, req.rank_by)
+    return BacktestResponse(task_id=task.id)
+
+@router.get("/sweep/{task_id}", response_model=BacktestSweepTaskResponse)
+async def get_backtest_sweep_status(task_id: str) -> BacktestSweepTaskResponse:
+    task = backtest_sweep_task.AsyncResult(task_id, app=celery_app)
+    results = [BacktestSweepRow(**row) for row in task.result] if task.successful() else None
+    return BacktestSweepTaskResponse(task_id=task.id, status=task.status, results=results)
\ No newline at end of file
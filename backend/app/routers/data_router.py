@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 
-from app.schemas.data_schema import CoinInfoRequest, CoinInfoResponse, CoinListResponse
+from app.db import models
+from app.db.database import get_db
+from app.schemas.data_schema import (
+    CoinInfoRequest, CoinInfoResponse, CoinListResponse,
+    MarketSnapshotListRequest, MarketSnapshotListResponse, MarketSnapshotRequest, MarketSnapshotResponse,
+)
+from app.services.market_snapshot_service import get_market_snapshot, list_market_snapshots
 from app.utils.data_utils import get_all_data_info
 
 router = APIRouter()
@@ -22,3 +29,25 @@ def get_coin_info(req: CoinInfoRequest) -> CoinInfoResponse:
                 available_end=end_time.to_pydatetime()
             )
     raise HTTPException(status_code=404, detail="Coin symbol not found.")
+
+def _snapshot_response(req, snapshot: models.MarketSnapshot) -> MarketSnapshotResponse:
+    return MarketSnapshotResponse(
+        coin_symbol=req.coin_symbol.upper(),
+        timeframe=req.timeframe,
+        timestamp=snapshot.timestamp,
+        chart_features=snapshot.chart_features,
+        scores=snapshot.scores,
+        predictions=snapshot.predictions,
+    )
+
+@router.post("/snapshot", response_model=MarketSnapshotResponse)
+def read_market_snapshot(req: MarketSnapshotRequest, db: Session = Depends(get_db)) -> MarketSnapshotResponse:
+    snapshot = get_market_snapshot(db, req.coin_symbol, req.timeframe, req.timestamp)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Market snapshot not found.")
+    return _snapshot_response(req, snapshot)
+
+@router.post("/snapshots", response_model=MarketSnapshotListResponse)
+def read_market_snapshots(req: MarketSnapshotListRequest, db: Session = Depends(get_db)) -> MarketSnapshotListResponse:
+    snapshots = list_market_snapshots(db, req.coin_symbol, req.timeframe, req.start, req.end, req.limit)
+    return MarketSnapshotListResponse(snapshots=[_snapshot_response(req, snapshot) for snapshot in snapshots])
@@ -1,26 +1,36 @@
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 
+from app.db.database import get_db
 from app.schemas.decide_schema import DecisionRequest, DecisionResponse
-from app.utils.model_load_utils import get_strategy_class, get_param_path
+from app.services.model_output_service import get_model_output, load_strategy, supports_stored_outputs
 from app.utils.data_utils import get_ohlcv_df
 
 router = APIRouter()
 
 @router.post("/", response_model=DecisionResponse)
-async def decide(req: DecisionRequest) -> DecisionResponse:
+async def decide(req: DecisionRequest, db: Session = Depends(get_db)) -> DecisionResponse:
     coin_balance, cash_balance = req.coin_balance, req.cash_balance
+    strategy_instance, artifact_mtime_ns = load_strategy(req.model_name, req.param_name)
+
+    # 미리 계산된 모델 출력이 있으면 임계값과 잔고만 적용
+    if supports_stored_outputs(req.model_name):
+        stored = get_model_output(
+            db, req.model_name, req.param_name, req.coin_symbol, req.timeframe,
+            req.inference_time, artifact_mtime_ns
+        )
+        if stored is not None and stored.output is not None:
+            action, amount = strategy_instance.action_from_output(
+                stored.output, stored.price, cash_balance=cash_balance, coin_balance=coin_balance
+            )
+            return DecisionResponse(action=action, amount=amount)
 
     total_df = get_ohlcv_df(
         coin_symbol=req.coin_symbol,
         timeframe=req.timeframe
     )
-    strategy_class = get_strategy_class(req.model_name)
-    inference_window = strategy_class.inference_window
-    strategy_instance = strategy_class()
-
-    params_path = get_param_path(req.model_name, req.param_name)
-    strategy_instance.load(params_path)
+    inference_window = strategy_instance.inference_window
     inference_timestamp = pd.Timestamp(req.inference_time).tz_localize(None)
     inference_iloc = total_df.index.get_loc(inference_timestamp)
     inference_df = total_df.iloc[inference_iloc - inference_window:inference_iloc]
@@ -30,4 +40,4 @@ async def decide(req: DecisionRequest) -> DecisionResponse:
         cash_balance=cash_balance,
         coin_balance=coin_balance
     )
-    return DecisionResponse(action=action, amount=amount)
\ No newline at end of file
+    return DecisionResponse(action=action, amount=amount)
@@ -1,22 +1,32 @@
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from redis import RedisError
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
 
 from app.celery_app import celery_app
 from app.schemas.explain_schema import ExplainChartRequest, ExplainChartResponse, ExplainChartTaskResponse, SimilarChartResult, ExplainChartResult
 from app.schemas.explain_schema import ExplainModelRequest, ExplainModelResponse, ExplainModelTaskResponse, ReferenceChartResult, ExplainModelResult
+from app.schemas.explain_schema import ExplainModelPartialResult
+from app.schemas.explain_schema import ExplainRangeRequest, ExplainRangeTaskResponse, ExplainRangeResult
+from app.schemas.explain_schema import LLMCacheStats
+from app.services.llm_cache_service import get_llm_cache
+from app.services.task_dedup_service import submit_deduplicated
+from app.services.llm_stream_service import relay_llm_stream
 from app.tasks.explain_chart_task import explain_chart_task
-from app.tasks.explain_model_task import explain_model_task
+from app.tasks.explain_model_task import explain_model_task, get_partial_results
+from app.tasks.explain_range_task import explain_range_task
 
 router = APIRouter()
 
 @router.post("/model/", response_model=ExplainModelResponse)
 async def explain(req: ExplainModelRequest) -> ExplainModelResponse:
-    task = explain_model_task.delay(
+    task_id = submit_deduplicated(
+        explain_model_task,
         coin_symbol=req.coin_symbol,
         timeframe=req.timeframe,
         inference_time=req.inference_time
     )
-    return ExplainModelResponse(task_id=task.id)
+    return ExplainModelResponse(task_id=task_id)
 
 @router.get("/model/{task_id}", response_model=ExplainModelTaskResponse)
 async def get_explanation(task_id: str) -> ExplainModelTaskResponse:
@@ -25,22 +35,63 @@ async def get_explanation(task_id: str) -> ExplainModelTaskResponse:
         reference_charts = [ReferenceChartResult(**chart) for chart in explanation.result["reference_charts"]]
         explanation.result["reference_charts"] = reference_charts
         results = ExplainModelResult(**explanation.result)
+        return ExplainModelTaskResponse(task_id=explanation.id, status=explanation.status, results=results)
+    partial_results = None
+    if explanation.status not in ("FAILURE", "REVOKED"):
+        try:
+            partial = get_partial_results(task_id)
+        except RedisError:
+            partial = {}
+        if partial:
+            partial_results = ExplainModelPartialResult(**partial.get("shap", {}), reference_charts=partial.get("reference_charts"))
     return ExplainModelTaskResponse(
         task_id=explanation.id,
         status=explanation.status,
-        results=results if explanation.successful() else None
+        partial_results=partial_results
+    )
+
+@router.get("/model/{task_id}/stream")
+async def stream_explanation(task_id: str, last_event_id: str | None = Header(default=None)) -> StreamingResponse:
+    # LLM 설명 텍스트를 생성되는 대로 SSE로 전달
+    return StreamingResponse(
+        relay_llm_stream(explain_model_task.AsyncResult(task_id, app=celery_app), last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/model/range/", response_model=ExplainModelResponse)
+async def explain_range(req: ExplainRangeRequest) -> ExplainModelResponse:
+    task = explain_range_task.delay(
+        coin_symbol=req.coin_symbol,
+        timeframe=req.timeframe,
+        start=req.start.isoformat(),
+        end=req.end.isoformat(),
+        top_k=req.top_k
+    )
+    return ExplainModelResponse(task_id=task.id)
+
+@router.get("/model/range/{task_id}", response_model=ExplainRangeTaskResponse)
+async def get_range_explanation(task_id: str) -> ExplainRangeTaskResponse:
+    explanation = explain_range_task.AsyncResult(task_id, app=celery_app)
+    return ExplainRangeTaskResponse(
+        task_id=explanation.id,
+        status=explanation.status,
+        results=ExplainRangeResult(**explanation.result) if explanation.successful() else None
     )
 
 @router.post("/chart/", response_model=ExplainChartResponse)
 async def explain_chart(req: ExplainChartRequest) -> ExplainChartResponse:
-    task = explain_chart_task.delay(
+    task_id = submit_deduplicated(
+        explain_chart_task,
         coin_symbol=req.coin_symbol,
         timeframe=req.timeframe,
         inference_time=req.inference_time,
         start=req.start,
-        end=req.end
+        end=req.end,
+        cross_symbol=req.cross_symbol,
+        similar_symbols=req.similar_symbols
     )
-    return ExplainChartResponse(task_id=task.id)
+    return ExplainChartResponse(task_id=task_id)
 
 
 @router.get("/chart/{task_id}", response_model=ExplainChartTaskResponse)
@@ -54,4 +105,16 @@ async def get_chart_explanation(task_id: str) -> ExplainChartTaskResponse:
         task_id=explanation.id,
         status=explanation.status,
         results=results if explanation.successful() else None
-    )
\ No newline at end of file
+    )
+
+@router.get("/chart/{task_id}/stream")
+async def stream_chart_explanation(task_id: str, last_event_id: str | None = Header(default=None)) -> StreamingResponse:
+    return StreamingResponse(
+        relay_llm_stream(explain_chart_task.AsyncResult(task_id, app=celery_app), last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/llm-cache/stats", response_model=LLMCacheStats)
+def get_llm_cache_stats() -> LLMCacheStats:
+    return LLMCacheStats(**get_llm_cache().stats())
@@ -7,16 +7,36 @@ from app.schemas.score_chart_schema import (
     ScoreChartResponse,
     ScoreWithExplanation,
     ScoreChartTaskResponse,
+    ScoreChartLocalRequest,
+    ScoreChartLocalResponse,
 )
-from app.tasks.score_chart_task import score_chart_task
+from app.services.chart_score_service import score_chart_features
+from app.services.task_dedup_service import submit_deduplicated
+from app.tasks.score_chart_task import score_chart_task, load_chart_features
 from app.utils.data_utils import get_ohlcv_df
 
 router = APIRouter()
 
 @router.post("/", response_model=ScoreChartResponse)
 async def score_chart(req: ScoreChartRequest) -> ScoreChartResponse:
-    task = score_chart_task.delay(req.coin_symbol, req.timeframe, req.inference_time.isoformat(), req.history_window)
-    return ScoreChartResponse(task_id=task.id)
+    task_id = submit_deduplicated(
+        score_chart_task,
+        coin_symbol=req.coin_symbol,
+        timeframe=req.timeframe,
+        inference_time=req.inference_time.isoformat(),
+        history_window=req.history_window,
+        explain=req.explain
+    )
+    return ScoreChartResponse(task_id=task_id)
+
+@router.post("/local/", response_model=ScoreChartLocalResponse)
+def score_chart_local(req: ScoreChartLocalRequest) -> ScoreChartLocalResponse:
+    # LLM 없이 결정적 수식으로 즉시 계산 (Celery 미경유)
+    try:
+        chart_features = load_chart_features(req.coin_symbol, req.timeframe, req.inference_time.isoformat(), req.history_window)
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return ScoreChartLocalResponse(scores=score_chart_features(chart_features))
 
 @router.get("/{task_id}", response_model=ScoreChartTaskResponse)
 async def get_score_chart(task_id: str) -> ScoreChartTaskResponse:
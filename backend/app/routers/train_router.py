@@ -2,7 +2,13 @@ from fastapi import APIRouter, HTTPException
 
 from app.celery_app import celery_app
 from app.schemas.train_schema import TrainRequest, TrainResponse, TrainTaskResponse
+from app.schemas.train_schema import WalkForwardRequest, WalkForwardResult, WalkForwardTaskResponse
+from app.schemas.train_schema import HyperparamSearchRequest, HyperparamSearchResult, HyperparamSearchTaskResponse
+from app.schemas.train_schema import RefreshRequest, RefreshTaskResponse
 from app.tasks.train_task import train_task
+from app.tasks.walk_forward_task import walk_forward_task
+from app.tasks.hyperparam_search_task import hyperparam_search_task
+from app.tasks.model_refresh_task import refresh_model_task
 
 router = APIRouter()
 
@@ -15,4 +21,40 @@ async def train(req: TrainRequest) -> TrainResponse:
 @router.get("/{task_id}", response_model=TrainTaskResponse)
 async def get_train_task_status(task_id: str) -> TrainTaskResponse:
     task = train_task.AsyncResult(task_id, app=celery_app)
-    return TrainTaskResponse(task_id=task.id, status=task.status)
\ No newline at end of file
+    return TrainTaskResponse(task_id=task.id, status=task.status)
+
+@router.post("/walk-forward/", response_model=TrainResponse)
+async def walk_forward(req: WalkForwardRequest) -> TrainResponse:
+    wf_start, wf_end = req.start.isoformat(), req.end.isoformat()
+    task = walk_forward_task.delay(req.model_name, req.coin_symbol, req.timeframe, wf_start, wf_end, req.train_days, req.test_days, req.step_days, req.hyperparams, req.max_workers)
+    return TrainResponse(task_id=task.id)
+
+@router.get("/walk-forward/{task_id}", response_model=WalkForwardTaskResponse)
+async def get_walk_forward_status(task_id: str) -> WalkForwardTaskResponse:
+    task = walk_forward_task.AsyncResult(task_id, app=celery_app)
+    results = WalkForwardResult(**task.result) if task.successful() else None
+    return WalkForwardTaskResponse(task_id=task.id, status=task.status, results=results)
+
+@router.post("/search/", response_model=TrainResponse)
+async def hyperparam_search(req: HyperparamSearchRequest) -> TrainResponse:
+    search_start, search_end = req.start.isoformat(), req.end.isoformat()
+    task = hyperparam_search_task.delay(req.model_name, req.param_name, req.coin_symbol, req.timeframe, search_start, search_end, req.n_trials, req.method, req.validation_ratio, req.seed, req.max_workers, req.holdout_ratio)
+    return TrainResponse(task_id=task.id)
+
+@router.get("/search/{task_id}", response_model=HyperparamSearchTaskResponse)
+async def get_hyperparam_search_status(task_id: str) -> HyperparamSearchTaskResponse:
+    task = hyperparam_search_task.AsyncResult(task_id, app=celery_app)
+    progress = task.info if task.status == "PROGRESS" else None
+    results = HyperparamSearchResult(**task.result) if task.successful() else None
+    return HyperparamSearchTaskResponse(task_id=task.id, status=task.status, progress=progress, results=results)
+
+@router.post("/refresh/", response_model=TrainResponse)
+async def refresh_model(req: RefreshRequest) -> TrainResponse:
+    task = refresh_model_task.delay(req.model_name, req.param_name, req.mode)
+    return TrainResponse(task_id=task.id)
+
+@router.get("/refresh/{task_id}", response_model=RefreshTaskResponse)
+async def get_refresh_status(task_id: str) -> RefreshTaskResponse:
+    task = refresh_model_task.AsyncResult(task_id, app=celery_app)
+    result = task.result if task.successful() else None
+    return RefreshTaskResponse(task_id=task.id, status=task.status, result=result)
\ No newline at end of file
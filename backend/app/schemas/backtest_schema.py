@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 class BacktestRequest(BaseModel):
@@ -9,6 +9,7 @@ class BacktestRequest(BaseModel):
 	timeframe: int
 	start: datetime
 	end: datetime
+	engine: Literal["backtrader", "vectorized"] = "backtrader"
 
 class BacktestResponse(BaseModel):
 	task_id: str
@@ -22,3 +23,25 @@ class BacktestTaskResponse(BaseModel):
 	task_id: str
 	status: str
 	results: Optional[BacktestResult] = None
+
+class BacktestSweepRequest(BaseModel):
+	model_name: str
+	param_name: str
+	coin_symbol: str
+	timeframe: int
+	start: datetime
+	end: datetime
+	param_grid: Dict[str, List[Any]]
+	rank_by: Literal["total_return", "win_rate", "trade_count"] = "total_return"
+
+class BacktestSweepRow(BaseModel):
+	rank: int
+	params: Dict[str, Any]
+	total_return: float
+	win_rate: float
+	trade_count: int
+
+class BacktestSweepTaskResponse(BaseModel):
+	task_id: str
+	status: str
+	results: Optional[List[BacktestSweepRow]] = None
@@ -13,4 +13,32 @@ class CoinInfoResponse(BaseModel):
     available_start: datetime
     available_end: datetime
 
-	
+class ModelSnapshot(BaseModel):
+    prediction: Optional[float] = None
+    prediction_percentile: Optional[float] = None
+    recommendation: Optional[str] = None
+
+class MarketSnapshotRequest(BaseModel):
+    coin_symbol: str
+    timeframe: int
+    # 비우면 가장 최근 봉
+    timestamp: Optional[datetime] = None
+
+class MarketSnapshotResponse(BaseModel):
+    coin_symbol: str
+    timeframe: int
+    timestamp: datetime
+    chart_features: Dict[str, Optional[float]]
+    scores: Dict[str, float]
+    # "<model_name>+<param_name>" -> 예측
+    predictions: Dict[str, ModelSnapshot]
+
+class MarketSnapshotListRequest(BaseModel):
+    coin_symbol: str
+    timeframe: int
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    limit: int = Field(default=100, ge=1, le=1000)
+
+class MarketSnapshotListResponse(BaseModel):
+    snapshots: List[MarketSnapshotResponse]
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Any, Dict, Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 # Explain Model Schema
 class ExplainModelRequest(BaseModel):
@@ -23,10 +23,40 @@ class ExplainModelResult(BaseModel):
 	reference_charts: List[ReferenceChartResult]
 	explanation_text: str
     
+class ExplainModelPartialResult(BaseModel):
+	# 단계별로 끝난 결과만 채워진다 (SHAP 단계, 참고 차트 단계)
+	prediction_percentile: Optional[float] = None
+	recommendation: Optional[str] = None
+	shap_values: Optional[Dict[str, float]] = None
+	feature_values: Optional[Dict[str, float]] = None
+	reference_charts: Optional[List[ReferenceChartResult]] = None
+
 class ExplainModelTaskResponse(BaseModel):
 	task_id: str
 	status: str
 	results: Optional[ExplainModelResult] = None
+	partial_results: Optional[ExplainModelPartialResult] = None
+
+# Explain Model Range Schema
+class ExplainRangeRequest(BaseModel):
+	coin_symbol: str
+	timeframe: int
+	start: datetime
+	end: datetime
+	top_k: int = Field(default=5, ge=1, le=20)
+
+class ExplainRangeResult(BaseModel):
+	feature_names: List[str]
+	timestamps: List[datetime]
+	predictions: List[float]
+	# 시점별 |SHAP| 상위 feature 번호(feature_names 기준)와 SHAP 값
+	top_features: List[List[int]]
+	top_shap_values: List[List[float]]
+
+class ExplainRangeTaskResponse(BaseModel):
+	task_id: str
+	status: str
+	results: Optional[ExplainRangeResult] = None
 
 # Explain Chart Schema
 class ExplainChartRequest(BaseModel):
@@ -35,11 +65,22 @@ class ExplainChartRequest(BaseModel):
 	inference_time: datetime
 	start: datetime
 	end: datetime
+	# 설정된 모든 코인(또는 similar_symbols)에서 유사 차트를 찾는다
+	cross_symbol: bool = False
+	similar_symbols: Optional[List[str]] = None
+
+	@model_validator(mode="after")
+	def check_similar_symbols_need_cross_symbol(self):
+		# 단일 심볼 검색에서는 similar_symbols가 쓰이지 않으므로 조용히 무시하지 않는다
+		if self.similar_symbols and not self.cross_symbol:
+			raise ValueError("similar_symbols requires cross_symbol=true.")
+		return self
 
 class ExplainChartResponse(BaseModel):
 	task_id: str
 
 class SimilarChartResult(BaseModel):
+	coin_symbol: Optional[str] = None
 	timestamp: datetime
 	distance: float
 
@@ -52,3 +93,11 @@ class ExplainChartTaskResponse(BaseModel):
 	task_id: str
 	status: str
 	results: Optional[ExplainChartResult] = None
+
+# LLM Cache Schema
+class LLMCacheStats(BaseModel):
+	backend: str
+	hits: int
+	misses: int
+	entries: int
+	hit_rate: float
@@ -7,6 +7,8 @@ class ScoreChartRequest(BaseModel):
     timeframe: int
     inference_time: datetime
     history_window: int = Field(default=120, ge=24)
+    # False면 LLM 설명 없이 로컬 점수만 반환
+    explain: bool = True
 
 class ScoreChartResponse(BaseModel):
     task_id: str
@@ -20,3 +22,11 @@ class ScoreChartTaskResponse(BaseModel):
     status: str
     results: Optional[Dict[str, ScoreWithExplanation]] = None
 
+class ScoreChartLocalRequest(BaseModel):
+    coin_symbol: str
+    timeframe: int
+    inference_time: datetime
+    history_window: int = Field(default=120, ge=24)
+
+class ScoreChartLocalResponse(BaseModel):
+    scores: Dict[str, float]
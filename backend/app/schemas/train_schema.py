@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 
 class TrainRequest(BaseModel):
 	model_name: str
@@ -16,4 +16,97 @@ class TrainResponse(BaseModel):
 
 class TrainTaskResponse(BaseModel):
 	task_id: str
-	status: str
\ No newline at end of file
+	status: str
+
+class RefreshRequest(BaseModel):
+	model_name: str
+	param_name: str
+	mode: Optional[Literal["incremental", "window"]] = None
+
+class RefreshTaskResponse(BaseModel):
+	task_id: str
+	status: str
+	result: Optional[Dict[str, Any]] = None
+
+class WalkForwardRequest(BaseModel):
+	model_name: str
+	coin_symbol: str
+	timeframe: int
+	start: datetime
+	end: datetime
+	train_days: int = Field(gt=0)
+	test_days: int = Field(gt=0)
+	step_days: Optional[int] = Field(default=None, gt=0)
+	hyperparams: Dict[str, Any] = Field(default_factory=dict)
+	max_workers: Optional[int] = Field(default=None, gt=0)
+
+	@model_validator(mode="after")
+	def check_folds_do_not_overlap(self):
+		# 테스트 구간이 겹치면 같은 봉의 수익이 여러 번 합산된다
+		if self.step_days is not None and self.step_days < self.test_days:
+			raise ValueError("step_days must be at least test_days so test windows do not overlap.")
+		return self
+
+class WalkForwardFold(BaseModel):
+	train_start: datetime
+	test_start: datetime
+	test_end: datetime
+	total_return: float
+	win_rate: float
+	trade_count: int
+
+class WalkForwardSummary(BaseModel):
+	fold_count: int
+	compounded_return: float
+	mean_return: float
+	std_return: float
+	positive_fold_ratio: float
+	mean_win_rate: float
+	trade_count: int
+
+class WalkForwardResult(BaseModel):
+	folds: List[WalkForwardFold]
+	summary: WalkForwardSummary
+
+class WalkForwardTaskResponse(BaseModel):
+	task_id: str
+	status: str
+	results: Optional[WalkForwardResult] = None
+
+
+class HyperparamSearchRequest(BaseModel):
+	model_name: str
+	param_name: str
+	coin_symbol: str
+	timeframe: int
+	start: datetime
+	end: datetime
+	n_trials: int = Field(default=20, gt=0)
+	method: Literal["random", "halving"] = "random"
+	validation_ratio: float = Field(default=0.2, gt=0, lt=1)
+	seed: int = 42
+	max_workers: Optional[int] = Field(default=None, gt=0)
+	# 탐색에 쓰지 않고 저장 여부 판단에만 쓰는 마지막 구간 비율
+	holdout_ratio: float = Field(default=0.1, gt=0, lt=1)
+
+class HyperparamTrial(BaseModel):
+	params: Dict[str, Any]
+	num_rounds: int
+	best_iteration: int
+	score: float
+	rung: int
+
+class HyperparamSearchResult(BaseModel):
+	# rejected: holdout 구간 L1이 운영 중인 모델보다 나빠 저장하지 않음
+	status: Literal["saved", "rejected"]
+	best_params: Dict[str, Any]
+	best_score: float
+	trials: List[HyperparamTrial]
+	previous_l1: Optional[float] = None
+	candidate_l1: Optional[float] = None
+
+class HyperparamSearchTaskResponse(BaseModel):
+	task_id: str
+	status: str
+	progress: Optional[Dict[str, Any]] = None
+	results: Optional[HyperparamSearchResult] = None
\ No newline at end of file
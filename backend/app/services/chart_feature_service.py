@@ -0,0 +1,220 @@
+"""Chart-feature snapshots shared by the explain-chart and score-chart tasks.
+
+All chart features (recent candles, Bollinger, RSI, MACD, EMA, ADX, ATR and
+the derived scoring inputs) are computed in one pass per candle, with every
+indicator series built once. Snapshots are cached in Redis under
+``chart-features:<SYMBOL>:<timeframe>m:w<history_window>:<timestamp>`` for
+``CHART_FEATURE_TTL_SECONDS``, so explain and score requests for the same
+candle (from any worker or the API process) reuse one computation. After each
+ingest the market snapshot stage refreshes the latest candle of every
+configured symbol. If Redis is unreachable, features are computed directly.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import redis
+import ta
+
+from app.utils.data_utils import get_ohlcv_history_df, get_recent_ohlcv_df
+from app.utils.redis_utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "chart-features"
+DEFAULT_HISTORY_WINDOW = 120
+RECENT_CANDLES = 24
+EPS = 1e-12
+
+# score-chart에서만 쓰는 파생 지표 (explain-chart 프롬프트에는 넣지 않는다)
+ADDITIONAL_FEATURE_NAMES = (
+    "realized_vol_24", "atr_pct", "bollinger_band_width_pct",
+    "dist_from_upper_band_pct", "dist_from_lower_band_pct", "dist_from_ema20_pct", "dist_from_ema60_pct",
+    "ret_4h", "ret_24h", "ema_diff_pct", "macd_hist_last",
+    "range_high_24", "range_low_24", "breakout_from_high_pct", "breakout_from_low_pct",
+    "last_body_ratio", "last_upper_shadow_ratio", "last_lower_shadow_ratio", "volume_boost_24",
+    "obv_last", "obv_change_window", "mfi_last", "upper_wick_volume_sum_window", "lower_wick_volume_sum_window",
+)
+
+
+def _get_ttl_seconds() -> int:
+    return int(os.getenv("CHART_FEATURE_TTL_SECONDS", "86400"))
+
+
+def chart_feature_key(coin_symbol: str, timeframe: int, timestamp: pd.Timestamp, history_window: int) -> str:
+    return f"{KEY_PREFIX}:{coin_symbol.upper()}:{timeframe}m:w{history_window}:{timestamp.isoformat()}"
+
+
+def compute_chart_features(inference_df: pd.DataFrame) -> dict:
+    close = inference_df["close"]
+    high = inference_df["high"]
+    low = inference_df["low"]
+    volume = inference_df["volume"]
+
+    chart_features = {}
+    for i in range(RECENT_CANDLES):
+        row = inference_df.iloc[-i-1]
+        chart_features[f"close_{i}h"] = float(row['close'])
+        chart_features[f"volume_{i}h"] = float(row['volume'])
+        chart_features[f"high_{i}h"] = float(row['high'])
+        chart_features[f"low_{i}h"] = float(row['low'])
+        chart_features[f"open_{i}h"] = float(row['open'])
+
+    bb = ta.volatility.BollingerBands(close)
+    bb_l = float(bb.bollinger_lband().iloc[-1])
+    bb_u = float(bb.bollinger_hband().iloc[-1])
+    bb_m = float(bb.bollinger_mavg().iloc[-1])
+    macd = ta.trend.MACD(close)
+    macd_diff = float(macd.macd_diff().iloc[-1])
+    ema20 = float(ta.trend.EMAIndicator(close, window=20).ema_indicator().iloc[-1])
+    ema60 = float(ta.trend.EMAIndicator(close, window=60).ema_indicator().iloc[-1])
+    atr = float(ta.volatility.AverageTrueRange(high=high, low=low, close=close).average_true_range().iloc[-1])
+
+    chart_features['bollinger_band_lower'] = bb_l
+    chart_features['bollinger_band_upper'] = bb_u
+    chart_features['bollinger_band_mavg'] = bb_m
+    chart_features['rsi'] = float(ta.momentum.RSIIndicator(close).rsi().iloc[-1])
+    chart_features['macd'] = float(macd.macd().iloc[-1])
+    chart_features['macd_signal'] = float(macd.macd_signal().iloc[-1])
+    chart_features['macd_diff'] = macd_diff
+    chart_features['ema_20'] = ema20
+    chart_features['ema_60'] = ema60
+    chart_features['adx'] = float(ta.trend.ADXIndicator(high=high, low=low, close=close).adx().iloc[-1])
+    chart_features['atr'] = atr
+
+    # 변동성
+    last = inference_df.iloc[-1]
+    close_now = float(last["close"])
+    returns = close.pct_change().dropna()
+    chart_features["realized_vol_24"] = float(returns.tail(24).std()) if len(returns) > 0 else np.nan
+    chart_features["atr_pct"] = float(atr / (close_now + EPS))
+    chart_features["bollinger_band_width_pct"] = float((bb_u - bb_l) / (abs(bb_m) + EPS))
+
+    # 밴드/이동평균 대비 위치
+    chart_features["dist_from_upper_band_pct"] = float((close_now - bb_u) / (abs(bb_m) + EPS))
+    chart_features["dist_from_lower_band_pct"] = float((close_now - bb_l) / (abs(bb_m) + EPS))
+    chart_features["dist_from_ema20_pct"] = float((close_now - ema20) / (abs(ema20) + EPS))
+    chart_features["dist_from_ema60_pct"] = float((close_now - ema60) / (abs(ema60) + EPS))
+
+    # 방향성
+    def safe_ret(lookback: int) -> float:
+        if len(close) > lookback:
+            past = float(close.iloc[-lookback-1])
+            return float(close_now / (past + EPS) - 1.0)
+        return np.nan
+
+    chart_features["ret_4h"] = safe_ret(4)
+    chart_features["ret_24h"] = safe_ret(24)
+    chart_features["ema_diff_pct"] = float((ema20 - ema60) / (abs(ema60) + EPS))
+    chart_features["macd_hist_last"] = macd_diff
+
+    # 돌파
+    window = min(len(inference_df), 24)
+    recent = inference_df.iloc[-window:]
+    range_high_24 = float(recent["high"].max())
+    range_low_24 = float(recent["low"].min())
+    last_high = float(last["high"])
+    last_low = float(last["low"])
+    last_open = float(last["open"])
+    full_range = max(last_high - last_low, 0.0)
+    upper_shadow = max(last_high - max(last_open, close_now), 0.0)
+    lower_shadow = max(min(last_open, close_now) - last_low, 0.0)
+
+    chart_features["range_high_24"] = range_high_24
+    chart_features["range_low_24"] = range_low_24
+    chart_features["breakout_from_high_pct"] = float((close_now - range_high_24) / (abs(range_high_24) + EPS))
+    chart_features["breakout_from_low_pct"] = float((close_now - range_low_24) / (abs(range_low_24) + EPS))
+    chart_features["last_body_ratio"] = float(abs(close_now - last_open) / (full_range + EPS))
+    chart_features["last_upper_shadow_ratio"] = float(upper_shadow / (full_range + EPS))
+    chart_features["last_lower_shadow_ratio"] = float(lower_shadow / (full_range + EPS))
+    chart_features["volume_boost_24"] = float(float(last["volume"]) / (float(recent["volume"].mean()) + EPS))
+
+    # 매집/분산
+    obv_series = ta.volume.OnBalanceVolumeIndicator(close=close, volume=volume).on_balance_volume()
+    obv_last = float(obv_series.iloc[-1])
+    try:
+        mfi_last = float(ta.volume.MFIIndicator(
+            high=high, low=low, close=close, volume=volume, window=14
+        ).money_flow_index().iloc[-1])
+    except Exception:
+        mfi_last = np.nan
+
+    recent_high = recent["high"].to_numpy(dtype=float)
+    recent_low = recent["low"].to_numpy(dtype=float)
+    recent_open = recent["open"].to_numpy(dtype=float)
+    recent_close = recent["close"].to_numpy(dtype=float)
+    recent_volume = recent["volume"].to_numpy(dtype=float)
+    full_rng = np.maximum(recent_high - recent_low, 0.0)
+    upper = np.maximum(recent_high - np.maximum(recent_open, recent_close), 0.0)
+    lower = np.maximum(np.minimum(recent_open, recent_close) - recent_low, 0.0)
+
+    chart_features["obv_last"] = obv_last
+    chart_features["obv_change_window"] = float(obv_last - float(obv_series.iloc[-window-1])) if len(obv_series) > window else np.nan
+    chart_features["mfi_last"] = mfi_last
+    chart_features["upper_wick_volume_sum_window"] = float(((upper / (full_rng + EPS)) * recent_volume).sum())
+    chart_features["lower_wick_volume_sum_window"] = float(((lower / (full_rng + EPS)) * recent_volume).sum())
+    return chart_features
+
+
+def _history_slice(total_df: pd.DataFrame, timestamp: pd.Timestamp, history_window: int) -> pd.DataFrame:
+    inference_iloc = total_df.index.get_loc(timestamp)
+    return total_df.iloc[inference_iloc - history_window + 1:inference_iloc + 1]
+
+
+def cache_chart_features(coin_symbol: str, timeframe: int, timestamp: pd.Timestamp, history_window: int,
+                         chart_features: dict, client: redis.Redis | None = None) -> None:
+    try:
+        (client or get_redis()).set(
+            chart_feature_key(coin_symbol, timeframe, timestamp, history_window),
+            json.dumps(chart_features), ex=_get_ttl_seconds(),
+        )
+    except redis.RedisError as exc:
+        logger.warning("Chart feature cache unavailable: %s", exc)
+
+
+def get_chart_features(coin_symbol: str, timeframe: int, inference_time, history_window: int = DEFAULT_HISTORY_WINDOW,
+                       total_df: pd.DataFrame | None = None, client: redis.Redis | None = None) -> dict:
+    """Features of the candle at ``inference_time`` over the last ``history_window`` candles.
+
+    ``total_df`` is only read on a cache miss; without it only the candles
+    up to ``inference_time`` that cover ``history_window`` are loaded from the
+    database. Raises ``KeyError`` if the candle does not exist.
+    """
+    timestamp = pd.Timestamp(inference_time).tz_localize(None)
+    key = chart_feature_key(coin_symbol, timeframe, timestamp, history_window)
+    try:
+        client = client or get_redis()
+        cached = client.get(key)
+        if cached is not None:
+            return json.loads(cached)
+    except redis.RedisError as exc:
+        logger.warning("Chart feature cache unavailable: %s", exc)
+        client = None
+
+    if total_df is None:
+        total_df = get_ohlcv_history_df(coin_symbol, timeframe, timestamp, history_window)
+    chart_features = compute_chart_features(_history_slice(total_df, timestamp, history_window))
+    if client is not None:
+        cache_chart_features(coin_symbol, timeframe, timestamp, history_window, chart_features, client)
+    return chart_features
+
+
+def refresh_latest_chart_features(coin_symbol: str, timeframe: int, history_window: int = DEFAULT_HISTORY_WINDOW,
+                                  total_df: pd.DataFrame | None = None,
+                                  client: redis.Redis | None = None) -> tuple[pd.Timestamp, dict] | None:
+    """Recompute and cache the snapshot of the newest candle; returns (timestamp, features).
+
+    Without ``total_df`` only the recent candles are read from the database.
+    """
+    if total_df is None:
+        total_df = get_recent_ohlcv_df(coin_symbol, timeframe, history_window)
+    if len(total_df) < history_window:
+        return None
+    timestamp = total_df.index[-1]
+    chart_features = compute_chart_features(total_df.iloc[-history_window:])
+    cache_chart_features(coin_symbol, timeframe, timestamp, history_window, chart_features, client)
+    return timestamp, chart_features
@@ -0,0 +1,121 @@
+"""Deterministic chart scores computed from ``score_chart_task`` features.
+
+Every score is a weighted mean of bounded components, so the same chart always
+maps to the same numbers. Components that cannot be computed (NaN, e.g. too
+little history) are dropped and the remaining weights are renormalised.
+Scale references (``*_REF``) are tuned for hourly crypto candles.
+
+volatility_risk (0~100)
+    0.4 * sat(realized_vol_24 / VOL_REF)
+    + 0.4 * sat(atr_pct / ATR_REF)
+    + 0.2 * sat(bollinger_band_width_pct / BB_WIDTH_REF)
+    where sat(x) = 1 - exp(-x).
+
+overextension (-100~100)
+    0.4 * (rsi - 50) / 50
+    + 0.35 * (2 * %b - 1), %b = position of the close inside the Bollinger band
+    + 0.25 * tanh(dist_from_ema20_pct / (2 * atr_pct))
+
+directionality (-100~100)
+    (0.4 * tanh(ema_diff_pct / (2 * atr_pct))
+     + 0.4 * tanh(ret_24h / (2 * realized_vol_24 * sqrt(24)))
+     + 0.2 * tanh(macd_hist_last / atr))
+    * (0.5 + 0.5 * min(adx / 25, 1))   -- weak trends (low ADX) are damped
+
+breakout_strength (0~100)
+    0.45 * edge, edge = |2 * (close - range_low_24) / (range_high_24 - range_low_24) - 1|
+    + 0.35 * clip((volume_boost_24 - 1) / 2, 0, 1)
+    + 0.2 * last_body_ratio
+
+accumulation_distribution (-100~100)
+    0.4 * clip(obv_change_window / sum(volume over the last 24 bars), -1, 1)
+    + 0.3 * (mfi_last - 50) / 50
+    + 0.3 * (lower_wick_volume - upper_wick_volume) / (lower_wick_volume + upper_wick_volume)
+"""
+import math
+
+import numpy as np
+
+VOL_REF = 0.01
+ATR_REF = 0.01
+BB_WIDTH_REF = 0.04
+ADX_TREND = 25.0
+EPS = 1e-12
+
+SCORE_RANGES = {
+    "volatility_risk": (0.0, 100.0),
+    "overextension": (-100.0, 100.0),
+    "directionality": (-100.0, 100.0),
+    "breakout_strength": (0.0, 100.0),
+    "accumulation_distribution": (-100.0, 100.0),
+}
+
+
+def score_chart_features(features: dict) -> dict[str, float]:
+    f = {k: _to_float(v) for k, v in features.items()}
+    close = f["close_0h"]
+    atr_pct = f["atr_pct"]
+    scores = {
+        "volatility_risk": 100 * _combine([
+            (0.4, _saturate(f["realized_vol_24"] / VOL_REF)),
+            (0.4, _saturate(atr_pct / ATR_REF)),
+            (0.2, _saturate(f["bollinger_band_width_pct"] / BB_WIDTH_REF)),
+        ]),
+        "overextension": 100 * _combine([
+            (0.4, (f["rsi"] - 50) / 50),
+            (0.35, 2 * _ratio(close - f["bollinger_band_lower"], f["bollinger_band_upper"] - f["bollinger_band_lower"]) - 1),
+            (0.25, math.tanh(_ratio(f["dist_from_ema20_pct"], 2 * atr_pct))),
+        ]),
+        "directionality": 100 * _combine([
+            (0.4, math.tanh(_ratio(f["ema_diff_pct"], 2 * atr_pct))),
+            (0.4, math.tanh(_ratio(f["ret_24h"], 2 * f["realized_vol_24"] * math.sqrt(24)))),
+            (0.2, math.tanh(_ratio(f["macd_hist_last"], f["atr"]))),
+        ]) * (0.5 + 0.5 * min(_nan_to(f["adx"], 0.0) / ADX_TREND, 1.0)),
+        "breakout_strength": 100 * _combine([
+            (0.45, abs(2 * _ratio(close - f["range_low_24"], f["range_high_24"] - f["range_low_24"]) - 1)),
+            (0.35, float(np.clip((f["volume_boost_24"] - 1) / 2, 0, 1))),
+            (0.2, f["last_body_ratio"]),
+        ]),
+        "accumulation_distribution": 100 * _combine([
+            (0.4, float(np.clip(_ratio(f["obv_change_window"], sum(f[f"volume_{i}h"] for i in range(24))), -1, 1))),
+            (0.3, (f["mfi_last"] - 50) / 50),
+            (0.3, _ratio(
+                f["lower_wick_volume_sum_window"] - f["upper_wick_volume_sum_window"],
+                f["lower_wick_volume_sum_window"] + f["upper_wick_volume_sum_window"],
+            )),
+        ]),
+    }
+    return {
+        name: round(float(np.clip(_nan_to(score, 0.0), *SCORE_RANGES[name])), 2)
+        for name, score in scores.items()
+    }
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _nan_to(value: float, default: float) -> float:
+    return default if not math.isfinite(value) else value
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    if not (math.isfinite(numerator) and math.isfinite(denominator)) or abs(denominator) < EPS:
+        return math.nan
+    return numerator / denominator
+
+
+def _saturate(x: float) -> float:
+    return 1.0 - math.exp(-max(x, 0.0)) if math.isfinite(x) else math.nan
+
+
+def _combine(components: list[tuple[float, float]]) -> float:
+    # NaN 성분은 제외하고 남은 가중치로 다시 정규화
+    finite = [(weight, value) for weight, value in components if math.isfinite(value)]
+    total_weight = sum(weight for weight, _ in finite)
+    if total_weight == 0:
+        return 0.0
+    return sum(weight * value for weight, value in finite) / total_weight
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import redis
+
+from app.utils.cache_utils import DiskCache
+from app.utils.redis_utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+VALUE_FILE = "value.json"
+# 점으로 시작하는 이름은 DiskCache 정리 대상에서 빠진다
+STATS_FILE = ".stats.json"
+STATS_LOCK_FILE = ".stats.lock"
+
+
+def llm_cache_key(model: str, system_prompt: str, user_prompt: str) -> str:
+    payload = json.dumps([model, system_prompt, user_prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RedisLLMCacheBackend:
+    """Entries are plain keys with a TTL; a sorted set of last-access times
+    bounds the number of entries (least recently used are dropped first)."""
+
+    def __init__(self, url: str | None, ttl_seconds: int, max_entries: int, prefix: str = "llm-cache") -> None:
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prefix = prefix
+
+    def _client(self) -> redis.Redis:
+        return get_redis(self.url)
+
+    def get(self, key: str) -> str | None:
+        client = self._client()
+        value = client.get(f"{self.prefix}:{key}")
+        if value is None:
+            return None
+        client.zadd(f"{self.prefix}:index", {key: time.time()})
+        return value.decode("utf-8")
+
+    def set(self, key: str, value: str) -> None:
+        client = self._client()
+        with client.pipeline() as pipe:
+            pipe.set(f"{self.prefix}:{key}", value, ex=self.ttl_seconds)
+            pipe.zadd(f"{self.prefix}:index", {key: time.time()})
+            # TTL로 이미 사라진 항목도 index에서 정리
+            pipe.zremrangebyscore(f"{self.prefix}:index", "-inf", time.time() - self.ttl_seconds)
+            pipe.zcard(f"{self.prefix}:index")
+            size = pipe.execute()[-1]
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = [member for member, _ in client.zpopmin(f"{self.prefix}:index", overflow)]
+            client.delete(*[f"{self.prefix}:{member.decode('utf-8')}" for member in evicted])
+
+    def incr(self, counter: str) -> None:
+        self._client().incr(f"{self.prefix}:stats:{counter}")
+
+    def stats(self) -> dict:
+        client = self._client()
+        hits, misses = client.mget(f"{self.prefix}:stats:hits", f"{self.prefix}:stats:misses")
+        return {
+            "hits": int(hits or 0),
+            "misses": int(misses or 0),
+            "entries": int(client.zcard(f"{self.prefix}:index")),
+        }
+
+
+class DiskLLMCacheBackend:
+    """One ``DiskCache`` entry per completion; hit/miss counters live in a
+    locked file under the cache directory so every process shares them."""
+
+    def __init__(self, ttl_seconds: int, disk_cache: DiskCache | None = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.disk_cache = disk_cache or DiskCache("llm", "LLM_CACHE_DIR", "LLM_CACHE_MAX_ENTRIES", 10000)
+
+    def get(self, key: str) -> str | None:
+        entry_dir = self.disk_cache.entry_dir(key, (VALUE_FILE,))
+        if entry_dir is None:
+            return None
+        try:
+            with open(os.path.join(entry_dir, VALUE_FILE), "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            self.disk_cache.remove(key)
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: str) -> None:
+        def write(entry_dir: str) -> None:
+            with open(os.path.join(entry_dir, VALUE_FILE), "w", encoding="utf-8") as fp:
+                json.dump({"created_at": time.time(), "value": value}, fp, ensure_ascii=False)
+
+        self.disk_cache.store(key, write)
+
+    def incr(self, counter: str) -> None:
+        with self._locked_counters() as counters:
+            counters[counter] = counters.get(counter, 0) + 1
+
+    def stats(self) -> dict:
+        with self._locked_counters() as counters:
+            hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {"hits": hits, "misses": misses, "entries": len(self.disk_cache)}
+
+    @contextmanager
+    def _locked_counters(self):
+        # API 프로세스와 워커가 같은 카운터를 보도록 파일 잠금 아래에서 읽고 쓴다
+        cache_dir = self.disk_cache.cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        stats_path = os.path.join(cache_dir, STATS_FILE)
+        with open(os.path.join(cache_dir, STATS_LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(stats_path, "r", encoding="utf-8") as fp:
+                        counters = json.load(fp)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    counters = {}
+                before = dict(counters)
+                yield counters
+                if counters != before:
+                    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".stats-")
+                    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                        json.dump(counters, fp)
+                    os.replace(tmp_path, stats_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class LLMCache:
+    """Content-addressed cache for LLM completions.
+
+    Entries are keyed by a hash of (model, system prompt, user prompt). Backend
+    errors are logged and treated as misses so the cache never breaks a call.
+    """
+
+    def __init__(self, backend: RedisLLMCacheBackend | DiskLLMCacheBackend | None) -> None:
+        self.backend = backend
+
+    def get(self, model: str, system_prompt: str, user_prompt: str) -> str | None:
+        if self.backend is None:
+            return None
+        cached = self._call("get", llm_cache_key(model, system_prompt, user_prompt))
+        self._call("incr", "hits" if cached is not None else "misses")
+        return cached
+
+    def set(self, model: str, system_prompt: str, user_prompt: str, value: str | None) -> None:
+        if self.backend is None or value is None:
+            return
+        self._call("set", llm_cache_key(model, system_prompt, user_prompt), value)
+
+    def stats(self) -> dict:
+        if self.backend is None:
+            return {"backend": "none", "hits": 0, "misses": 0, "entries": 0, "hit_rate": 0.0}
+        stats = self._call("stats") or {"hits": 0, "misses": 0, "entries": 0}
+        total = stats["hits"] + stats["misses"]
+        return {
+            "backend": type(self.backend).__name__,
+            **stats,
+            "hit_rate": stats["hits"] / total if total else 0.0,
+        }
+
+    def _call(self, method: str, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except (redis.RedisError, OSError) as exc:
+            logger.warning("LLM cache %s failed: %s", method, exc)
+            return None
+
+
+_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        backend_name = os.getenv("LLM_CACHE_BACKEND", "redis")
+        ttl_seconds = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+        max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        if backend_name == "redis":
+            backend = RedisLLMCacheBackend(None, ttl_seconds, max_entries)
+        elif backend_name == "disk":
+            # 디렉터리(LLM_CACHE_DIR)와 항목 수(LLM_CACHE_MAX_ENTRIES)는 DiskCache가 읽는다
+            backend = DiskLLMCacheBackend(ttl_seconds)
+        elif backend_name == "none":
+            backend = None
+        else:
+            raise ValueError(f"Unknown LLM cache backend: {backend_name}")
+        _cache = LLMCache(backend)
+    return _cache
@@ -0,0 +1,219 @@
+"""Shared chat-completion client for the explanation tasks.
+
+One OpenAI client (and its HTTP connection pool) is kept per process, with
+explicit timeouts. Transient failures (timeouts, connection errors, 429, 5xx)
+are retried with capped exponential backoff and full jitter. Responses go
+through the LLM cache, so identical prompts do not reach the API twice.
+
+Set ``OPENAI_BASE_URL`` to point every call at a local OpenAI-compatible
+stand-in (tests, load runs).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Callable, TypeVar
+
+import httpx
+import openai
+
+from app.services.llm_cache_service import get_llm_cache
+from app.utils.cache_utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MODEL = "gpt-5.1-chat-latest"
+
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+_clients: dict[int, openai.OpenAI] = {}
+# (pid, 루프)별 AsyncClient; 끝난 루프의 클라이언트가 쌓이지 않도록 최근 루프 몇 개만 둔다
+_async_clients = LRUCache(int(os.getenv("LLM_ASYNC_CLIENT_CACHE_SIZE", "4")))
+_lock = threading.Lock()
+
+
+def get_llm_model() -> str:
+    return os.getenv("LLM_MODEL", DEFAULT_MODEL)
+
+
+def _client_options() -> dict:
+    base_url = os.getenv("OPENAI_BASE_URL") or None
+    # 로컬 대체 서버는 키를 확인하지 않으므로 키가 없어도 동작하게 한다
+    api_key = os.getenv("OPENAI_API_KEY") or ("local" if base_url else None)
+    return {
+        "api_key": api_key,
+        "base_url": base_url,
+        "timeout": httpx.Timeout(
+            float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+            connect=float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5")),
+        ),
+        # 재시도는 아래 _retry_delay 정책으로 직접 처리
+        "max_retries": 0,
+    }
+
+
+def _pool_limits() -> httpx.Limits:
+    max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+
+def get_llm_client() -> openai.OpenAI:
+    # fork 이후 자식 프로세스가 부모의 커넥션 풀을 공유하지 않도록 pid별로 만든다
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        with _lock:
+            client = _clients.get(pid)
+            if client is None:
+                client = openai.OpenAI(**_client_options(), http_client=httpx.Client(limits=_pool_limits()))
+                _clients[pid] = client
+    return client
+
+
+def get_async_llm_client() -> openai.AsyncOpenAI:
+    # AsyncClient는 생성된 이벤트 루프에 묶이므로 (pid, 루프)별로 만든다
+    loop = asyncio.get_running_loop()
+    key = (os.getpid(), id(loop))
+    cached = _async_clients.get(key)
+    # 끝난 루프의 id가 새 루프에 재사용될 수 있으므로 같은 루프인지 약한 참조로 확인
+    if cached is not None and cached[0]() is loop:
+        return cached[1]
+    client = openai.AsyncOpenAI(**_client_options(), http_client=httpx.AsyncClient(limits=_pool_limits()))
+    _async_clients.put(key, (weakref.ref(loop), client))
+    return client
+
+
+def _max_retries() -> int:
+    return int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+
+def _retry_delay(attempt: int, exc: Exception) -> float:
+    base = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+    cap = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        # 서버가 Retry-After를 주면 그보다 먼저 재시도하지 않는다
+        delay = max(delay, min(cap, float(retry_after))) if retry_after else delay
+    except ValueError:
+        pass
+    return delay
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _with_retries(request: Callable[[], T], can_retry: Callable[[], bool] = lambda: True) -> T:
+    max_retries = _max_retries()
+    for attempt in range(max_retries + 1):
+        try:
+            return request()
+        except RETRYABLE_ERRORS as exc:
+            if attempt == max_retries or not can_retry():
+                raise
+            delay = _retry_delay(attempt, exc)
+            logger.warning("LLM request failed (%s); retry %d/%d in %.2fs", exc, attempt + 1, max_retries, delay)
+            time.sleep(delay)
+
+
+def chat_completion(system_prompt: str, user_prompt: str, model: str | None = None,
+                    validate: Callable[[str], object] | None = None) -> str:
+    """Return the completion text, served from the LLM cache when possible.
+
+    ``validate`` is called on a fresh response before it is cached; if it
+    raises, the response is not cached and the error propagates.
+    """
+    model = model or get_llm_model()
+    cache = get_llm_cache()
+    cached = cache.get(model, system_prompt, user_prompt)
+    if cached is not None:
+        return cached
+
+    client = get_llm_client()
+    response = _with_retries(
+        lambda: client.chat.completions.create(model=model, messages=_messages(system_prompt, user_prompt))
+    )
+    content = response.choices[0].message.content
+    if validate is not None:
+        validate(content)
+    cache.set(model, system_prompt, user_prompt, content)
+    return content
+
+
+def stream_chat_completion(system_prompt: str, user_prompt: str, on_delta: Callable[[str], None],
+                           model: str | None = None) -> str:
+    """Like :func:`chat_completion`, but passes text to ``on_delta`` as it arrives.
+
+    A cache hit is delivered as a single delta. A failed request is retried
+    only while nothing has been delivered yet.
+    """
+    model = model or get_llm_model()
+    cache = get_llm_cache()
+    cached = cache.get(model, system_prompt, user_prompt)
+    if cached is not None:
+        on_delta(cached)
+        return cached
+
+    client = get_llm_client()
+    parts: list[str] = []
+
+    def _request() -> str:
+        stream = client.chat.completions.create(
+            model=model, messages=_messages(system_prompt, user_prompt), stream=True
+        )
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                on_delta(text)
+        return "".join(parts)
+
+    content = _with_retries(_request, can_retry=lambda: not parts)
+    cache.set(model, system_prompt, user_prompt, content)
+    return content
+
+
+async def async_chat_completion(system_prompt: str, user_prompt: str, model: str | None = None,
+                                validate: Callable[[str], object] | None = None) -> str:
+    """Async counterpart of :func:`chat_completion`."""
+    model = model or get_llm_model()
+    cache = get_llm_cache()
+    cached = await asyncio.to_thread(cache.get, model, system_prompt, user_prompt)
+    if cached is not None:
+        return cached
+
+    client = get_async_llm_client()
+    max_retries = _max_retries()
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.chat.completions.create(model=model, messages=_messages(system_prompt, user_prompt))
+            break
+        except RETRYABLE_ERRORS as exc:
+            if attempt == max_retries:
+                raise
+            delay = _retry_delay(attempt, exc)
+            logger.warning("LLM request failed (%s); retry %d/%d in %.2fs", exc, attempt + 1, max_retries, delay)
+            await asyncio.sleep(delay)
+
+    content = response.choices[0].message.content
+    if validate is not None:
+        validate(content)
+    await asyncio.to_thread(cache.set, model, system_prompt, user_prompt, content)
+    return content
@@ -0,0 +1,140 @@
+"""Relay of streamed LLM text from Celery tasks to SSE clients.
+
+A task appends ``delta`` entries and a final ``done`` entry to the Redis stream
+``llm-stream:<task_id>``. A stream, unlike pub/sub, keeps earlier entries, so
+a client that connects late (or reconnects with ``Last-Event-ID``) still gets
+the whole text. Streams expire ``LLM_STREAM_TTL_SECONDS`` after the last entry.
+
+The relay gives up with an ``error`` event when a task stays ``PENDING``
+without any entry for ``LLM_STREAM_PENDING_TIMEOUT_SECONDS`` (Celery reports
+unknown or expired task ids as ``PENDING`` forever) and in any case after
+``LLM_STREAM_MAX_SECONDS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator
+
+import redis
+import redis.asyncio
+from celery.result import AsyncResult
+
+from app.utils.redis_utils import get_cache_redis_url, get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm-stream"
+MAX_STREAM_LENGTH = 10000
+BLOCK_MILLISECONDS = 1000
+# 태스크가 끝났는지 확인하고 keep-alive를 보내는 간격
+IDLE_CHECK_SECONDS = 5
+
+
+def _get_ttl_seconds() -> int:
+    return int(os.getenv("LLM_STREAM_TTL_SECONDS", "600"))
+
+
+def _get_pending_timeout_seconds() -> float:
+    return float(os.getenv("LLM_STREAM_PENDING_TIMEOUT_SECONDS", "120"))
+
+
+def _get_max_seconds() -> float:
+    return float(os.getenv("LLM_STREAM_MAX_SECONDS", "900"))
+
+
+def stream_key(task_id: str) -> str:
+    return f"{KEY_PREFIX}:{task_id}"
+
+
+class LLMStreamPublisher:
+    """Appends text events for one task. Publishing never fails the task."""
+
+    def __init__(self, task_id: str | None, client: redis.Redis | None = None) -> None:
+        self.key = stream_key(task_id) if task_id else None
+        self.client = client
+        self._disabled = self.key is None
+
+    def delta(self, text: str) -> None:
+        self._publish("delta", text)
+
+    def done(self, text: str) -> None:
+        self._publish("done", text)
+
+    def _publish(self, event: str, text: str) -> None:
+        if self._disabled:
+            return
+        try:
+            client = self.client or get_redis()
+            with client.pipeline(transaction=False) as pipe:
+                pipe.xadd(self.key, {"event": event, "text": text}, maxlen=MAX_STREAM_LENGTH, approximate=True)
+                pipe.expire(self.key, _get_ttl_seconds())
+                pipe.execute()
+        except redis.RedisError as exc:
+            # Redis가 없으면 폴링 결과만으로 동작하도록 이후 발행을 멈춘다
+            logger.warning("LLM stream publishing disabled for %s: %s", self.key, exc)
+            self._disabled = True
+
+
+def format_sse(event: str, data: dict, event_id: str | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def relay_llm_stream(task_result: AsyncResult, last_event_id: str | None = None) -> AsyncIterator[str]:
+    """Yield SSE messages for the task's stream until ``done`` or the task fails.
+
+    Events: ``delta`` (``{"text": ...}``), ``done`` (full text) and ``error``
+    (the task failed, or no result arrived before the deadlines).
+    """
+    key = stream_key(task_result.id)
+    last_id = last_event_id or "0-0"
+    client = redis.asyncio.Redis.from_url(get_cache_redis_url())
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    pending_timeout, max_seconds = _get_pending_timeout_seconds(), _get_max_seconds()
+    # 이어받기 요청이면 이미 받은 이벤트가 있으므로 태스크는 존재한다
+    received = last_event_id is not None
+    idle_seconds = 0.0
+    try:
+        while True:
+            if loop.time() - started >= max_seconds:
+                yield format_sse("error", {"status": "TIMEOUT", "detail": "Stream did not finish in time; poll the task result instead."})
+                return
+            response = await client.xread({key: last_id}, block=BLOCK_MILLISECONDS, count=100)
+            if not response:
+                idle_seconds += BLOCK_MILLISECONDS / 1000
+                if idle_seconds < IDLE_CHECK_SECONDS:
+                    continue
+                idle_seconds = 0.0
+                state = await asyncio.to_thread(lambda: task_result.state)
+                if state in ("FAILURE", "REVOKED"):
+                    yield format_sse("error", {"status": state, "detail": str(task_result.result)})
+                    return
+                if state == "SUCCESS":
+                    # 스트림이 만료되었거나 발행이 꺼져 있던 경우 결과에서 전체 텍스트를 보낸다
+                    result = task_result.result if isinstance(task_result.result, dict) else {}
+                    yield format_sse("done", {"text": result.get("explanation_text", "")})
+                    return
+                # 존재하지 않거나 만료된 task id도 PENDING으로 보이므로 기다림에 상한을 둔다
+                if state == "PENDING" and not received and loop.time() - started >= pending_timeout:
+                    yield format_sse("error", {"status": state, "detail": "Task has not started; it may not exist or its result expired."})
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            idle_seconds = 0.0
+            received = True
+            for entry_id, fields in response[0][1]:
+                last_id = entry_id.decode("utf-8")
+                event = fields[b"event"].decode("utf-8")
+                yield format_sse(event, {"text": fields[b"text"].decode("utf-8")}, event_id=last_id)
+                if event == "done":
+                    return
+    except redis.RedisError as exc:
+        logger.warning("LLM stream relay for %s failed: %s", key, exc)
+        yield format_sse("error", {"status": "UNAVAILABLE", "detail": "Stream is not available; poll the task result instead."})
+    finally:
+        await client.aclose()
@@ -0,0 +1,148 @@
+"""Market snapshots precomputed at candle close.
+
+After each ingest, one row per (symbol, timeframe, candle) is stored in
+``market_snapshot``:
+
+- ``chart_features``: the chart-feature snapshot of the candle (also cached
+  for the explain/score tasks, see ``chart_feature_service``)
+- ``scores``: the local chart scores
+- ``predictions``: for every model whose parameters are named after the
+  symbol and timeframe (``<COIN>_<tf>m``) and whose output is deterministic
+  per window (``window_outputs``), the raw model output, its percentile and
+  recommendation, exactly as ``/decide`` and the model explanation compute
+  them for that inference time (from the candles before it)
+
+Requests for the latest candle then become a primary-key lookup.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.chart_feature_service import DEFAULT_HISTORY_WINDOW, refresh_latest_chart_features
+from app.services.chart_score_service import score_chart_features
+from app.services.model_meta_service import get_model_meta_registry, model_full_name, recommendation_for
+from app.utils.data_utils import _minutes_to_timeframe_label
+from app.services.model_output_service import load_strategy, models_for_symbol, supports_stored_outputs
+from app.utils.model_load_utils import get_strategy_class
+
+logger = logging.getLogger(__name__)
+
+
+def _symbol(coin_symbol: str) -> str:
+    return "KRW-" + coin_symbol.upper()
+
+
+def _finite_or_none(value: float) -> float | None:
+    return value if value is None or math.isfinite(value) else None
+
+
+def snapshot_models(coin_symbol: str, timeframe: int) -> list[tuple[str, str]]:
+    # predict_batch는 근사치라 /decide와 같은 값을 내는 전략만 스냅샷에 넣는다
+    return [
+        (model_name, param_name)
+        for model_name, param_name in models_for_symbol(coin_symbol, timeframe)
+        if supports_stored_outputs(model_name)
+    ]
+
+
+def required_history(coin_symbol: str, timeframe: int) -> int:
+    # 모델 feature는 inference_window 이상 과거를 보지 않지만 여유를 둔다
+    windows = [get_strategy_class(model_name).inference_window * 2 for model_name, _ in snapshot_models(coin_symbol, timeframe)]
+    return max([DEFAULT_HISTORY_WINDOW, *windows]) + 1
+
+
+def predict_latest(model_name: str, param_name: str, total_df: pd.DataFrame) -> dict:
+    """Model output for an inference at the last candle of ``total_df``.
+
+    Same value as ``/decide`` (``window_outputs`` over the candles before it);
+    raises ``ValueError`` for strategies without ``window_outputs``.
+    """
+    if not supports_stored_outputs(model_name):
+        raise ValueError(f"Strategy '{model_name}' has no exact per-window output.")
+    strategy_instance, _ = load_strategy(model_name, param_name)
+    prediction = float(strategy_instance.window_outputs(total_df, [len(total_df) - 1])[0])
+    stats = get_model_meta_registry().find(model_name, param_name)
+    if not math.isfinite(prediction) or stats is None:
+        return {"prediction": _finite_or_none(prediction), "prediction_percentile": None, "recommendation": None}
+    prediction_percentile = stats.prediction_percentile(prediction)
+    return {
+        "prediction": prediction,
+        "prediction_percentile": prediction_percentile,
+        "recommendation": recommendation_for(prediction_percentile),
+    }
+
+
+def build_market_snapshot(coin_symbol: str, timeframe: int, total_df: pd.DataFrame) -> dict | None:
+    refreshed = refresh_latest_chart_features(coin_symbol, timeframe, total_df=total_df)
+    if refreshed is None:
+        return None
+    timestamp, chart_features = refreshed
+    predictions = {}
+    for model_name, param_name in snapshot_models(coin_symbol, timeframe):
+        try:
+            predictions[model_full_name(model_name, param_name)] = predict_latest(model_name, param_name, total_df)
+        except (OSError, KeyError, ValueError, RuntimeError) as exc:
+            logger.warning("Skipping %s in snapshot of %s: %s", model_full_name(model_name, param_name), coin_symbol, exc)
+    return {
+        "timestamp": timestamp.to_pydatetime(),
+        "chart_features": {k: _finite_or_none(v) for k, v in chart_features.items()},
+        "scores": score_chart_features(chart_features),
+        "predictions": predictions,
+    }
+
+
+def store_market_snapshot(session: Session, coin_symbol: str, timeframe: int, snapshot: dict) -> None:
+    stmt = sqlite_insert(models.MarketSnapshot).values(
+        symbol=_symbol(coin_symbol),
+        timeframe=_minutes_to_timeframe_label(timeframe),
+        **snapshot,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["timeframe", "symbol", "timestamp"],
+        set_={
+            "chart_features": stmt.excluded.chart_features,
+            "scores": stmt.excluded.scores,
+            "predictions": stmt.excluded.predictions,
+            "created_at": func.current_timestamp(),
+        },
+    )
+    session.execute(stmt)
+    session.commit()
+
+
+def _snapshot_query(coin_symbol: str, timeframe: int):
+    return select(models.MarketSnapshot).where(
+        models.MarketSnapshot.symbol == _symbol(coin_symbol),
+        models.MarketSnapshot.timeframe == _minutes_to_timeframe_label(timeframe),
+    )
+
+
+def get_market_snapshot(session: Session, coin_symbol: str, timeframe: int,
+                        timestamp: datetime | None = None) -> models.MarketSnapshot | None:
+    """Snapshot of the candle at ``timestamp``, or the latest one."""
+    query = _snapshot_query(coin_symbol, timeframe)
+    if timestamp is not None:
+        query = query.where(models.MarketSnapshot.timestamp == pd.Timestamp(timestamp).tz_localize(None).to_pydatetime())
+    else:
+        query = query.order_by(models.MarketSnapshot.timestamp.desc()).limit(1)
+    return session.execute(query).scalars().first()
+
+
+def list_market_snapshots(session: Session, coin_symbol: str, timeframe: int, start: datetime | None = None,
+                          end: datetime | None = None, limit: int = 100) -> list[models.MarketSnapshot]:
+    """Snapshots in [start, end], newest first."""
+    query = _snapshot_query(coin_symbol, timeframe)
+    if start is not None:
+        query = query.where(models.MarketSnapshot.timestamp >= pd.Timestamp(start).tz_localize(None).to_pydatetime())
+    if end is not None:
+        query = query.where(models.MarketSnapshot.timestamp <= pd.Timestamp(end).tz_localize(None).to_pydatetime())
+    query = query.order_by(models.MarketSnapshot.timestamp.desc()).limit(limit)
+    return list(session.execute(query).scalars().all())
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+from scipy.stats import laplace
+
+from app.utils.data_utils import _get_data_path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelStats:
+    mean: float
+    std: float
+    train_start: str | None = None
+    train_end: str | None = None
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "ModelStats":
+        known = {"mean", "std", "train_start", "train_end"}
+        return cls(
+            mean=float(payload["mean"]),
+            std=float(payload["std"]),
+            train_start=payload.get("train_start"),
+            train_end=payload.get("train_end"),
+            extra={k: v for k, v in payload.items() if k not in known},
+        )
+
+    def to_dict(self) -> dict:
+        payload = {k: v for k, v in asdict(self).items() if k != "extra" and v is not None}
+        payload.update(self.extra)
+        return payload
+
+    def prediction_percentile(self, prediction: float) -> float:
+        # 예측값 분포를 Laplace로 근사. 과대 추정 완화를 위해 std를 1.5배 확대
+        std = self.std * 1.5
+        return float(laplace.cdf(prediction, loc=self.mean, scale=std / np.sqrt(2)) * 100)
+
+
+def model_full_name(model_name: str, param_name: str) -> str:
+    return f"{model_name}+{param_name}"
+
+
+def recommendation_for(prediction_percentile: float) -> str:
+    if prediction_percentile >= 85:
+        return "Buy"
+    elif prediction_percentile >= 70:
+        return "Weak buy"
+    elif prediction_percentile >= 30:
+        return "Hold"
+    elif prediction_percentile >= 15:
+        return "Weak sell"
+    else:
+        return "Sell"
+
+
+class ModelMetaRegistry:
+    """Process-wide view of ``model_stats.json``.
+
+    The file is parsed once and re-read only when its mtime or size changes,
+    so lookups on the request path are a dict access plus one ``os.stat``.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int] | None = None
+        self._entries: dict[str, ModelStats] = {}
+
+    def get(self, model_name: str, param_name: str) -> ModelStats:
+        key = model_full_name(model_name, param_name)
+        entries = self._load()
+        if key not in entries:
+            raise KeyError(f"No model stats for '{key}'. Available: {sorted(entries)}")
+        return entries[key]
+
+    def find(self, model_name: str, param_name: str) -> ModelStats | None:
+        return self._load().get(model_full_name(model_name, param_name))
+
+    def all(self) -> dict[str, ModelStats]:
+        return dict(self._load())
+
+    def update(self, model_name: str, param_name: str, stats: ModelStats) -> None:
+        key = model_full_name(model_name, param_name)
+        with self._lock:
+            raw = self._read_raw()
+            raw[key] = stats.to_dict()
+            self._write_raw(raw)
+            self._signature = None
+        logger.info("Updated model stats for %s: mean=%.6f std=%.6f", key, stats.mean, stats.std)
+
+    def _load(self) -> dict[str, ModelStats]:
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return self._entries
+        with self._lock:
+            signature = self._stat_signature()
+            if signature != self._signature:
+                raw = self._read_raw()
+                self._entries = {k: ModelStats.from_dict(v) for k, v in raw.items()}
+                self._signature = signature
+        return self._entries
+
+    def _stat_signature(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read_raw(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+
+    def _write_raw(self, raw: dict) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(dict(sorted(raw.items())), fp, indent=4)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+_registry: ModelMetaRegistry | None = None
+
+
+def get_model_meta_registry() -> ModelMetaRegistry:
+    global _registry
+    if _registry is None:
+        path = os.path.join(_get_data_path(), "meta", "model_stats.json")
+        _registry = ModelMetaRegistry(path)
+    return _registry
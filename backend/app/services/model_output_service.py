@@ -0,0 +1,217 @@
+"""Model outputs stored per inference time so ``/decide`` becomes a lookup.
+
+For a given (model, param, symbol, timeframe, inference_time) the raw model
+output that ``/decide`` bases its action on never changes; only the sizing
+from the cash/coin balances does. ``model_output`` keeps that output (and the
+last close of the input window) for every candle: a backfill task fills all
+history in parallel batches, updates after each ingest only add the new
+candles. Rows carry the mtime of the parameter file they
+were computed with, so stale rows are never served; a refreshed model is
+recomputed by one backfill task that swaps the rows in a single short
+transaction. ``/decide`` applies the thresholds and balances to a stored
+output and computes live only on a miss.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.strategies.strategy import Strategy
+from app.utils.cache_utils import LRUCache, artifact_key
+from app.utils.data_utils import _minutes_to_timeframe_label, get_ohlcv_df
+from app.utils.model_load_utils import get_all_param_names, get_param_path, get_strategy_class, parse_param_name
+from app.utils.parallel_utils import parallel_map
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 하나가 한 번에 계산하는 창 수
+OUTPUT_CHUNK_SIZE = 1024
+# SQLite 바인드 변수 상한을 넘지 않도록 나눠 upsert
+INSERT_BATCH_SIZE = 500
+# 파라미터 파일(경로 + mtime)별 로드된 전략
+_strategy_cache = LRUCache(int(os.getenv("STRATEGY_CACHE_SIZE", "16")))
+
+
+def load_strategy(model_name: str, param_name: str) -> tuple[Strategy, int]:
+    """Loaded strategy (cached per parameter file version) and that version."""
+    path = get_param_path(model_name, param_name)
+    key = artifact_key(path)
+    strategy = _strategy_cache.get(key)
+    if strategy is None:
+        strategy = get_strategy_class(model_name)()
+        strategy.load(path)
+        _strategy_cache.put(key, strategy)
+    return strategy, key[1]
+
+
+def supports_stored_outputs(model_name: str) -> bool:
+    # 출력이 창에 대해 결정적인 전략만 저장한다
+    strategy_class = get_strategy_class(model_name)
+    return hasattr(strategy_class, "window_outputs") and hasattr(strategy_class, "action_from_output")
+
+
+def models_for_symbol(coin_symbol: str, timeframe: int) -> list[tuple[str, str]]:
+    """(model, param) pairs whose parameters are named after the symbol and timeframe."""
+    return [
+        (model_name, param_name)
+        for model_name, param_names in get_all_param_names().items()
+        for param_name in param_names
+        if parse_param_name(param_name) == (coin_symbol.upper(), timeframe)
+    ]
+
+
+def _symbol(coin_symbol: str) -> str:
+    return "KRW-" + coin_symbol.upper()
+
+
+def _output_filter(model_name: str, param_name: str, coin_symbol: str, timeframe: int) -> tuple:
+    return (
+        models.ModelOutput.model_name == model_name,
+        models.ModelOutput.param_name == param_name,
+        models.ModelOutput.symbol == _symbol(coin_symbol),
+        models.ModelOutput.timeframe == _minutes_to_timeframe_label(timeframe),
+    )
+
+
+def _outputs_chunk(ends: np.ndarray, shared: tuple) -> np.ndarray:
+    model_name, param_name, total_df = shared
+    strategy, _ = load_strategy(model_name, param_name)
+    return strategy.window_outputs(total_df, ends)
+
+
+def compute_model_outputs(model_name: str, param_name: str, total_df: pd.DataFrame, ends: np.ndarray,
+                          max_workers: int | None = None) -> np.ndarray:
+    """``window_outputs`` for ``ends``, split into chunks over a process pool."""
+    if len(ends) == 0:
+        return np.zeros(0, dtype=np.float64)
+    chunks = [ends[i:i + OUTPUT_CHUNK_SIZE] for i in range(0, len(ends), OUTPUT_CHUNK_SIZE)]
+    results = parallel_map(_outputs_chunk, chunks, shared=(model_name, param_name, total_df), max_workers=max_workers)
+    return np.concatenate(results)
+
+
+def compute_window_predictions(model_name: str, param_name: str, total_df: pd.DataFrame,
+                               max_workers: int | None = None) -> np.ndarray:
+    """Output for every row of ``total_df``, as the backtrader engine sees it.
+
+    Element ``i`` is the output for the window ending at row ``i`` (``NaN``
+    without a full window), computed with ``window_outputs`` over the same
+    ends backtrader walks; strategies without it fall back to ``predict_batch``.
+    """
+    strategy, _ = load_strategy(model_name, param_name)
+    if not supports_stored_outputs(model_name):
+        return strategy.predict_batch(total_df)
+    predictions = np.full(len(total_df), np.nan)
+    ends = np.arange(strategy.inference_window, len(total_df) + 1)
+    predictions[ends - 1] = compute_model_outputs(model_name, param_name, total_df, ends, max_workers)
+    return predictions
+
+
+def _output_rows(model_name: str, param_name: str, coin_symbol: str, timeframe: int, artifact_mtime_ns: int,
+                 total_df: pd.DataFrame, ends: np.ndarray, outputs: np.ndarray) -> list[dict]:
+    closes = total_df["close"].to_numpy(dtype=np.float64)
+    return [
+        {
+            "model_name": model_name,
+            "param_name": param_name,
+            "symbol": _symbol(coin_symbol),
+            "timeframe": _minutes_to_timeframe_label(timeframe),
+            "inference_time": total_df.index[end].to_pydatetime(),
+            "artifact_mtime_ns": artifact_mtime_ns,
+            "output": float(output) if math.isfinite(output) else None,
+            "price": float(closes[end - 1]),
+        }
+        for end, output in zip(ends, outputs)
+    ]
+
+
+def _upsert_rows(session: Session, rows: list[dict]) -> None:
+    for begin in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = sqlite_insert(models.ModelOutput).values(rows[begin:begin + INSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["model_name", "param_name", "timeframe", "symbol", "inference_time"],
+            set_={
+                "artifact_mtime_ns": stmt.excluded.artifact_mtime_ns,
+                "output": stmt.excluded.output,
+                "price": stmt.excluded.price,
+                "created_at": func.current_timestamp(),
+            },
+        )
+        session.execute(stmt)
+
+
+def latest_model_output_time(session: Session, model_name: str, param_name: str, coin_symbol: str, timeframe: int,
+                             artifact_mtime_ns: int) -> datetime | None:
+    """Newest inference time stored with this model version (``None`` if it was never backfilled)."""
+    query = select(func.max(models.ModelOutput.inference_time)).where(
+        *_output_filter(model_name, param_name, coin_symbol, timeframe),
+        models.ModelOutput.artifact_mtime_ns == artifact_mtime_ns,
+    )
+    latest = session.execute(query).scalar()
+    # 계산 동안 읽기 트랜잭션을 잡아 두지 않는다
+    session.rollback()
+    return latest
+
+
+def append_model_outputs(session: Session, model_name: str, param_name: str, coin_symbol: str, timeframe: int,
+                         total_df: pd.DataFrame | None = None) -> int | None:
+    """Store outputs of the candles after the latest stored one; returns how many.
+
+    Returns ``None`` without computing anything if the current model version
+    has not been backfilled yet (see ``backfill_model_outputs``).
+    """
+    strategy, version = load_strategy(model_name, param_name)
+    latest = latest_model_output_time(session, model_name, param_name, coin_symbol, timeframe, version)
+    if latest is None:
+        return None
+    window = strategy.inference_window
+    if total_df is None:
+        total_df = get_ohlcv_df(coin_symbol, timeframe, start=latest - timedelta(minutes=timeframe * window * 2))
+    ends = np.arange(window, len(total_df))
+    ends = ends[total_df.index[ends] > pd.Timestamp(latest)]
+    # 새 봉 몇 개뿐이므로 프로세스 풀 없이 계산
+    outputs = compute_model_outputs(model_name, param_name, total_df, ends, max_workers=1)
+    _upsert_rows(session, _output_rows(model_name, param_name, coin_symbol, timeframe, version, total_df, ends, outputs))
+    session.commit()
+    return len(ends)
+
+
+def backfill_model_outputs(session: Session, model_name: str, param_name: str, coin_symbol: str, timeframe: int,
+                           total_df: pd.DataFrame | None = None, max_workers: int | None = None) -> int:
+    """Recompute every candle with the current model and replace the stored rows; returns how many.
+
+    The computation (minutes for a long history) runs outside any
+    transaction; the old rows are swapped for the new ones in one short write
+    transaction, so readers never see a half-filled table and other writers
+    are not blocked meanwhile.
+    """
+    strategy, version = load_strategy(model_name, param_name)
+    if total_df is None:
+        total_df = get_ohlcv_df(coin_symbol, timeframe)
+    ends = np.arange(strategy.inference_window, len(total_df))
+    outputs = compute_model_outputs(model_name, param_name, total_df, ends, max_workers)
+    rows = _output_rows(model_name, param_name, coin_symbol, timeframe, version, total_df, ends, outputs)
+
+    session.execute(delete(models.ModelOutput).where(*_output_filter(model_name, param_name, coin_symbol, timeframe)))
+    _upsert_rows(session, rows)
+    session.commit()
+    return len(ends)
+
+
+def get_model_output(session: Session, model_name: str, param_name: str, coin_symbol: str, timeframe: int,
+                     inference_time: datetime, artifact_mtime_ns: int) -> models.ModelOutput | None:
+    inference_time = pd.Timestamp(inference_time).tz_localize(None).to_pydatetime()
+    query = select(models.ModelOutput).where(
+        *_output_filter(model_name, param_name, coin_symbol, timeframe),
+        models.ModelOutput.inference_time == inference_time,
+        models.ModelOutput.artifact_mtime_ns == artifact_mtime_ns,
+    )
+    return session.execute(query).scalars().first()
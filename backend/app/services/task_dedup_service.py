@@ -0,0 +1,84 @@
+"""Single-flight submission of identical analysis tasks.
+
+Routers fingerprint (task name, arguments) and map the fingerprint to a task id
+in Redis with ``SET NX EX``. While the key lives, identical requests get the
+existing task id back instead of enqueueing a duplicate, as long as that task
+is still pending/running or has succeeded. Failed or revoked tasks release the
+key so the next request resubmits. If Redis is unreachable, the task is
+submitted normally.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime
+
+import redis
+from celery import Task
+from celery.result import AsyncResult
+
+from app.celery_app import celery_app
+from app.utils.redis_utils import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "task-dedup"
+RELEASE_STATES = {"FAILURE", "REVOKED"}
+
+
+def _get_ttl_seconds() -> int:
+    return int(os.getenv("TASK_DEDUP_TTL_SECONDS", "300"))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Unsupported argument type: {type(value).__name__}")
+
+
+def task_fingerprint(task_name: str, kwargs: dict) -> str:
+    payload = json.dumps([task_name, kwargs], sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def submit_deduplicated(task: Task, client: redis.Redis | None = None, ttl_seconds: int | None = None, **kwargs) -> str:
+    """Enqueue ``task`` with ``kwargs`` unless an identical task is in flight.
+
+    Returns the task id to poll, either the existing one or a new one.
+    ``ttl_seconds`` overrides ``TASK_DEDUP_TTL_SECONDS`` for long tasks.
+    """
+    key = f"{KEY_PREFIX}:{task_fingerprint(task.name, kwargs)}"
+    try:
+        client = client or get_redis()
+        # 경합 시 한쪽만 NX로 키를 잡으므로 두 번이면 충분하다
+        for _ in range(2):
+            task_id = str(uuid.uuid4())
+            if client.set(key, task_id, nx=True, ex=ttl_seconds or _get_ttl_seconds()):
+                try:
+                    return task.apply_async(kwargs=kwargs, task_id=task_id).id
+                except Exception:
+                    # 등록되지 않은 id가 TTL 동안 PENDING으로 재사용되지 않도록
+                    client.delete(key)
+                    raise
+            existing = client.get(key)
+            if existing is None:
+                continue
+            existing = existing.decode("utf-8")
+            if AsyncResult(existing, app=celery_app).state not in RELEASE_STATES:
+                return existing
+            # 실패한 작업은 재사용하지 않는다. 다른 요청이 이미 바꿨으면 지우지 않음
+            with client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    if pipe.get(key) == existing.encode("utf-8"):
+                        pipe.multi()
+                        pipe.delete(key)
+                        pipe.execute()
+                except redis.WatchError:
+                    pass
+    except redis.RedisError as exc:
+        logger.warning("Task dedup unavailable, submitting %s directly: %s", task.name, exc)
+    return task.apply_async(kwargs=kwargs).id
@@ -1,45 +1,77 @@
 import json
-import ta
+import logging
+import os
 import lightgbm as lgb
 import numpy as np
 import pandas as pd
 import shap
+from scipy.cluster.vq import kmeans2, vq
 from tqdm import tqdm
 
 from app.strategies.strategy import Strategy
+from app.utils.cache_utils import LRUCache, artifact_key
+from app.utils.dataset_cache_utils import DATASET_PARAMS, dataset_cache_key, load_cached_dataset, store_cached_dataset
+from app.utils.leaf_index_utils import compact_leaf_matrix, leaf_index_key, load_leaf_index, store_leaf_index, top_k_matches
+
+logger = logging.getLogger(__name__)
+
+# _feature_panels나 학습 데이터 구성이 바뀌면 올린다 (Dataset/leaf 인덱스 캐시 무효화)
+FEATURE_VERSION = 2
+# 한 번에 feature를 계산하는 창 수 (feature 수 x 창 길이 x 창 수 만큼 메모리를 쓴다)
+FEATURE_CHUNK_SIZE = 512
+
+# SHAP 설정: interventional 비용은 background 행 수에 비례하므로 대표 행만 남긴다
+SHAP_FEATURE_PERTURBATION = os.getenv("SHAP_FEATURE_PERTURBATION", "interventional")
+SHAP_BACKGROUND_SIZE = int(os.getenv("SHAP_BACKGROUND_SIZE", "100"))
+SHAP_BACKGROUND_METHOD = os.getenv("SHAP_BACKGROUND_METHOD", "kmeans")
+# 전체 학습 데이터 background로 explainer를 한 번 더 만들어야 하므로 진단할 때만 켠다
+SHAP_TOLERANCE_PROBE_ROWS = int(os.getenv("SHAP_TOLERANCE_PROBE_ROWS", "0"))
+# 모델 파일(경로 + mtime)별 TreeExplainer
+_explainer_cache = LRUCache(int(os.getenv("SHAP_EXPLAINER_CACHE_SIZE", "8")))
+# (explainer 키, 시점)별 예측값과 SHAP 벡터
+_shap_row_cache = LRUCache(int(os.getenv("SHAP_ROW_CACHE_SIZE", "20000")))
 
 class LightGBMStrategy(Strategy):
 
     strategy_type = 'tree_based'
     inference_window = 100
     hyperparam_schema = {
+        # signal: 모델 출력을 매매 신호로 바꿀 때만 쓰여 재학습 없이 바꿔 볼 수 있는 값
         "buy_threshold": {
             "default": 0.05,
             "type": "float",
+            "signal": True,
         },
         "sell_threshold": {
             "default": -0.05,
             "type": "float",
+            "signal": True,
         },
         "learning_rate": {
             "default": 0.05,
             "type": "float",
+            "search_range": [0.01, 0.3],
+            "log_scale": True,
         },
         "num_leaves": {
             "default": 15,
             "type": "int",
+            "search_range": [7, 63],
         },
         "feature_fraction": {
             "default": 0.9,
             "type": "float",
+            "search_range": [0.5, 1.0],
         },
         "min_data_in_leaf": {
             "default": 20,
             "type": "int",
+            "search_range": [5, 100],
         },
         "num_boost_round": {
             "default": 100,
             "type": "int",
+            "search_range": [50, 500],
         },
     }
 
@@ -47,21 +79,71 @@ class LightGBMStrategy(Strategy):
         super().__init__()
         self.hyperparams = {}
         self.model = None
+        self.prediction_stats = None
+        self.artifact_key = None
 
     def _get_hyperparams(self, name: str):
         default = LightGBMStrategy.hyperparam_schema[name]['default']
         return self.hyperparams.get(name, default)
 
     def action(self, inference_df: pd.DataFrame, cash_balance: float, coin_balance: float) -> tuple[int, float]:
+        model_input = self._window_features(inference_df).to_numpy(dtype=np.float64)
+        model_output = float(self.model.predict(model_input)[0])
+        model_output = self._to_pct_change(model_output)
+        current_price = inference_df.iloc[-1]['close']
+        return self.action_from_output(model_output, current_price, cash_balance, coin_balance)
+
+    def _window_features(self, inference_df: pd.DataFrame) -> pd.DataFrame:
+        # inference_df 전체를 하나의 창으로 보고 마지막 완전한 행 (없으면 빈 DataFrame)
+        _, rows = self._window_feature_rows(inference_df, [len(inference_df)], window=len(inference_df))
+        return rows
+
+    def window_outputs(self, df: pd.DataFrame, ends) -> np.ndarray:
+        """What ``action`` bases its decision on, for many windows at once.
+
+        Element ``j`` is the model output ``action`` computes from
+        ``df.iloc[ends[j] - inference_window:ends[j]]``, i.e. ``predict_batch``
+        at row ``ends[j] - 1`` (``NaN`` if the window is not full or no row of
+        it has complete features).
+        """
+        if self.model is None:
+            raise RuntimeError("Model is not trained or loaded.")
+        ends = np.asarray(ends, dtype=np.int64)
+        outputs = np.full(len(ends), np.nan)
+        full = np.flatnonzero(ends >= self.inference_window)
+        valid, rows = self._window_feature_rows(df, ends[full])
+        if len(valid):
+            model_input = rows[self.model.feature_name()].to_numpy(dtype=np.float64)
+            outputs[full[valid]] = self._to_pct_change(self.model.predict(model_input))
+        return outputs
+
+    def _window_feature_rows(self, df: pd.DataFrame, ends, window: int | None = None) -> tuple[np.ndarray, pd.DataFrame]:
+        """Last complete feature row of every window ``df.iloc[end - window:end]``.
+
+        Returns the positions in ``ends`` of windows that have such a row and
+        the rows, indexed by the last timestamp of their window. Indicators
+        restart at each window's first row, as in a single-window call.
+        """
+        window = window or self.inference_window
+        ends = np.asarray(ends, dtype=np.int64)
+        valid, rows = [], []
+        # 창 수가 0이어도 컬럼 이름을 얻도록 빈 묶음도 한 번 계산한다
+        for begin in range(0, max(len(ends), 1), FEATURE_CHUNK_SIZE):
+            chunk = ends[begin:begin + FEATURE_CHUNK_SIZE]
+            names, values, complete = _feature_panels(df, chunk, window)
+            # dropna() 후 마지막 행: 창 안에서 모든 값이 있는 마지막 행
+            last = window - 1 - np.argmax(complete[::-1], axis=0)
+            columns = np.flatnonzero(complete.any(axis=0))
+            valid.append(begin + columns)
+            rows.append(values[:, last[columns], columns].T)
+        valid = np.concatenate(valid)
+        return valid, pd.DataFrame(np.concatenate(rows), index=df.index[ends[valid] - 1], columns=names)
+
+    def action_from_output(self, model_output: float, current_price: float,
+                           cash_balance: float, coin_balance: float) -> tuple[int, float]:
         buy_threshold = self._get_hyperparams('buy_threshold')
         sell_threshold = self._get_hyperparams('sell_threshold')
 
-        features_df = self._feature_engineering(inference_df).dropna()
-        features_df.drop(columns=["open", "high", "low", "close", "volume", "value"], inplace=True, errors="ignore")
-        model_input = features_df.iloc[-1].values.reshape(1, -1)
-        model_output = float(self.model.predict(model_input)[0])
-        model_output = (np.exp(model_output) * 100) - 100
-
         if model_output < sell_threshold:
             action = -1  # Sell
         elif model_output > buy_threshold:
@@ -69,7 +151,6 @@ class LightGBMStrategy(Strategy):
         else:
             action = 0
 
-        current_price = inference_df.iloc[-1]['close']
         if action == -1:
             amount = coin_balance
         elif action == 1:
@@ -78,20 +159,51 @@ class LightGBMStrategy(Strategy):
             amount = 0.0
         return action, amount
     
+    def build_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feature row of every row of ``df`` as ``action`` sees it.
+
+        Row ``i`` is what ``action`` feeds the model for the window of
+        ``inference_window`` rows ending at row ``i``: every indicator warms up
+        from that window's first row, so a row depends on its window only and
+        slicing the result equals building it on a slice. Rows without a full
+        window (or without a complete row in it) are ``NaN``.
+        """
+        _, rows = self._window_feature_rows(df, np.arange(self.inference_window, len(df) + 1))
+        return rows.reindex(df.index)
+
+    def predict_features(self, features_df: pd.DataFrame) -> np.ndarray:
+        if self.model is None:
+            raise RuntimeError("Model is not trained or loaded.")
+        model_input = features_df[self.model.feature_name()].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(model_input).any(axis=1)
+        predictions = np.full(len(features_df), np.nan)
+        if valid.any():
+            predictions[valid] = self._to_pct_change(self.model.predict(model_input[valid]))
+        return predictions
+
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        return self.predict_features(self.build_features(df))
+
+    def signals_batch(self, df: pd.DataFrame, predictions: np.ndarray | None = None) -> np.ndarray:
+        if predictions is None:
+            predictions = self.predict_batch(df)
+        buy_threshold = self._get_hyperparams('buy_threshold')
+        sell_threshold = self._get_hyperparams('sell_threshold')
+        signals = np.zeros(len(predictions), dtype=np.int8)
+        signals[predictions > buy_threshold] = 1
+        signals[predictions < sell_threshold] = -1
+        return signals
+
+    @staticmethod
+    def _to_pct_change(model_output):
+        # 로그 수익률 예측을 퍼센트 등락률로 변환
+        return (np.exp(model_output) * 100) - 100
+
     def explain(self, train_df: pd.DataFrame, inference_df: pd.DataFrame) -> dict[str]:
-        train_df = self._feature_engineering(train_df).dropna()
-        train_df.drop(columns=["open", "high", "low", "close", "volume", "value"], inplace=True, errors="ignore")
-        features_df = self._feature_engineering(inference_df).dropna()
-        features_df.drop(columns=["open", "high", "low", "close", "volume", "value"], inplace=True, errors="ignore")
-        model_input = features_df.iloc[-1].values.reshape(1, -1)
-        explainer = shap.TreeExplainer(
-            self.model,
-            data=train_df,
-            feature_perturbation="interventional",
-            model_output="raw"
-        )
-        prediction = self.model.predict(model_input)[0]
-        prediction = (np.exp(prediction) * 100) - 100
+        explainer = self._get_explainer(train_df)
+        model_input = self._window_features(inference_df)
+        prediction = self.model.predict(model_input.to_numpy())[0]
+        prediction = self._to_pct_change(prediction)
         shap_results = explainer(model_input)
         features = shap_results.feature_names
         shap_value_dict = dict(zip(features, shap_results.values[0]))
@@ -129,78 +241,176 @@ class LightGBMStrategy(Strategy):
         }
         return explanation
     
+    def explain_range(self, train_df: pd.DataFrame, data_df: pd.DataFrame, timestamps: pd.DatetimeIndex) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """SHAP values for many inference times with one batched explainer call.
+
+        Row ``i`` is what ``explain`` returns for ``timestamps[i]``: features
+        are built per inference window (the ``inference_window`` bars before
+        the timestamp) exactly as in ``explain``, only the explainer and model
+        calls are batched. Returns feature names, predictions (pct) and a
+        float32 SHAP matrix; rows without a full window are ``NaN``.
+        """
+        feature_names = self.model.feature_name()
+        positions = data_df.index.get_indexer(timestamps)
+        if (positions < 0).any():
+            raise KeyError("Some timestamps are not in data_df.")
+        predictions = np.full(len(timestamps), np.nan)
+        shap_values = np.full((len(timestamps), len(feature_names)), np.nan, dtype=np.float32)
+
+        explainer_key = self._explainer_cache_key(train_df)
+        missing = []
+        for i, timestamp in enumerate(timestamps):
+            cached = _shap_row_cache.get((explainer_key, timestamp)) if explainer_key else None
+            if cached is None:
+                missing.append(i)
+            else:
+                predictions[i], shap_values[i] = cached
+        missing = np.array([i for i in missing if positions[i] >= self.inference_window], dtype=np.int64)
+        if len(missing) == 0:
+            return feature_names, predictions, shap_values
+
+        # 창마다 feature를 만들므로 행 값은 요청 구간과 무관하다 (시점별 캐시가 안전)
+        valid, rows = self._window_feature_rows(data_df, positions[missing])
+        missing = missing[valid]
+        if len(missing) == 0:
+            return feature_names, predictions, shap_values
+        rows = rows[feature_names]
+
+        explainer = self._get_explainer(train_df)
+        shap_values[missing] = explainer(rows).values
+        predictions[missing] = self._to_pct_change(self.model.predict(rows.to_numpy()))
+        if explainer_key:
+            for i in missing:
+                _shap_row_cache.put((explainer_key, timestamps[i]), (predictions[i], shap_values[i].copy()))
+        return feature_names, predictions, shap_values
+
+    def _explainer_cache_key(self, train_df: pd.DataFrame) -> tuple | None:
+        if self.artifact_key is None:
+            return None
+        # path-dependent 모드는 background가 필요 없으므로 모델 파일만으로 키를 만든다
+        path_dependent = SHAP_FEATURE_PERTURBATION == "tree_path_dependent"
+        data_key = None if path_dependent else (train_df.index[0], train_df.index[-1], len(train_df), SHAP_BACKGROUND_SIZE, SHAP_BACKGROUND_METHOD)
+        return self.artifact_key, SHAP_FEATURE_PERTURBATION, data_key
+
+    def _get_explainer(self, train_df: pd.DataFrame) -> shap.TreeExplainer:
+        path_dependent = SHAP_FEATURE_PERTURBATION == "tree_path_dependent"
+        cache_key = self._explainer_cache_key(train_df)
+        if cache_key is not None:
+            explainer = _explainer_cache.get(cache_key)
+            if explainer is not None:
+                return explainer
+
+        train_fe = self.build_features(train_df).dropna()
+        if path_dependent:
+            explainer = shap.TreeExplainer(self.model, feature_perturbation="tree_path_dependent", model_output="raw")
+        else:
+            background = summarize_background(train_fe, SHAP_BACKGROUND_SIZE, SHAP_BACKGROUND_METHOD)
+            explainer = shap.TreeExplainer(
+                self.model,
+                data=background,
+                feature_perturbation="interventional",
+                model_output="raw"
+            )
+        if SHAP_TOLERANCE_PROBE_ROWS > 0:
+            self._log_shap_tolerance(explainer, train_fe, SHAP_TOLERANCE_PROBE_ROWS)
+        if cache_key is not None:
+            _explainer_cache.put(cache_key, explainer)
+        return explainer
+
+    def _log_shap_tolerance(self, explainer: shap.TreeExplainer, train_fe: pd.DataFrame, probe_rows: int) -> float:
+        # 요약 background(또는 path-dependent) 값과 전체 학습 데이터 background 값의 차이를 한 번만 측정
+        probe = train_fe.iloc[np.linspace(0, len(train_fe) - 1, probe_rows).astype(int)]
+        reference = shap.TreeExplainer(self.model, data=train_fe, feature_perturbation="interventional", model_output="raw")
+        expected = reference(probe).values
+        approx = explainer(probe).values
+        max_abs_error = float(np.abs(approx - expected).max())
+        scale = float(np.abs(expected).max()) or 1.0
+        logger.info(
+            "SHAP explainer (%s, background=%d, %s): max abs error %.3g (%.1f%% of max |shap|) over %d probe rows",
+            SHAP_FEATURE_PERTURBATION, SHAP_BACKGROUND_SIZE, SHAP_BACKGROUND_METHOD,
+            max_abs_error, max_abs_error / scale * 100, len(probe),
+        )
+        return max_abs_error
+
     def get_reference_train_data(self, train_df: pd.DataFrame, inference_df: pd.DataFrame, top_k: int = 5) -> dict:
         if self.model is None:
             raise RuntimeError("Model is not trained or loaded.")
 
-        train_fe = self._feature_engineering(train_df).dropna()
-        infer_fe = self._feature_engineering(inference_df).dropna()
-        drop_cols = ["open", "high", "low", "close", "volume", "value"]
-        train_fe = train_fe.drop(columns=drop_cols, errors="ignore")
-        infer_fe = infer_fe.drop(columns=drop_cols, errors="ignore")
+        train_leaf, train_index = self._get_train_leaf_index(train_df)
 
         # 마지막 시점을 기준으로
-        ref_ts = infer_fe.index[-1]
-        ref_row = infer_fe.iloc[[-1]]
-
-        train_leaf = np.array(self.model.predict(train_fe, pred_leaf=True))
-        ref_leaf = np.array(self.model.predict(ref_row, pred_leaf=True))
-
-        train_leaf = train_leaf.reshape(train_fe.shape[0], -1)
-        ref_leaf = ref_leaf.reshape(-1)
+        ref_row = self._window_features(inference_df)
+        ref_leaf = np.array(self.model.predict(ref_row, pred_leaf=True)).reshape(-1)
 
         n_trees = train_leaf.shape[1]
-        shared_ratio = (train_leaf == ref_leaf).sum(axis=1) / n_trees
-
-        top_idx = np.argsort(-shared_ratio)[:top_k]
+        top_idx, match_counts = top_k_matches(train_leaf, ref_leaf, top_k)
         similar_samples = [
-            {"timestamp": str(train_fe.index[i]), "similarity": float(shared_ratio[i])}
-            for i in top_idx
+            {"timestamp": str(pd.Timestamp(train_index[i])), "similarity": float(count / n_trees)}
+            for i, count in zip(top_idx, match_counts)
         ]
         return similar_samples
 
-    def train(self, train_df: pd.DataFrame, hyperparams: dict) -> None:
-        self.hyperparams = hyperparams
-
-        lgb_hyperparams = {
-            'objective': 'regression_l1',
-            'metric': 'l1',
-            'boosting_type': 'gbdt',
-            'learning_rate': self._get_hyperparams('learning_rate'),
-            'num_leaves': self._get_hyperparams('num_leaves'),
-            'feature_fraction': self._get_hyperparams('feature_fraction'),
-            'min_data_in_leaf': self._get_hyperparams('min_data_in_leaf'),
-            "n_jobs": -1,
-        }
-
-        data_df = self._feature_engineering(train_df).dropna()
-        X = data_df.copy()
-        X.drop(columns=["open", "high", "low", "close", "volume"], inplace=True)
+    def _get_train_leaf_index(self, train_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        # 학습 데이터의 트리별 leaf 번호는 모델 파일/학습 구간마다 한 번만 계산해 디스크에 둔다
+        cache_key = None
+        if self.artifact_key is not None:
+            cache_key = leaf_index_key(self.artifact_key, train_df, FEATURE_VERSION)
+            cached = load_leaf_index(cache_key)
+            if cached is not None:
+                return cached
 
+        train_fe = self.build_features(train_df).dropna()
+        train_leaf = np.array(self.model.predict(train_fe, pred_leaf=True))
+        train_leaf = compact_leaf_matrix(train_leaf.reshape(train_fe.shape[0], -1))
+        train_index = train_fe.index.to_numpy()
+        if cache_key is not None:
+            store_leaf_index(cache_key, train_leaf, train_index)
+        return train_leaf, train_index
+
+    def train(self, train_df: pd.DataFrame, hyperparams: dict, n_jobs: int = -1) -> None:
+        train_set, X_all = self.build_training_dataset(train_df)
+        self._fit(train_set, X_all, hyperparams, n_jobs)
+
+    def build_training_dataset(self, train_df: pd.DataFrame) -> tuple[lgb.Dataset, np.ndarray]:
+        # 같은 구간/feature 버전이면 feature 계산과 binning을 건너뛰고 캐시를 쓴다
+        cache_key = dataset_cache_key(train_df, FEATURE_VERSION)
+        cached = load_cached_dataset(cache_key)
+        if cached is not None:
+            return cached
+
+        # action과 같은 창별 feature로 학습한다
+        features_df = self.build_features(train_df)
         # 로그 수익률 target
-        y = np.log(data_df["close"].shift(-1) / data_df["close"])
-
-        X_valid_idx = X.isna().sum(axis=1) == 0
-        y_valid_idx = y.notna()
-        valid_idx = X_valid_idx & y_valid_idx
-        X = X[valid_idx]
-        y = y[valid_idx]
-
-        def balance_indices(y, random_state=42):
-            rng = np.random.default_rng(random_state)
-            pos_idx = np.where(y > 0)[0]
-            neg_idx = np.where(y <= 0)[0]
-            
-            n = min(len(pos_idx), len(neg_idx))
-            pos_sample = rng.choice(pos_idx, n, replace=False)
-            neg_sample = rng.choice(neg_idx, n, replace=False)
-            
-            sel_idx = np.sort(np.concatenate([pos_sample, neg_sample]))
-            return sel_idx
-
-        sel_idx = balance_indices(y)
-        X = X.iloc[sel_idx]
-        y = y.iloc[sel_idx]
+        target = self.build_target(train_df)
+        X_all, y_all = self.prepare_training_data(features_df, target, balance=False)
+        rows = self.balance_rows(y_all)
+        train_set = self.make_dataset(X_all[rows], y_all[rows], features_df.columns).construct()
+        store_cached_dataset(cache_key, train_set, X_all)
+        return train_set, X_all
+
+    def train_features(self, features_df: pd.DataFrame, target: pd.Series, hyperparams: dict, n_jobs: int = -1) -> None:
+        X_all, y_all = self.prepare_training_data(features_df, target, balance=False)
+        rows = self.balance_rows(y_all)
+        train_set = self.make_dataset(X_all[rows], y_all[rows], features_df.columns)
+        self._fit(train_set, X_all, hyperparams, n_jobs)
+
+    def continue_training(self, features_df: pd.DataFrame, target: pd.Series, num_boost_round: int, n_jobs: int = -1) -> None:
+        # 기존 booster 위에 트리를 이어 붙인다 (init_model)
+        if self.model is None:
+            raise RuntimeError("Model is not trained or loaded.")
+        feature_names = self.model.feature_name()
+        X, y = self.prepare_training_data(features_df[feature_names], target)
+        train_set = self.make_dataset(X, y, feature_names)
+        self.model = lgb.train(
+            params=self.lgb_params(n_jobs),
+            train_set=train_set,
+            num_boost_round=num_boost_round,
+            init_model=self.model,
+        )
+        self.artifact_key = None
+
+    def _fit(self, train_set: lgb.Dataset, X_all: np.ndarray, hyperparams: dict, n_jobs: int = -1) -> None:
+        self.hyperparams = hyperparams
 
         def tqdm_bar_callback(total_rounds):
             pbar = tqdm(total=total_rounds, desc="LightGBM Training", leave=True)
@@ -210,79 +420,75 @@ class LightGBMStrategy(Strategy):
                     pbar.close()
             return _callback
 
-        lgb_dataset = lgb.Dataset(X, label=y)
         self.model = lgb.train(
-            params=lgb_hyperparams,
-            train_set=lgb_dataset,
+            params=self.lgb_params(n_jobs),
+            train_set=train_set,
             num_boost_round=self._get_hyperparams('num_boost_round'),
             callbacks=[tqdm_bar_callback(self._get_hyperparams('num_boost_round'))]
         )
         print(self.model.params)
+        self.artifact_key = None
+        self.update_prediction_stats(X_all)
 
-    def _feature_engineering(self, df: pd.DataFrame) -> pd.DataFrame:
-        data_df = df.copy()
-        trade_value = data_df["close"] * data_df["volume"]
-        data_df["trade_value_z_score"] = (trade_value - trade_value.mean()) / trade_value.std()
-
-        # 퍼센트 차이
-        time_diffs = [1, 2, 3, 6, 12, 24, 48]
-        for time_diff in time_diffs:
-            data_df[f"price_pct_change_{time_diff}h"] = data_df["close"].pct_change(time_diff, fill_method=None)
-            data_df[f"trade_value_pct_change_{time_diff}h"] = trade_value.pct_change(time_diff, fill_method=None)
-
-        # 표준편차
-        time_windows = [4, 12, 24]
-        for time_window in time_windows:
-            data_df[f"price_std_{time_window}"] = data_df["close"].rolling(time_window).std()
-
-        # 볼린저 밴드
-        hband = ta.volatility.BollingerBands(data_df["close"]).bollinger_hband()
-        lband = ta.volatility.BollingerBands(data_df["close"]).bollinger_lband()
-        data_df['rel_dist_to_bb_upper'] = (hband - data_df["close"]) / data_df["close"]
-        data_df['rel_dist_to_bb_lower'] = (data_df["close"] - lband) / data_df["close"]
-
-        # RSI
-        data_df['rsi'] = ta.momentum.RSIIndicator(data_df["close"]).rsi()
-        time_diffs = [2, 6, 24]
-        for time_diff in time_diffs:
-            data_df[f'rsi_pct_change_{time_diff}'] = data_df['rsi'].pct_change(time_diff, fill_method=None)
-
-        # ADX
-        data_df['adx'] = ta.trend.ADXIndicator(data_df["high"], data_df["low"], data_df["close"]).adx()
-
-        # MACD
-        macd = ta.trend.MACD(data_df["close"]).macd()
-        macd_signal = ta.trend.MACD(data_df["close"]).macd_signal()
-        time_diffs = [2, 6, 24]
-        for time_diff in time_diffs:
-            data_df[f'macd_pct_change_{time_diff}'] = macd.pct_change(time_diff, fill_method=None)
-        data_df['rel_dist_to_signal'] = (macd - macd_signal) / macd
-
-        # 최근 봉 관련 지표
-        for shift_interval in range(5):
-            close = data_df["close"].shift(shift_interval)
-            open = data_df["open"].shift(shift_interval)
-            high = data_df["high"].shift(shift_interval)
-            low = data_df["low"].shift(shift_interval)
-
-            body = abs(close - open)
-            rng = (high - low).replace(0, np.nan)
-            upper_wick = high - np.maximum(open, close)
-            lower_wick = np.minimum(open, close) - low
-            data_df[f"body_frac_{shift_interval}"] = body / rng
-            data_df[f"upper_wick_frac_{shift_interval}"] = upper_wick / rng
-            data_df[f"lower_wick_frac_{shift_interval}"] = lower_wick / rng
-            data_df[f'cur_pct_change_{shift_interval}'] = (close - open) / open
-
-        # 시간 feature
-        data_df["hour"] = data_df.index.hour
-        return data_df
+    def lgb_params(self, n_jobs: int = -1) -> dict:
+        return {
+            'objective': 'regression_l1',
+            'metric': 'l1',
+            'boosting_type': 'gbdt',
+            'learning_rate': self._get_hyperparams('learning_rate'),
+            'num_leaves': self._get_hyperparams('num_leaves'),
+            'feature_fraction': self._get_hyperparams('feature_fraction'),
+            'min_data_in_leaf': self._get_hyperparams('min_data_in_leaf'),
+            "n_jobs": n_jobs,
+        }
+
+    @staticmethod
+    def make_dataset(X: np.ndarray, y: np.ndarray, feature_names, reference: lgb.Dataset | None = None) -> lgb.Dataset:
+        # reference가 있으면 binning 설정을 reference에서 물려받는다
+        params = DATASET_PARAMS if reference is None else None
+        return lgb.Dataset(X, label=y, feature_name=list(feature_names), reference=reference, params=params)
+
+    def prepare_training_data(self, features_df: pd.DataFrame, target: pd.Series, balance: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        # float32로 한 번만 변환하고, 유효 행 필터와 균형 샘플링은 행 번호로 모아 한 번에 뽑는다
+        X = features_df.to_numpy(dtype=np.float32)
+        y = np.asarray(target, dtype=np.float32)
+        rows = np.flatnonzero(~np.isnan(X).any(axis=1) & ~np.isnan(y))
+        if balance:
+            rows = rows[self.balance_rows(y[rows])]
+        if len(rows) == len(X):
+            return X, y
+        return X[rows], y[rows]
+
+    @staticmethod
+    def balance_rows(y: np.ndarray, random_state: int = 42) -> np.ndarray:
+        # 상승/하락 샘플 수를 맞춘 행 번호 (시간 순 정렬)
+        rng = np.random.default_rng(random_state)
+        pos_idx = np.flatnonzero(y > 0)
+        neg_idx = np.flatnonzero(y <= 0)
+
+        n = min(len(pos_idx), len(neg_idx))
+        pos_sample = rng.choice(pos_idx, n, replace=False)
+        neg_sample = rng.choice(neg_idx, n, replace=False)
+        return np.sort(np.concatenate([pos_sample, neg_sample]))
+
+    def update_prediction_stats(self, X: np.ndarray) -> None:
+        # 백분위 계산용 예측 분포 (model_stats.json에 기록됨)
+        predictions = self._to_pct_change(self.model.predict(X))
+        self.prediction_stats = {
+            "mean": float(np.mean(predictions)),
+            "std": float(np.std(predictions)),
+        }
+
+    def build_target(self, df: pd.DataFrame) -> pd.Series:
+        # 다음 봉의 로그 수익률; build_features와 같은 인덱스
+        return np.log(df["close"].shift(-1) / df["close"])
 
     def load(self, path: str) -> None:
         with open(path, "r", encoding="utf-8") as f:
             payload = json.load(f)
             self.model = lgb.Booster(model_str=payload["model_str"])
             self.hyperparams = payload["hyperparams"]
+        self.artifact_key = artifact_key(path)
 
     def save(self, path: str) -> None:
         payload = {
@@ -292,4 +498,166 @@ class LightGBMStrategy(Strategy):
         with open(path, "w", encoding="utf-8") as f:
             json.dump(payload, f)
 
-        
+
+def _feature_panels(df: pd.DataFrame, ends: np.ndarray, window: int) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Features of the windows ``df.iloc[end - window:end]`` for every ``end``.
+
+    Each window is one column of a ``(window, len(ends))`` panel and every
+    indicator runs down the columns, so a window warms up from its own first
+    row exactly as if it were computed alone. The indicators follow the
+    formulas (and operation order) of the ``ta`` package. Returns the feature
+    names, a ``(features, window, len(ends))`` array and a ``(window, len(ends))``
+    mask of rows whose raw and feature values are all present.
+    """
+    rows = np.asarray(ends, dtype=np.int64)[None, :] - window + np.arange(window)[:, None]
+
+    def panel(values) -> pd.DataFrame:
+        return pd.DataFrame(np.asarray(values, dtype=np.float64)[rows])
+
+    open_, high, low, close, volume = (panel(df[column]) for column in ("open", "high", "low", "close", "volume"))
+    features = {}
+    trade_value = close * volume
+    features["trade_value_z_score"] = (trade_value - trade_value.mean()) / trade_value.std()
+
+    # 퍼센트 차이
+    time_diffs = [1, 2, 3, 6, 12, 24, 48]
+    for time_diff in time_diffs:
+        features[f"price_pct_change_{time_diff}h"] = close.pct_change(time_diff, fill_method=None)
+        features[f"trade_value_pct_change_{time_diff}h"] = trade_value.pct_change(time_diff, fill_method=None)
+
+    # 표준편차
+    time_windows = [4, 12, 24]
+    for time_window in time_windows:
+        features[f"price_std_{time_window}"] = close.rolling(time_window).std()
+
+    # 볼린저 밴드 (20, 2)
+    bollinger_mavg = close.rolling(20, min_periods=20).mean()
+    bollinger_mstd = close.rolling(20, min_periods=20).std(ddof=0)
+    features['rel_dist_to_bb_upper'] = ((bollinger_mavg + 2 * bollinger_mstd) - close) / close
+    features['rel_dist_to_bb_lower'] = (close - (bollinger_mavg - 2 * bollinger_mstd)) / close
+
+    # RSI
+    rsi = _rsi(close)
+    features['rsi'] = rsi
+    time_diffs = [2, 6, 24]
+    for time_diff in time_diffs:
+        features[f'rsi_pct_change_{time_diff}'] = rsi.pct_change(time_diff, fill_method=None)
+
+    # ADX
+    features['adx'] = _adx(high.to_numpy(), low.to_numpy(), close.to_numpy())
+
+    # MACD (26, 12, 9)
+    macd = _ema(close, 12) - _ema(close, 26)
+    macd_signal = _ema(macd, 9)
+    time_diffs = [2, 6, 24]
+    for time_diff in time_diffs:
+        features[f'macd_pct_change_{time_diff}'] = macd.pct_change(time_diff, fill_method=None)
+    features['rel_dist_to_signal'] = (macd - macd_signal) / macd
+
+    # 최근 봉 관련 지표
+    for shift_interval in range(5):
+        close_shifted = close.shift(shift_interval)
+        open_shifted = open_.shift(shift_interval)
+        high_shifted = high.shift(shift_interval)
+        low_shifted = low.shift(shift_interval)
+
+        body = abs(close_shifted - open_shifted)
+        rng = (high_shifted - low_shifted).replace(0, np.nan)
+        upper_wick = high_shifted - np.maximum(open_shifted, close_shifted)
+        lower_wick = np.minimum(open_shifted, close_shifted) - low_shifted
+        features[f"body_frac_{shift_interval}"] = body / rng
+        features[f"upper_wick_frac_{shift_interval}"] = upper_wick / rng
+        features[f"lower_wick_frac_{shift_interval}"] = lower_wick / rng
+        features[f'cur_pct_change_{shift_interval}'] = (close_shifted - open_shifted) / open_shifted
+
+    # 시간 feature
+    features["hour"] = panel(df.index.hour)
+
+    names = list(features)
+    values = np.stack([np.asarray(features[name], dtype=np.float64) for name in names])
+    # 원시 컬럼까지 포함해 dropna()와 같은 기준으로 완전한 행을 고른다
+    complete = ~(np.isnan(values).any(axis=0) | df.isna().any(axis=1).to_numpy()[rows])
+    return names, values, complete
+
+
+def _ema(values: pd.DataFrame, span: int) -> pd.DataFrame:
+    # ta.trend의 EMA: adjust=False, 첫 span-1개는 NaN
+    return values.ewm(span=span, min_periods=span, adjust=False).mean()
+
+
+def _rsi(close: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+    # ta.momentum.RSIIndicator
+    diff = close.diff(1)
+    up_direction = diff.where(diff > 0, 0.0)
+    down_direction = -diff.where(diff < 0, 0.0)
+    emaup = up_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    emadn = down_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    relative_strength = emaup / emadn
+    return pd.DataFrame(np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength))))
+
+
+def _adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """``ta.trend.ADXIndicator(...).adx()`` down each column of the panels.
+
+    Keeps ta's seeding and recurrences as they are (including the last
+    smoothed row it leaves at zero); assumes no missing raw values.
+    """
+    length, count = close.shape
+    missing = np.full((1, count), np.nan)
+    close_shift = np.concatenate([missing, close[:-1]])
+    true_range = np.maximum(high, close_shift) - np.minimum(low, close_shift)
+    diff_up = high - np.concatenate([missing, high[:-1]])
+    diff_down = np.concatenate([missing, low[:-1]]) - low
+    pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+    neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+
+    smoothed_length = length - (window - 1)
+
+    def smooth(values: np.ndarray) -> np.ndarray:
+        smoothed = np.zeros((smoothed_length, count))
+        # 첫 행은 NaN이므로 dropna() 후 window개의 합; 합산 순서를 맞추려고 창마다 연속된 배열에서 더한다
+        smoothed[0] = np.ascontiguousarray(values[1:window + 1].T).sum(axis=1)
+        for i in range(1, smoothed_length - 1):
+            smoothed[i] = smoothed[i - 1] - (smoothed[i - 1] / float(window)) + values[window + i]
+        return smoothed
+
+    trs, dip, din = smooth(true_range), smooth(pos), smooth(neg)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dip = np.where(trs != 0, 100 * (dip / trs), 0)
+        din = np.where(trs != 0, 100 * (din / trs), 0)
+        directional_index = np.where(dip + din != 0, 100 * np.abs((dip - din) / (dip + din)), 0)
+
+    adx = np.zeros((smoothed_length, count))
+    adx[window] = np.ascontiguousarray(directional_index[0:window].T).mean(axis=1)
+    for i in range(window + 1, smoothed_length):
+        adx[i] = ((adx[i - 1] * (window - 1)) + directional_index[i - 1]) / float(window)
+    return np.concatenate([np.zeros((window - 1, count)), adx])
+
+
+def summarize_background(features_df: pd.DataFrame, size: int, method: str = "kmeans", seed: int = 0) -> pd.DataFrame:
+    """Pick ``size`` representative rows of ``features_df`` as a SHAP background.
+
+    ``kmeans`` clusters the standardised rows and keeps the real row nearest to
+    each centroid; ``sample`` takes one random row from each of ``size``
+    chronological blocks.
+    """
+    if size <= 0 or len(features_df) <= size:
+        return features_df
+    if method == "sample":
+        rng = np.random.default_rng(seed)
+        blocks = np.array_split(np.arange(len(features_df)), size)
+        rows = np.array([rng.choice(block) for block in blocks])
+        return features_df.iloc[rows]
+    if method != "kmeans":
+        raise ValueError(f"Unknown SHAP background method: {method}")
+
+    values = features_df.to_numpy(dtype=np.float64)
+    finite_rows = np.flatnonzero(np.isfinite(values).all(axis=1))
+    values = values[finite_rows]
+    scale = values.std(axis=0)
+    scale[scale == 0] = 1.0
+    normalized = (values - values.mean(axis=0)) / scale
+    centroids, _ = kmeans2(normalized, size, seed=seed, minit="points")
+    # 중심점 자체가 아닌 실제 관측 행을 background로 쓴다
+    nearest, _ = vq(centroids, normalized)
+    return features_df.iloc[finite_rows[np.unique(nearest)]]
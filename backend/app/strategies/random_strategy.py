@@ -1,4 +1,5 @@
 import random
+import numpy as np
 import pandas as pd
 import json
 
@@ -12,10 +13,12 @@ class RandomStrategy(Strategy):
         'buy_prob': {
             'default': 0.3,
             'type': 'float',
+            'signal': True,
         },
         'sell_prob': {
             'default': 0.3,
             'type': 'float',
+            'signal': True,
         }
     }
 
@@ -45,6 +48,20 @@ class RandomStrategy(Strategy):
             amount = 0.0
         return action, amount
 
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        return np.random.random(len(df))
+
+    def signals_batch(self, df: pd.DataFrame, predictions: np.ndarray | None = None) -> np.ndarray:
+        buy_prob = self.hyperparams.get('buy_prob', 0.3)
+        sell_prob = self.hyperparams.get('sell_prob', 0.3)
+        if predictions is None:
+            predictions = self.predict_batch(df)
+
+        signals = np.zeros(len(predictions), dtype=np.int8)
+        signals[predictions < buy_prob + sell_prob] = -1
+        signals[predictions < buy_prob] = 1
+        return signals
+
     def train(self, train_df: pd.DataFrame, hyperparams: dict) -> None:
         self.hyperparams = hyperparams
 
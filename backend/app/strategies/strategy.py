@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 
 class Strategy(ABC):
@@ -11,6 +12,25 @@ class Strategy(ABC):
     def action(self, inference_df: pd.DataFrame, cash_balance: float, coin_balance: float) -> tuple[int, float]:
         pass
 
+    @abstractmethod
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """Model output for every row of ``df``.
+
+        Element ``i`` is exactly the output ``action`` bases its decision on when
+        given the ``inference_window`` rows ending at row ``i``; rows without a
+        full window are ``NaN``. Strategies whose ``action`` is random draw fresh
+        values with the same distribution instead.
+        """
+        pass
+
+    @abstractmethod
+    def signals_batch(self, df: pd.DataFrame, predictions: np.ndarray | None = None) -> np.ndarray:
+        """Per-row actions (-1 sell, 0 hold, 1 buy) aligned with ``predict_batch``.
+
+        Pass ``predictions`` to reuse an earlier ``predict_batch`` result.
+        """
+        pass
+
     @abstractmethod
     def train(self, train_dataset: pd.DataFrame, hyperparams: dict) -> None:
         pass
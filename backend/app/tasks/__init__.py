@@ -1,6 +1,14 @@
 from app.tasks.backtest_task import backtest_task
+from app.tasks.backtest_sweep_task import backtest_sweep_task
 from app.tasks.train_task import train_task
+from app.tasks.walk_forward_task import walk_forward_task
+from app.tasks.hyperparam_search_task import hyperparam_search_task
 from app.tasks.explain_chart_task import explain_chart_task
 from app.tasks.explain_model_task import explain_model_task
+from app.tasks.explain_range_task import explain_range_task
 from app.tasks.ohlcv_ingest_task import collect_latest_ohlcv
+from app.tasks.window_index_task import update_window_indexes_task
+from app.tasks.market_snapshot_task import build_market_snapshots_task
+from app.tasks.model_output_task import backfill_model_outputs_task, update_model_outputs_task
+from app.tasks.model_refresh_task import refresh_all_models_task, refresh_model_task
 from app.tasks.score_chart_task import score_chart_task
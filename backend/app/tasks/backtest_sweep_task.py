@@ -0,0 +1,68 @@
+import itertools
+
+import pandas as pd
+
+from app.celery_app import celery_app
+from app.utils.model_load_utils import get_strategy_class
+from app.utils.data_utils import get_ohlcv_df
+from app.utils.backtest_utils import run_vectorized_backtest
+from app.utils.parallel_utils import parallel_map
+from app.services.model_output_service import compute_window_predictions, load_strategy
+
+SWEEP_RANK_KEYS = ("total_return", "win_rate", "trade_count")
+
+
+@celery_app.task(bind=True)
+def backtest_sweep_task(self, model_name: str, param_name: str, coin_symbol: str, timeframe: int, start: str, end: str, param_grid: dict, rank_by: str = "total_return") -> list[dict]:
+    if rank_by not in SWEEP_RANK_KEYS:
+        raise ValueError(f"Unknown rank key: {rank_by}. Available: {list(SWEEP_RANK_KEYS)}")
+    start, end = pd.to_datetime(start), pd.to_datetime(end)
+    strategy_class = get_strategy_class(model_name)
+    combinations = expand_param_grid(strategy_class.hyperparam_schema, param_grid)
+
+    cur_strategy, _ = load_strategy(model_name, param_name)
+
+    data_df = get_ohlcv_df(coin_symbol, timeframe)
+    data_df = data_df.loc[start:end]
+
+    # 창별 정확한 출력은 한 번만 계산하고 모든 조합이 공유한다
+    predictions = compute_window_predictions(model_name, param_name, data_df)
+    shared = {
+        "model_name": model_name,
+        "hyperparams": dict(cur_strategy.hyperparams),
+        "predictions": predictions,
+        "open": data_df["open"].to_numpy(),
+        "close": data_df["close"].to_numpy(),
+    }
+    rows = parallel_map(_evaluate_combination, combinations, shared=shared)
+
+    rows.sort(key=lambda row: row[rank_by], reverse=True)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def expand_param_grid(hyperparam_schema: dict, param_grid: dict) -> list[dict]:
+    # 예측값은 한 번만 계산해 공유하므로 신호 변환에만 쓰이는 값만 바꿀 수 있다
+    signal_params = [name for name, spec in hyperparam_schema.items() if spec.get("signal")]
+    unknown = [name for name in param_grid if name not in signal_params]
+    if unknown:
+        raise ValueError(f"Only signal hyperparameters can be swept: {unknown}. Available: {signal_params}")
+    empty = [name for name, values in param_grid.items() if len(values) == 0]
+    if empty:
+        raise ValueError(f"Empty value lists: {empty}")
+    casts = {"float": float, "int": int}
+    names = list(param_grid.keys())
+    values = [
+        [casts.get(hyperparam_schema[name]["type"], lambda v: v)(v) for v in param_grid[name]]
+        for name in names
+    ]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def _evaluate_combination(params: dict, shared: dict) -> dict:
+    strategy = get_strategy_class(shared["model_name"])()
+    strategy.hyperparams = {**shared["hyperparams"], **params}
+    signals = strategy.signals_batch(None, shared["predictions"])
+    result = run_vectorized_backtest(shared["open"], shared["close"], signals)
+    return {"params": params, **result}
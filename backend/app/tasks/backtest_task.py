@@ -4,8 +4,12 @@ import backtrader as bt
 from app.celery_app import celery_app
 from app.utils.model_load_utils import get_strategy_class, get_param_path
 from app.utils.data_utils import get_ohlcv_df
+from app.utils.backtest_utils import INITIAL_CASH, COMMISSION, run_vectorized_backtest
+from app.services.model_output_service import compute_window_predictions
 from app.strategies.strategy import Strategy
 
+BACKTEST_ENGINES = ("backtrader", "vectorized")
+
 class BacktestStrategy(bt.Strategy):
     def __init__(self, strategy_instance: Strategy, data_df: pd.DataFrame):
         self.strategy_instance = strategy_instance
@@ -35,7 +39,9 @@ class BacktestStrategy(bt.Strategy):
 
 
 @celery_app.task(bind=True)
-def backtest_task(self, model_name: str, param_name: str, coin_symbol: str, timeframe: int, start: str, end: str) -> dict:
+def backtest_task(self, model_name: str, param_name: str, coin_symbol: str, timeframe: int, start: str, end: str, engine: str = "backtrader") -> dict:
+    if engine not in BACKTEST_ENGINES:
+        raise ValueError(f"Unknown backtest engine: {engine}. Available: {list(BACKTEST_ENGINES)}")
     start, end = pd.to_datetime(start), pd.to_datetime(end)
     strategy_class = get_strategy_class(model_name)
     cur_strategy = strategy_class()
@@ -45,12 +51,21 @@ def backtest_task(self, model_name: str, param_name: str, coin_symbol: str, time
     data_df = get_ohlcv_df(coin_symbol, timeframe)
     data_df = data_df.loc[start:end]
 
+    if engine == "vectorized":
+        # backtrader가 보는 창과 같은 끝 위치마다 정확한 출력으로 신호를 만든다
+        predictions = compute_window_predictions(model_name, param_name, data_df)
+        signals = cur_strategy.signals_batch(data_df, predictions)
+        return run_vectorized_backtest(data_df["open"].to_numpy(), data_df["close"].to_numpy(), signals)
+    return _run_backtrader(cur_strategy, data_df)
+
+
+def _run_backtrader(cur_strategy: Strategy, data_df: pd.DataFrame) -> dict:
     cerebro = bt.Cerebro()
     cerebro.addstrategy(BacktestStrategy, strategy_instance=cur_strategy, data_df=data_df)
     cerebro.adddata(bt.feeds.PandasData(dataname=data_df))
 
-    cerebro.broker.setcash(1000000.0)
-    cerebro.broker.setcommission(commission=0.0005)
+    cerebro.broker.setcash(INITIAL_CASH)
+    cerebro.broker.setcommission(commission=COMMISSION)
     cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='ta')
     cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
 
@@ -1,85 +1,95 @@
+from typing import Callable
+
 import numpy as np
 import pandas as pd
-import openai
-import ta
-from dtaidistance import dtw
 
 from app.celery_app import celery_app
-from app.utils.data_utils import get_ohlcv_df
+from app.services.chart_feature_service import ADDITIONAL_FEATURE_NAMES, DEFAULT_HISTORY_WINDOW, get_chart_features
+from app.utils.data_utils import get_configured_coin_symbols, get_ohlcv_history_df
+from app.utils.dtw_search_utils import normalize_query, top_k_dtw
+from app.utils.window_index_utils import (
+    MultiWindowIndex, WindowIndex, load_multi_window_index, load_window_index, refresh_window_index,
+)
+from app.services.llm_service import chat_completion, stream_chat_completion
+from app.services.llm_stream_service import LLMStreamPublisher
+
+SIMILAR_CHART_WINDOW_SIZE = 24
+SIMILAR_CHART_MIN_GAP = 12
 
 @celery_app.task(bind=True)
-def explain_chart_task(self, coin_symbol: str, timeframe: int, inference_time: str, start: str, end: str) -> dict:
-    total_df = get_ohlcv_df(
-        coin_symbol=coin_symbol,
-        timeframe=timeframe
-    )
+def explain_chart_task(self, coin_symbol: str, timeframe: int, inference_time: str, start: str, end: str,
+                       cross_symbol: bool = False, similar_symbols: list[str] | None = None) -> dict:
+    if similar_symbols and not cross_symbol:
+        raise ValueError("similar_symbols requires cross_symbol=True.")
     INFERENCE_WINDOW_SIZE = 100
     inference_timestamp = pd.Timestamp(inference_time).tz_localize(None)
-    inference_iloc = total_df.index.get_loc(inference_timestamp)
-    inference_df = total_df.iloc[inference_iloc - INFERENCE_WINDOW_SIZE + 1:inference_iloc + 1]
+    # 전체 이력 대신 추론 창과 차트 지표 계산에 필요한 봉만 읽는다
+    history_df = get_ohlcv_history_df(coin_symbol, timeframe, inference_timestamp,
+                                      max(INFERENCE_WINDOW_SIZE, DEFAULT_HISTORY_WINDOW))
+    inference_iloc = history_df.index.get_loc(inference_timestamp)
+    inference_df = history_df.iloc[inference_iloc - INFERENCE_WINDOW_SIZE + 1:inference_iloc + 1]
 
     explanation = {}
     print('Finding similar charts...')
     start_timestamp = pd.Timestamp(start).tz_localize(None)
     end_timestamp = pd.Timestamp(end).tz_localize(None)
-    chart_df = total_df.loc[start_timestamp:end_timestamp]
     # 인퍼런스 시점이 포함된 구간은 유사도 계산 대상에서 제외
     inference_start = inference_df.index[0]
     inference_end = inference_df.index[-1]
-    chart_df = chart_df.loc[(chart_df.index < inference_start) | (chart_df.index > inference_end)]
-    similar_charts = get_similar_charts(
-        chart_df=chart_df,
-        inference_df=inference_df,
-        top_k=4
-    )
+    # 인덱스는 수집 task가 갱신하므로 읽기만 한다 (갱신용 파일 잠금을 요청마다 잡지 않음)
+    window_index = load_window_index(coin_symbol, timeframe, SIMILAR_CHART_WINDOW_SIZE)
+    if window_index is None:
+        # 수집 task가 아직 만들지 않은 심볼만 여기서 한 번 (전체 이력을 읽어) 만든다
+        window_index = refresh_window_index(coin_symbol, timeframe, SIMILAR_CHART_WINDOW_SIZE)
+    if cross_symbol:
+        coin_symbols = [symbol.upper() for symbol in similar_symbols or get_configured_coin_symbols(timeframe)]
+        multi_index = load_multi_window_index(coin_symbols, timeframe, SIMILAR_CHART_WINDOW_SIZE)
+        similar_charts = get_similar_charts_across_symbols(
+            multi_index=multi_index,
+            inference_df=inference_df,
+            top_k=4,
+            symbols=coin_symbols,
+            start=start_timestamp,
+            end=end_timestamp,
+            # 같은 시각의 다른 코인 차트도 인퍼런스 구간과 겹치면 제외 (시장 전체가 함께 움직여 자명하게 가깝다)
+            exclude={symbol: (inference_start, inference_end) for symbol in coin_symbols}
+        )
+    else:
+        similar_charts = get_similar_charts(
+            window_index=window_index,
+            inference_df=inference_df,
+            top_k=4,
+            start=start_timestamp,
+            end=end_timestamp,
+            exclude=(inference_start, inference_end)
+        )
     explanation["similar_charts"] = similar_charts
 
     print('Creating LLM explanation...')
-    chart_features = create_chart_features(inference_df)
+    chart_features = get_chart_features(coin_symbol, timeframe, inference_time, total_df=history_df)
+    # 점수용 파생 지표는 설명 프롬프트에 넣지 않는다
+    chart_features = {k: v for k, v in chart_features.items() if k not in ADDITIONAL_FEATURE_NAMES}
     key_feature_names = ['macd_diff', 'rsi', 'bollinger_band_upper', 'bollinger_band_lower', 'bollinger_band_mavg', 'ema_20', 'ema_60', 'adx', 'atr']
     feature_values = {k: v for k, v in chart_features.items() if k in key_feature_names}
     explanation["feature_values"] = feature_values
-    explanation_text = get_chart_explanation_text(chart_features)
+    llm_stream = LLMStreamPublisher(self.request.id)
+    explanation_text = get_chart_explanation_text(chart_features, on_delta=llm_stream.delta)
+    llm_stream.done(explanation_text)
     explanation["explanation_text"] = explanation_text
     return explanation
 
-def get_similar_charts(chart_df: pd.DataFrame, inference_df: pd.DataFrame, top_k: int) -> list[dict]:
-    WINDOW_SIZE = 24
+def get_similar_charts(window_index: WindowIndex, inference_df: pd.DataFrame, top_k: int,
+                       start: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+                       exclude: tuple[pd.Timestamp, pd.Timestamp] | None = None) -> list[dict]:
+    WINDOW_SIZE = window_index.window_size
     assert WINDOW_SIZE <= len(inference_df), "Inference data is shorter than window size."
-    inference_df = inference_df[-WINDOW_SIZE:].copy()
-
-    arr = np.asarray(chart_df['close'])
-    inputs = np.lib.stride_tricks.sliding_window_view(arr, WINDOW_SIZE, axis=0)
-    inputs = inputs.copy()
-    # inputs = (inputs - inputs.mean(axis=1, keepdims=True)) / (inputs.std(axis=1, keepdims=True) + 1e-12)
-    inputs_min = inputs.min(axis=1, keepdims=True)
-    inputs_max = inputs.max(axis=1, keepdims=True)
-    inputs = (inputs - inputs_min) / (inputs_max - inputs_min + 1e-12)
-
-    inference_data = np.asarray(inference_df['close'])
-    inference_data = (inference_data - inference_data.min()) / (inference_data.max() - inference_data.min() + 1e-12)
-
-    dists = []
-    for idx in range(len(inputs)):
-        cur_data = inputs[idx]
-        dist = dtw.distance_fast(inference_data, cur_data)
-        dists.append(dist)
-    dists = np.array(dists)
-
-    MIN_GAP = 12
-    sorted_idx = np.argsort(dists)
-    filtered = []
-    for i in sorted_idx:
-        if all(abs(i - j) >= MIN_GAP for j in filtered):
-            filtered.append(i)
-            if len(filtered) >= top_k:
-                break
-    topk_indices = np.array(filtered)
-    topk_distances = dists[topk_indices]
+    inference_data = normalize_query(np.asarray(inference_df['close'])[-WINDOW_SIZE:])
+
+    positions = window_index.shortlist(inference_data, window_index.positions_between(start, end, exclude))
+    topk_indices, topk_distances = top_k_dtw(inference_data, window_index.windows, top_k, SIMILAR_CHART_MIN_GAP, candidates=positions)
     results = []
     for i in range(len(topk_distances)):
-        end_idx = topk_indices[i] + WINDOW_SIZE - 1
-        timestamp = chart_df.index[end_idx]
+        timestamp = pd.Timestamp(window_index.end_timestamps[topk_indices[i]])
         distance = topk_distances[i]
         results.append({
             "timestamp": timestamp,
@@ -87,42 +97,25 @@ def get_similar_charts(chart_df: pd.DataFrame, inference_df: pd.DataFrame, top_k
         })
     return results
 
-def create_chart_features(inference_df: pd.DataFrame) -> dict:
-    chart_features = {}
-    for i in range(24):
-        row = inference_df.iloc[-i-1]
-        chart_features[f"close_{i}h"] = float(row['close'])
-        chart_features[f"volume_{i}h"] = float(row['volume'])
-        chart_features[f"high_{i}h"] = float(row['high'])
-        chart_features[f"low_{i}h"] = float(row['low'])
-        chart_features[f"open_{i}h"] = float(row['open'])
-
-    bb = ta.volatility.BollingerBands(inference_df['close'])
-    chart_features['bollinger_band_lower'] = float(bb.bollinger_lband().iloc[-1])
-    chart_features['bollinger_band_upper'] = float(bb.bollinger_hband().iloc[-1])
-    chart_features['bollinger_band_mavg'] = float(bb.bollinger_mavg().iloc[-1])
-    chart_features['rsi'] = float(ta.momentum.RSIIndicator(inference_df['close']).rsi().iloc[-1])
-    macd = ta.trend.MACD(inference_df['close'])
-    chart_features['macd'] = float(macd.macd().iloc[-1])
-    chart_features['macd_signal'] = float(macd.macd_signal().iloc[-1])
-    chart_features['macd_diff'] = float(macd.macd_diff().iloc[-1])
-
-    chart_features['ema_20'] = float(ta.trend.EMAIndicator(inference_df['close'], window=20).ema_indicator().iloc[-1])
-    chart_features['ema_60'] = float(ta.trend.EMAIndicator(inference_df['close'], window=60).ema_indicator().iloc[-1])
-
-    chart_features['adx'] = float(ta.trend.ADXIndicator(
-        high=inference_df['high'],
-        low=inference_df['low'],
-        close=inference_df['close']
-    ).adx().iloc[-1])
-    chart_features['atr'] = float(ta.volatility.AverageTrueRange(
-        high=inference_df['high'],
-        low=inference_df['low'],
-        close=inference_df['close']
-    ).average_true_range().iloc[-1])
-    return chart_features
-
-def get_chart_explanation_text(chart_features: dict) -> str:
+def get_similar_charts_across_symbols(multi_index: MultiWindowIndex, inference_df: pd.DataFrame, top_k: int,
+                                      symbols: list[str] | None = None,
+                                      start: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+                                      exclude: dict[str, tuple[pd.Timestamp, pd.Timestamp]] | None = None) -> list[dict]:
+    WINDOW_SIZE = SIMILAR_CHART_WINDOW_SIZE
+    assert WINDOW_SIZE <= len(inference_df), "Inference data is shorter than window size."
+    inference_data = normalize_query(np.asarray(inference_df['close'])[-WINDOW_SIZE:])
+
+    matches = multi_index.top_k(inference_data, top_k, SIMILAR_CHART_MIN_GAP, symbols, start, end, exclude)
+    results = []
+    for coin_symbol, position, distance in matches:
+        results.append({
+            "coin_symbol": coin_symbol,
+            "timestamp": pd.Timestamp(multi_index.indexes[coin_symbol].end_timestamps[position]),
+            "distance": distance
+        })
+    return results
+
+def get_chart_explanation_text(chart_features: dict, on_delta: Callable[[str], None] | None = None) -> str:
     def dict_to_text(d: dict) -> str:
         text = ""
         for k, v in d.items():
@@ -131,15 +124,9 @@ def get_chart_explanation_text(chart_features: dict) -> str:
 
     user_prompt = "다음은 최근 24시간의 암호화폐 차트 특징입니다. 이를 바탕으로 현재 시장 상황을 기술적 분석 관점에서 설명해 주세요.\n"
     user_prompt += dict_to_text(chart_features)
-    client = openai.OpenAI()
-    response = client.chat.completions.create(
-        model='gpt-5.1-chat-latest',
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-    )
-    return response.choices[0].message.content
+    if on_delta is not None:
+        return stream_chat_completion(system_prompt, user_prompt, on_delta)
+    return chat_completion(system_prompt, user_prompt)
     
 system_prompt = """
 당신은 1시간 봉 암호화폐 차트를 해석하는 기술적 분석 전문가입니다.
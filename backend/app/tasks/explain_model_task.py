@@ -1,38 +1,62 @@
-import numpy as np
+import json
+from typing import Callable
+
 import pandas as pd
-import openai
-from scipy.stats import laplace
+from celery import chord, group
 
 from app.celery_app import celery_app
-from app.utils.model_load_utils import get_strategy_class, get_param_path
-from app.utils.data_utils import get_ohlcv_df, get_model_meta_info
+from app.utils.data_utils import get_ohlcv_df, get_ohlcv_history_df
+from app.utils.redis_utils import get_redis
+from app.services.model_output_service import load_strategy
+from app.services.llm_service import chat_completion, stream_chat_completion
+from app.services.llm_stream_service import LLMStreamPublisher
+from app.services.model_meta_service import ModelStats, get_model_meta_registry, recommendation_for
+
+MODEL_NAME = "LightGBM"
+# 단계별 중간 결과 보관 시간
+STAGE_TTL_SECONDS = 1800
+
 
 @celery_app.task(bind=True)
 def explain_model_task(self, coin_symbol: str, timeframe: int, inference_time: str) -> dict:
+    """Resolve the shared inputs once, then replace itself with the stage canvas.
+
+    SHAP and reference-chart stages run in parallel; the LLM stage joins them
+    and inherits this task id, so clients keep polling the same id. Each stage
+    stores its partial result (see ``get_partial_results``) as soon as it ends.
+    """
     print(f'coin_symbol: {coin_symbol}')
-    MODEL_NAME = "LightGBM"
     PARAM_NAME = f"{coin_symbol}_{timeframe}m"
-    TRAIN_START = "2024-01-01 00:00:00"
-    TRAIN_END = "2025-01-01 00:00:00"
-    total_df = get_ohlcv_df(
-        coin_symbol=coin_symbol,
-        timeframe=timeframe
-    )
-    strategy_class = get_strategy_class(MODEL_NAME)
-    inference_window = strategy_class.inference_window
-    strategy_instance = strategy_class()
-
-    params_path = get_param_path(MODEL_NAME, PARAM_NAME)
-    strategy_instance.load(params_path)
+    meta_info = get_model_meta_registry().get(MODEL_NAME, PARAM_NAME)
+    TRAIN_START = meta_info.train_start or "2024-01-01 00:00:00"
+    TRAIN_END = meta_info.train_end or "2025-01-01 00:00:00"
 
     train_start_timestamp = pd.Timestamp(TRAIN_START).tz_localize(None)
     train_start_timestamp -= pd.Timedelta(minutes=timeframe)
     train_end_timestamp = pd.Timestamp(TRAIN_END).tz_localize(None)
-    train_df = total_df.loc[train_start_timestamp:train_end_timestamp]
 
-    inference_timestamp = pd.Timestamp(inference_time).tz_localize(None)
-    inference_iloc = total_df.index.get_loc(inference_timestamp)
-    inference_df = total_df.iloc[inference_iloc - inference_window:inference_iloc]
+    # 각 단계에는 데이터 대신 구간만 넘기고, 단계가 필요한 봉만 DB에서 읽는다
+    context = {
+        "task_id": self.request.id,
+        "coin_symbol": coin_symbol,
+        "timeframe": timeframe,
+        "param_name": PARAM_NAME,
+        "train_start": train_start_timestamp.isoformat(),
+        "train_end": train_end_timestamp.isoformat(),
+        "inference_time": pd.Timestamp(inference_time).tz_localize(None).isoformat(),
+        "mean": meta_info.mean,
+        "std": meta_info.std,
+    }
+    return self.replace(chord(
+        group(explain_model_shap_stage.s(context), explain_model_reference_stage.s(context)),
+        explain_model_text_stage.s(context),
+    ))
+
+
+@celery_app.task
+def explain_model_shap_stage(context: dict) -> dict:
+    strategy_instance, _ = load_strategy(MODEL_NAME, context["param_name"])
+    train_df, inference_df = _load_inputs(context, strategy_instance.inference_window)
 
     print('Creating SHAP values...')
     explanation = strategy_instance.explain(
@@ -41,29 +65,19 @@ def explain_model_task(self, coin_symbol: str, timeframe: int, inference_time: s
     )
     prediction_value = explanation.pop("prediction", 0.0)
     print(f'Prediction value: {prediction_value}')
-    
-    meta_info = get_model_meta_info(
-        coin_symbol=coin_symbol,
-        timeframe=timeframe,
-    )
-    # 과대 추정 완화를 위해 std를 1.5배 확대
-    mean, std = meta_info["mean"], meta_info["std"] * 1.5
-    def prediction_percentile_func(pred: float) -> float:
-        percentile = laplace.cdf(pred, loc=mean, scale=std / np.sqrt(2)) * 100
-        return percentile
-    prediction_percentile = prediction_percentile_func(prediction_value)
+
+    prediction_percentile = ModelStats(mean=context["mean"], std=context["std"]).prediction_percentile(prediction_value)
 
     explanation["prediction_percentile"] = prediction_percentile
-    if prediction_percentile >= 85:
-        explanation["recommendation"] = "Buy"
-    elif prediction_percentile >= 70:
-        explanation["recommendation"] = "Weak buy"
-    elif prediction_percentile >= 30:
-        explanation["recommendation"] = "Hold"
-    elif prediction_percentile >= 15:
-        explanation["recommendation"] = "Weak sell"
-    else:
-        explanation["recommendation"] = "Sell"
+    explanation["recommendation"] = recommendation_for(prediction_percentile)
+    store_partial_result(context["task_id"], "shap", explanation)
+    return explanation
+
+
+@celery_app.task
+def explain_model_reference_stage(context: dict) -> list[dict]:
+    strategy_instance, _ = load_strategy(MODEL_NAME, context["param_name"])
+    train_df, inference_df = _load_inputs(context, strategy_instance.inference_window)
 
     print('Finding reference training data...')
     reference_charts = strategy_instance.get_reference_train_data(
@@ -71,19 +85,58 @@ def explain_model_task(self, coin_symbol: str, timeframe: int, inference_time: s
         inference_df=inference_df,
         top_k=5
     )
+    store_partial_result(context["task_id"], "reference_charts", reference_charts)
+    return reference_charts
+
+
+@celery_app.task(bind=True)
+def explain_model_text_stage(self, stage_results: list, context: dict) -> dict:
+    explanation, reference_charts = stage_results
     explanation["reference_charts"] = reference_charts
 
     print('Creating LLM explanation...')
+    # replace로 원래 태스크 id를 이어받으므로 스트림 키도 같다
+    llm_stream = LLMStreamPublisher(self.request.id)
     explanation_text = get_model_explanation_text(
         recommendation=explanation["recommendation"],
-        prediction_percentile=prediction_percentile,
+        prediction_percentile=explanation["prediction_percentile"],
         shap_value_dict=explanation["shap_values"],
         feature_value_dict=explanation["feature_values"],
+        on_delta=llm_stream.delta,
     )
+    llm_stream.done(explanation_text)
     explanation["explanation_text"] = explanation_text
     return explanation
 
-def get_model_explanation_text(recommendation: str, prediction_percentile: float, shap_value_dict: dict, feature_value_dict: dict) -> str:
+
+def _load_inputs(context: dict, inference_window: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # 학습 구간과 추론 시점 직전 inference_window개 봉만 읽는다
+    coin_symbol, timeframe = context["coin_symbol"], context["timeframe"]
+    train_df = get_ohlcv_df(
+        coin_symbol, timeframe,
+        start=pd.Timestamp(context["train_start"]).to_pydatetime(),
+        end=pd.Timestamp(context["train_end"]).to_pydatetime(),
+    )
+    inference_timestamp = pd.Timestamp(context["inference_time"])
+    history_df = get_ohlcv_history_df(coin_symbol, timeframe, inference_timestamp, inference_window + 1)
+    inference_iloc = history_df.index.get_loc(inference_timestamp)
+    inference_df = history_df.iloc[inference_iloc - inference_window:inference_iloc]
+    return train_df, inference_df
+
+
+def store_partial_result(task_id: str, name: str, value) -> None:
+    key = f"explain-model:partial:{task_id}"
+    with get_redis().pipeline() as pipe:
+        pipe.hset(key, name, json.dumps(value, default=float))
+        pipe.expire(key, STAGE_TTL_SECONDS)
+        pipe.execute()
+
+
+def get_partial_results(task_id: str) -> dict:
+    stored = get_redis().hgetall(f"explain-model:partial:{task_id}")
+    return {name.decode("utf-8"): json.loads(value) for name, value in stored.items()}
+
+def get_model_explanation_text(recommendation: str, prediction_percentile: float, shap_value_dict: dict, feature_value_dict: dict, on_delta: Callable[[str], None] | None = None) -> str:
     system_prompt = _build_system_prompt()
     user_prompt = _build_user_prompt(
         recommendation=recommendation,
@@ -91,15 +144,9 @@ def get_model_explanation_text(recommendation: str, prediction_percentile: float
         shap_value_dict=shap_value_dict,
         feature_value_dict=feature_value_dict
     )
-    client = openai.OpenAI()
-    response = client.chat.completions.create(
-        model='gpt-5.1-chat-latest',
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-    )
-    return response.choices[0].message.content
+    if on_delta is not None:
+        return stream_chat_completion(system_prompt, user_prompt, on_delta)
+    return chat_completion(system_prompt, user_prompt)
 
 def dict_to_text(d: dict) -> str:
     text = ""
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.celery_app import celery_app
+from app.utils.model_load_utils import get_strategy_class, get_param_path
+from app.utils.data_utils import get_ohlcv_df
+from app.services.model_meta_service import get_model_meta_registry
+
+MAX_RANGE_BARS = int(os.getenv("SHAP_RANGE_MAX_BARS", "2000"))
+
+
+@celery_app.task(bind=True)
+def explain_range_task(self, coin_symbol: str, timeframe: int, start: str, end: str, top_k: int = 5) -> dict:
+    MODEL_NAME = "LightGBM"
+    PARAM_NAME = f"{coin_symbol}_{timeframe}m"
+    meta_info = get_model_meta_registry().get(MODEL_NAME, PARAM_NAME)
+    TRAIN_START = meta_info.train_start or "2024-01-01 00:00:00"
+    TRAIN_END = meta_info.train_end or "2025-01-01 00:00:00"
+    total_df = get_ohlcv_df(
+        coin_symbol=coin_symbol,
+        timeframe=timeframe
+    )
+    strategy_instance = get_strategy_class(MODEL_NAME)()
+    strategy_instance.load(get_param_path(MODEL_NAME, PARAM_NAME))
+
+    train_start_timestamp = pd.Timestamp(TRAIN_START).tz_localize(None)
+    train_start_timestamp -= pd.Timedelta(minutes=timeframe)
+    train_end_timestamp = pd.Timestamp(TRAIN_END).tz_localize(None)
+    train_df = total_df.loc[train_start_timestamp:train_end_timestamp]
+
+    start_timestamp = pd.Timestamp(start).tz_localize(None)
+    end_timestamp = pd.Timestamp(end).tz_localize(None)
+    timestamps = total_df.loc[start_timestamp:end_timestamp].index
+    if len(timestamps) > MAX_RANGE_BARS:
+        raise ValueError(f"Range has {len(timestamps)} bars; at most {MAX_RANGE_BARS} are allowed.")
+
+    feature_names, predictions, shap_values = strategy_instance.explain_range(train_df, total_df, timestamps)
+    valid = ~np.isnan(predictions)
+    top_features, top_shap_values = top_k_attributions(shap_values[valid], top_k)
+    return {
+        "feature_names": feature_names,
+        "timestamps": [timestamp.isoformat() for timestamp in timestamps[valid]],
+        "predictions": predictions[valid].tolist(),
+        "top_features": top_features.tolist(),
+        "top_shap_values": top_shap_values.tolist(),
+    }
+
+
+def top_k_attributions(shap_values: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    # 시점별 |SHAP| 상위 k개 feature 번호(feature_names 기준)와 SHAP 값
+    top_k = min(top_k, shap_values.shape[1])
+    if len(shap_values) == 0 or top_k <= 0:
+        return np.zeros((len(shap_values), 0), dtype=np.int64), np.zeros((len(shap_values), 0))
+    magnitude = np.abs(shap_values)
+    candidates = np.argpartition(-magnitude, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(magnitude, candidates, axis=1), axis=1, kind="stable")
+    top_features = np.take_along_axis(candidates, order, axis=1)
+    top_values = np.take_along_axis(shap_values, top_features, axis=1).astype(np.float64)
+    return top_features, top_values
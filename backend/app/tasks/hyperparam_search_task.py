@@ -0,0 +1,198 @@
+import logging
+import math
+import os
+import tempfile
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from app.celery_app import celery_app
+from app.utils.model_load_utils import get_strategy_class, get_param_path, save_strategy_atomically
+from app.utils.data_utils import get_ohlcv_df
+from app.utils.parallel_utils import get_worker_budget, worker_pool
+from app.utils.dataset_cache_utils import DATASET_PARAMS
+from app.services.model_meta_service import ModelStats, get_model_meta_registry
+from app.tasks.model_output_task import queue_model_output_backfill
+from app.tasks.model_refresh_task import holdout_l1
+
+logger = logging.getLogger(__name__)
+
+SEARCH_METHODS = ("random", "halving")
+EARLY_STOPPING_ROUNDS = 20
+# successive halving: 라운드마다 상위 1/HALVING_ETA 만 남기고 예산을 HALVING_ETA 배로 늘린다
+HALVING_ETA = 3
+
+
+@celery_app.task(bind=True)
+def hyperparam_search_task(self, model_name: str, param_name: str, coin_symbol: str, timeframe: int, start: str, end: str, n_trials: int = 20, method: str = "random", validation_ratio: float = 0.2, seed: int = 42, max_workers: int | None = None, holdout_ratio: float = 0.1) -> dict:
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method: {method}. Available: {list(SEARCH_METHODS)}")
+    strategy_class = get_strategy_class(model_name)
+    if not hasattr(strategy_class, "prepare_training_data"):
+        raise ValueError(f"Strategy '{model_name}' does not support hyperparameter search.")
+    schema = strategy_class.hyperparam_schema
+    start, end = pd.to_datetime(start), pd.to_datetime(end)
+
+    data_df = get_ohlcv_df(coin_symbol, timeframe)
+    data_df = data_df.loc[start:end]
+    strategy = strategy_class()
+    features_df = strategy.build_features(data_df)
+    target = strategy.build_target(data_df)
+
+    # 시계열이므로 [학습 | 검증 | holdout] 순으로 뒤쪽을 잘라 쓴다 (균형 샘플링은 학습 구간만)
+    # 검증 구간은 early stopping과 trial 순위에, holdout은 저장 여부 판단에만 쓴다
+    X_all, y_all = strategy.prepare_training_data(features_df, target, balance=False)
+    holdout_split = int(len(X_all) * (1 - holdout_ratio))
+    split = int(holdout_split * (1 - validation_ratio))
+    # 각 구간의 마지막 행 target은 다음 구간의 첫 종가를 쓰므로 뺀다
+    train_rows = strategy.balance_rows(y_all[:split - 1])
+    if len(train_rows) == 0 or split >= holdout_split - 1 or holdout_split >= len(X_all):
+        raise ValueError("Not enough data for a train/validation/holdout split.")
+    valid_index = features_df.index[features_df.notna().all(axis=1) & target.notna()]
+    holdout_start = valid_index[holdout_split]
+
+    rng = np.random.default_rng(seed)
+    candidates = [sample_hyperparams(schema, rng) for _ in range(n_trials)]
+    max_rounds = int(schema["num_boost_round"].get("search_range", [0, schema["num_boost_round"]["default"]])[1])
+    if method == "halving":
+        rungs = halving_budgets(n_trials, max_rounds)
+    else:
+        rungs = [None]
+
+    budget = get_worker_budget(max_workers)
+    total = sum(_rung_size(n_trials, rung) for rung in range(len(rungs)))
+    trials, best = [], None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Dataset은 한 번만 binning 해서 저장하고 각 워커는 바이너리를 읽기만 한다
+        train_set = strategy.make_dataset(X_all[train_rows], y_all[train_rows], features_df.columns)
+        valid_set = strategy.make_dataset(X_all[split:holdout_split - 1], y_all[split:holdout_split - 1], features_df.columns, reference=train_set)
+        train_path, valid_path = _save_datasets(train_set, valid_set, tmp_dir)
+        shared = {
+            "model_name": model_name,
+            "train_path": train_path,
+            "valid_path": valid_path,
+            "n_jobs": 1 if budget > 1 else -1,
+        }
+        # 풀은 탐색 전체에서 하나만 띄우고, 끝나는 trial부터 결과를 받는다
+        with worker_pool(shared=shared, max_workers=budget) as imap_unordered:
+            for rung, rung_rounds in enumerate(rungs):
+                jobs = [(params, rung_rounds or params["num_boost_round"]) for params in candidates]
+                rung_results = []
+                for result in imap_unordered(_run_trial, jobs):
+                    # 모델 문자열은 최고 기록만 들고 있는다
+                    model_str = result.pop("model_str")
+                    result["rung"] = rung
+                    if best is None or result["score"] < best[0]["score"]:
+                        best = (result, model_str)
+                    rung_results.append(result)
+                    trials.append(result)
+                    self.update_state(state="PROGRESS", meta={
+                        "completed": len(trials),
+                        "total": total,
+                        "rung": rung,
+                        "best_score": best[0]["score"],
+                        "best_params": best[0]["params"],
+                    })
+                rung_results.sort(key=lambda result: result["score"])
+                candidates = [result["params"] for result in rung_results[:_rung_size(n_trials, rung + 1)]]
+
+    best_result, best_model_str = best
+    best_params = {**best_result["params"], "num_boost_round": best_result["best_iteration"]}
+    strategy.hyperparams = best_params
+    strategy.model = lgb.Booster(model_str=best_model_str)
+    trials.sort(key=lambda result: result["score"])
+    result = {
+        "best_params": best_params,
+        "best_score": best_result["score"],
+        "trials": trials,
+    }
+
+    # 운영 중인 모델이 있으면 탐색에 쓰지 않은 holdout L1로 비교해 더 나쁠 때는 덮어쓰지 않는다
+    param_path = get_param_path(model_name, param_name)
+    holdout_mask = features_df.index >= holdout_start
+    candidate_l1 = holdout_l1(strategy, features_df[holdout_mask], target[holdout_mask])
+    if os.path.exists(param_path):
+        previous = strategy_class()
+        previous.load(param_path)
+        previous_l1 = holdout_l1(previous, features_df[holdout_mask], target[holdout_mask])
+        result.update(previous_l1=previous_l1, candidate_l1=candidate_l1)
+        if not candidate_l1 <= previous_l1:
+            logger.info("Kept %s+%s: search l1 %.6f vs current %.6f", model_name, param_name, candidate_l1, previous_l1)
+            return {"status": "rejected", **result}
+
+    strategy.update_prediction_stats(X_all[:split - 1])
+    save_strategy_atomically(strategy, param_path)
+
+    # 실제로 학습한 구간: train()에 data_df.loc[train_start:train_end]를 주면 같은 행으로 학습한다
+    stats = ModelStats(
+        mean=strategy.prediction_stats["mean"],
+        std=strategy.prediction_stats["std"],
+        train_start=data_df.index[0].isoformat(),
+        train_end=valid_index[split - 1].isoformat(),
+        extra={"holdout_l1": candidate_l1},
+    )
+    get_model_meta_registry().update(model_name, param_name, stats)
+    # 바뀐 모델로 /decide용 출력을 다시 채운다
+    queue_model_output_backfill(model_name, param_name, coin_symbol, timeframe)
+    return {"status": "saved", **result}
+
+
+def sample_hyperparams(hyperparam_schema: dict, rng: np.random.Generator) -> dict:
+    params = {}
+    for name, spec in hyperparam_schema.items():
+        if "search_range" not in spec:
+            params[name] = spec["default"]
+            continue
+        low, high = spec["search_range"]
+        if spec.get("log_scale"):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        params[name] = int(round(value)) if spec["type"] == "int" else float(value)
+    return params
+
+
+def halving_budgets(n_trials: int, max_rounds: int, eta: int = HALVING_ETA) -> list[int]:
+    # floor(log_eta(n_trials)) + 1; math.log은 log(243, 3) = 4.999... 처럼 한 단계를 잃는다
+    n_rungs = 1
+    while eta ** n_rungs <= n_trials:
+        n_rungs += 1
+    return [max(1, max_rounds // eta ** (n_rungs - 1 - rung)) for rung in range(n_rungs)]
+
+
+def _rung_size(n_trials: int, rung: int, eta: int = HALVING_ETA) -> int:
+    return max(1, n_trials // eta ** rung)
+
+
+def _save_datasets(train_set: lgb.Dataset, valid_set: lgb.Dataset, tmp_dir: str) -> tuple[str, str]:
+    train_path = os.path.join(tmp_dir, "train.bin")
+    valid_path = os.path.join(tmp_dir, "valid.bin")
+    train_set.save_binary(train_path)
+    valid_set.save_binary(valid_path)
+    return train_path, valid_path
+
+
+def _run_trial(job: tuple[dict, int], shared: dict) -> dict:
+    params, num_rounds = job
+    strategy = get_strategy_class(shared["model_name"])()
+    strategy.hyperparams = params
+    train_set = lgb.Dataset(shared["train_path"], params=DATASET_PARAMS)
+    valid_set = lgb.Dataset(shared["valid_path"], reference=train_set)
+    lgb_params = {**strategy.lgb_params(shared["n_jobs"]), "verbose": -1}
+    model = lgb.train(
+        params=lgb_params,
+        train_set=train_set,
+        num_boost_round=num_rounds,
+        valid_sets=[valid_set],
+        valid_names=["valid"],
+        callbacks=[lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)],
+    )
+    best_iteration = model.best_iteration or model.current_iteration()
+    return {
+        "params": params,
+        "num_rounds": num_rounds,
+        "best_iteration": best_iteration,
+        "score": float(model.best_score["valid"]["l1"]),
+        "model_str": model.model_to_string(num_iteration=best_iteration),
+    }
@@ -0,0 +1,39 @@
+import logging
+
+from app.celery_app import celery_app
+from app.db import models
+from app.db.database import SessionLocal, engine
+from app.services.market_snapshot_service import build_market_snapshot, required_history, store_market_snapshot
+from app.services.ohlcv_service import timeframe_minutes
+from app.utils.data_utils import _get_ingest_service, get_recent_ohlcv_df
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="ohlcv.build_market_snapshots")
+def build_market_snapshots_task() -> list[str]:
+    # 수집 직후 설정된 모든 심볼의 최신 봉 스냅샷(차트 지표, 점수, 모델 예측)을 저장
+    stored = []
+    # 워커가 API보다 먼저 뜬 경우에도 테이블이 있도록
+    models.MarketSnapshot.__table__.create(bind=engine, checkfirst=True)
+    session = SessionLocal()
+    try:
+        for cfg in _get_ingest_service().symbol_configs:
+            coin_symbol = cfg.symbol.replace("KRW-", "")
+            for tf in cfg.targets:
+                timeframe = timeframe_minutes(tf)
+                if timeframe is None:
+                    continue
+                try:
+                    total_df = get_recent_ohlcv_df(coin_symbol, timeframe, required_history(coin_symbol, timeframe))
+                    snapshot = build_market_snapshot(coin_symbol, timeframe, total_df)
+                except ValueError as exc:
+                    logger.warning("Skipping market snapshot for %s %s: %s", cfg.symbol, tf.raw, exc)
+                    continue
+                if snapshot is None:
+                    continue
+                store_market_snapshot(session, coin_symbol, timeframe, snapshot)
+                stored.append(f"{coin_symbol}_{timeframe}m@{snapshot['timestamp'].isoformat()}")
+    finally:
+        session.close()
+    return stored
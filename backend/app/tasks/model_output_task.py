@@ -0,0 +1,84 @@
+import logging
+import os
+
+from app.celery_app import celery_app
+from app.db import models
+from app.db.database import SessionLocal, engine
+from app.services.model_output_service import (
+    append_model_outputs, backfill_model_outputs, latest_model_output_time, load_strategy, models_for_symbol,
+    supports_stored_outputs,
+)
+from app.services.ohlcv_service import timeframe_minutes
+from app.services.task_dedup_service import submit_deduplicated
+from app.utils.data_utils import _get_ingest_service
+
+logger = logging.getLogger(__name__)
+
+# 전체 구간 채우기는 수 분 걸리므로 같은 모델 버전의 중복 제출을 더 오래 막는다
+BACKFILL_DEDUP_TTL_SECONDS = int(os.getenv("MODEL_OUTPUT_BACKFILL_DEDUP_TTL_SECONDS", "3600"))
+
+
+def queue_model_output_backfill(model_name: str, param_name: str, coin_symbol: str, timeframe: int) -> str:
+    _, artifact_mtime_ns = load_strategy(model_name, param_name)
+    return submit_deduplicated(
+        backfill_model_outputs_task,
+        ttl_seconds=BACKFILL_DEDUP_TTL_SECONDS,
+        model_name=model_name,
+        param_name=param_name,
+        coin_symbol=coin_symbol,
+        timeframe=timeframe,
+        artifact_mtime_ns=artifact_mtime_ns,
+    )
+
+
+@celery_app.task(name="ohlcv.update_model_outputs")
+def update_model_outputs_task() -> dict[str, int | str]:
+    # 수집 직후 설정된 심볼의 모델마다 새 봉의 /decide 모델 출력만 추가 (전체 구간은 backfill 태스크가 채움)
+    updated = {}
+    # 워커가 API보다 먼저 뜬 경우에도 테이블이 있도록
+    models.ModelOutput.__table__.create(bind=engine, checkfirst=True)
+    session = SessionLocal()
+    try:
+        for cfg in _get_ingest_service().symbol_configs:
+            coin_symbol = cfg.symbol.replace("KRW-", "")
+            for tf in cfg.targets:
+                timeframe = timeframe_minutes(tf)
+                if timeframe is None:
+                    continue
+                for model_name, param_name in models_for_symbol(coin_symbol, timeframe):
+                    if not supports_stored_outputs(model_name):
+                        continue
+                    name = f"{model_name}+{param_name}@{coin_symbol}_{timeframe}m"
+                    try:
+                        count = append_model_outputs(session, model_name, param_name, coin_symbol, timeframe)
+                    except ValueError as exc:
+                        session.rollback()
+                        logger.warning("Skipping model outputs of %s: %s", name, exc)
+                        continue
+                    if count is None:
+                        updated[name] = f"backfill {queue_model_output_backfill(model_name, param_name, coin_symbol, timeframe)}"
+                    else:
+                        updated[name] = count
+    finally:
+        session.close()
+    return updated
+
+
+@celery_app.task(name="model.backfill_outputs")
+def backfill_model_outputs_task(model_name: str, param_name: str, coin_symbol: str, timeframe: int,
+                                artifact_mtime_ns: int | None = None) -> int | None:
+    # 모델 교체 직후나 처음 한 번 전체 구간을 채운다. 이미 채워진 버전이거나 그 사이 모델이 또 바뀌었으면 건너뜀
+    models.ModelOutput.__table__.create(bind=engine, checkfirst=True)
+    _, current = load_strategy(model_name, param_name)
+    if artifact_mtime_ns is not None and artifact_mtime_ns != current:
+        return None
+    session = SessionLocal()
+    try:
+        if latest_model_output_time(session, model_name, param_name, coin_symbol, timeframe, current) is not None:
+            return None
+        return backfill_model_outputs(session, model_name, param_name, coin_symbol, timeframe)
+    except ValueError as exc:
+        logger.warning("Skipping model output backfill of %s+%s for %s %sm: %s", model_name, param_name, coin_symbol, timeframe, exc)
+        return None
+    finally:
+        session.close()
@@ -0,0 +1,132 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from celery.schedules import crontab
+
+from app.celery_app import celery_app
+from app.utils.model_load_utils import get_strategy_class, get_param_path, get_all_param_names, parse_param_name, save_strategy_atomically
+from app.utils.data_utils import get_ohlcv_df
+from app.services.model_meta_service import ModelStats, get_model_meta_registry
+from app.tasks.model_output_task import queue_model_output_backfill
+
+logger = logging.getLogger(__name__)
+
+REFRESH_MODES = ("incremental", "window")
+REFRESH_MODE = os.getenv("MODEL_REFRESH_MODE", "incremental")
+REFRESH_HOUR = int(os.getenv("MODEL_REFRESH_HOUR", "4"))
+MIN_NEW_CANDLES = int(os.getenv("MODEL_REFRESH_MIN_NEW_CANDLES", "168"))
+# 새 봉 중 뒤쪽 HOLDOUT_RATIO 는 기존 모델과 비교하는 검증 구간으로 남겨 둔다
+HOLDOUT_RATIO = 0.2
+INCREMENTAL_ROUNDS = 20
+WINDOW_DAYS = 365
+DEFAULT_TRAIN_START = "2024-01-01 00:00:00"
+DEFAULT_TRAIN_END = "2025-01-01 00:00:00"
+
+
+@celery_app.task(name="model.refresh_all")
+def refresh_all_models_task() -> list[str]:
+    dispatched = []
+    for model_name, param_names in get_all_param_names().items():
+        if not hasattr(get_strategy_class(model_name), "continue_training"):
+            continue
+        for param_name in param_names:
+            if parse_param_name(param_name) is None:
+                continue
+            refresh_model_task.delay(model_name, param_name)
+            dispatched.append(f"{model_name}+{param_name}")
+    return dispatched
+
+
+@celery_app.task(bind=True, name="model.refresh")
+def refresh_model_task(self, model_name: str, param_name: str, mode: str | None = None) -> dict:
+    mode = mode or REFRESH_MODE
+    if mode not in REFRESH_MODES:
+        raise ValueError(f"Unknown refresh mode: {mode}. Available: {list(REFRESH_MODES)}")
+    parsed = parse_param_name(param_name)
+    if parsed is None:
+        raise ValueError(f"Cannot infer coin/timeframe from param name '{param_name}'.")
+    coin_symbol, timeframe = parsed
+
+    registry = get_model_meta_registry()
+    meta = registry.find(model_name, param_name)
+    train_start = pd.Timestamp(meta.train_start if meta and meta.train_start else DEFAULT_TRAIN_START).tz_localize(None)
+    train_end = pd.Timestamp(meta.train_end if meta and meta.train_end else DEFAULT_TRAIN_END).tz_localize(None)
+
+    data_df = get_ohlcv_df(coin_symbol, timeframe)
+    new_index = data_df.index[data_df.index > train_end]
+    if len(new_index) < MIN_NEW_CANDLES:
+        return {"status": "skipped", "new_candles": int(len(new_index))}
+    holdout_start = new_index[int(len(new_index) * (1 - HOLDOUT_RATIO))]
+    window_start = holdout_start - pd.Timedelta(days=WINDOW_DAYS)
+
+    strategy_class = get_strategy_class(model_name)
+    param_path = get_param_path(model_name, param_name)
+    previous = strategy_class()
+    previous.load(param_path)
+
+    # train()과 같은 창별 feature이므로 첫 학습 행의 창을 채울 만큼만 앞선 봉을 포함한다
+    warmup = pd.Timedelta(minutes=timeframe * (previous.inference_window - 1))
+    feature_df = data_df.loc[min(window_start, train_end) - warmup:]
+    features_df = previous.build_features(feature_df)
+    target = previous.build_target(feature_df)
+    # 마지막 학습 행의 target은 검증 구간 첫 봉 종가를 본다
+    fit_mask = features_df.index < new_index[new_index.get_loc(holdout_start) - 1]
+    holdout_mask = features_df.index >= holdout_start
+
+    candidate = strategy_class()
+    candidate.load(param_path)
+    if mode == "incremental":
+        new_mask = fit_mask & (features_df.index > train_end)
+        candidate.continue_training(features_df[new_mask], target[new_mask], INCREMENTAL_ROUNDS)
+        refreshed_start = train_start
+    else:
+        window_mask = fit_mask & (features_df.index >= window_start)
+        candidate.train_features(features_df[window_mask], target[window_mask], dict(previous.hyperparams))
+        refreshed_start = max(window_start, data_df.index[0])
+
+    previous_l1 = holdout_l1(previous, features_df[holdout_mask], target[holdout_mask])
+    candidate_l1 = holdout_l1(candidate, features_df[holdout_mask], target[holdout_mask])
+    result = {
+        "mode": mode,
+        "new_candles": int(len(new_index)),
+        "previous_l1": previous_l1,
+        "candidate_l1": candidate_l1,
+    }
+    if not candidate_l1 <= previous_l1:
+        logger.info("Rejected refresh of %s+%s: l1 %.6f -> %.6f", model_name, param_name, previous_l1, candidate_l1)
+        return {"status": "rejected", **result}
+
+    stats_mask = (features_df.index >= window_start) & (features_df.index < holdout_start)
+    X_stats, _ = candidate.prepare_training_data(features_df[stats_mask], target[stats_mask], balance=False)
+    candidate.update_prediction_stats(X_stats)
+    save_strategy_atomically(candidate, param_path)
+    # 검증 구간은 다음 refresh의 학습 데이터가 되도록 train_end를 검증 구간 시작으로 둔다
+    stats = ModelStats(
+        mean=candidate.prediction_stats["mean"],
+        std=candidate.prediction_stats["std"],
+        train_start=refreshed_start.isoformat(),
+        train_end=holdout_start.isoformat(),
+        extra={**(meta.extra if meta else {}), "refresh_mode": mode, "holdout_l1": candidate_l1},
+    )
+    registry.update(model_name, param_name, stats)
+    # 바뀐 모델로 /decide용 출력을 다시 채운다
+    queue_model_output_backfill(model_name, param_name, coin_symbol, timeframe)
+    logger.info("Refreshed %s+%s (%s): l1 %.6f -> %.6f", model_name, param_name, mode, previous_l1, candidate_l1)
+    return {"status": "refreshed", **result}
+
+
+def holdout_l1(strategy, features_df: pd.DataFrame, target: pd.Series) -> float:
+    # 모델 원출력(로그 수익률)과 실제 다음 봉 로그 수익률의 평균 절대 오차
+    X, y = strategy.prepare_training_data(features_df[strategy.model.feature_name()], target, balance=False)
+    if len(X) == 0:
+        return float("nan")
+    return float(np.mean(np.abs(strategy.model.predict(X) - y)))
+
+
+celery_app.conf.beat_schedule = getattr(celery_app.conf, "beat_schedule", {}) or {}
+celery_app.conf.beat_schedule["refresh-models-schedule"] = {
+    "task": "model.refresh_all",
+    "schedule": crontab(minute=10, hour=REFRESH_HOUR),
+}
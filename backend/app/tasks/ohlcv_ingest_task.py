@@ -6,6 +6,9 @@ from celery.schedules import crontab
 from app.celery_app import celery_app
 from app.db.database import SessionLocal
 from app.services.ohlcv_service import ConfigurationError, OHLCVIngestService
+from app.tasks.market_snapshot_task import build_market_snapshots_task
+from app.tasks.model_output_task import update_model_outputs_task
+from app.tasks.window_index_task import update_window_indexes_task
 
 service = OHLCVIngestService()
 OFFSET_SECONDS = int(os.getenv("OHLCV_EXECUTION_OFFSET_SECONDS", "3"))
@@ -38,6 +41,9 @@ def collect_latest_ohlcv() -> None:
         service.collect_latest(session)
     finally:
         session.close()
+    update_window_indexes_task.delay()
+    build_market_snapshots_task.delay()
+    update_model_outputs_task.delay()
 
 
 schedule = _build_crontab_schedule()
@@ -1,50 +1,42 @@
-import numpy as np
-import pandas as pd
-import ta
-import openai
 import json
 
 from app.celery_app import celery_app
-from app.utils.data_utils import get_ohlcv_df
+from app.services.chart_feature_service import get_chart_features
+from app.services.llm_service import chat_completion
+from app.services.chart_score_service import score_chart_features
 
 @celery_app.task(bind=True)
-def score_chart_task(self, coin_symbol: str, timeframe: int, inference_time: str, history_window: int) -> dict:
-    total_df = get_ohlcv_df(
-        coin_symbol=coin_symbol,
-        timeframe=timeframe
-    )
-    inference_timestamp = pd.Timestamp(inference_time).tz_localize(None)
-    inference_iloc = total_df.index.get_loc(inference_timestamp)
-    inference_df = total_df.iloc[inference_iloc - history_window + 1:inference_iloc + 1]
+def score_chart_task(self, coin_symbol: str, timeframe: int, inference_time: str, history_window: int, explain: bool = True) -> dict:
+    chart_features = load_chart_features(coin_symbol, timeframe, inference_time, history_window)
+    # 점수는 로컬에서 결정적으로 계산하고, LLM은 설명 문장만 작성한다
+    scores = score_chart_features(chart_features)
+    explanations = get_score_explanations(chart_features, scores) if explain else {}
+    return {
+        name: {"score": score, "explanation": explanations.get(name, "")}
+        for name, score in scores.items()
+    }
+
+def load_chart_features(coin_symbol: str, timeframe: int, inference_time: str, history_window: int) -> dict:
+    return get_chart_features(coin_symbol, timeframe, inference_time, history_window)
+
+def get_score_explanations(chart_features: dict, scores: dict) -> dict:
     system_prompt = _build_system_prompt()
-    chart_features = create_chart_features(inference_df)
-    additional_chart_features = create_additional_chart_features(inference_df)
-    chart_features.update(additional_chart_features)
-    user_prompt = _build_user_prompt(chart_features)
-
-    client = openai.OpenAI()
-    response = client.chat.completions.create(
-        model='gpt-5.1-chat-latest',
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-    )
-    json_response = response.choices[0].message.content
-    chart_score_dict = json.loads(json_response)
-    return chart_score_dict
+    user_prompt = _build_user_prompt(chart_features, scores)
+
+    json_response = chat_completion(system_prompt, user_prompt, validate=json.loads)
+    explanations = json.loads(json_response)
+    return {name: str(explanations.get(name, "")) for name in scores}
 
 def _build_system_prompt() -> str:
     system_prompt = """
-당신은 금융 차트 분석용 정량 판단 모델입니다.  
-입력으로 주어지는 기술적 지표(feature 값)들과 지표 설명(feature definitions)을 기반으로  
-시장의 상황을 정확하게 해석하고 다음 5개의 점수를 반드시 정량적으로 산출해야 합니다.
+당신은 금융 차트 분석용 해설 작성 모델입니다.  
+입력으로 주어지는 기술적 지표(feature 값), 지표 설명(feature definitions), 그리고 이미 계산된 5개의 점수를 기반으로  
+각 점수가 왜 그렇게 나왔는지를 설명해야 합니다.
 
-당신의 목표는 아래 5가지 지표에 대해
-1) 일관된 방식으로 정량 점수를 계산하고
-2) 그 점수에 대한 직관적인 해설을 2~3문장으로 제시하는 것입니다.
+점수는 정해진 수식으로 이미 계산되어 있으므로 절대 점수를 새로 계산하거나 바꾸지 마십시오.  
+당신의 목표는 아래 5가지 지표 각각에 대해 점수에 대한 직관적인 해설을 제시하는 것입니다.
 
-[필수로 계산해야 할 5가지 지표]
+[5가지 지표]
 
 1. volatility_risk (0~100)
    - 변동성의 크기. 클수록 위험이 큰 상태.
@@ -61,12 +53,6 @@ def _build_system_prompt() -> str:
 5. accumulation_distribution (-100~100)
    - 분산(매도 압력) -100 ~ 중립(0) ~ 매집(매수 압력) +100
 
-[점수 계산 규칙]
-
-- 항상 feature definition에 명시된 수식적 의미나 방향성(양수/음수 해석 등)을 그대로 따라야 합니다.
-- 동일한 입력이 들어오면 항상 비슷한 범위의 점수가 나오도록 일관되게 판단해야 합니다.
-- 각 스코어의 부호와 크기는 반드시 지표의 방향성과 논리적으로 일치해야 합니다.
-
 [설명(explanation) 작성 규칙]
 
 - 설명에는 절대 raw feature 이름을 그대로 사용하지 마십시오.  
@@ -93,26 +79,11 @@ def _build_system_prompt() -> str:
 최종 출력은 반드시 아래 JSON 스키마를 따라야 합니다.
 
 {
-  "volatility_risk": {
-    "score": <0-100 number>,
-    "explanation": "<1~2문장 한국어 문자열>"
-  },
-  "overextension": {
-    "score": <-100~100 number>,
-    "explanation": "<1~2문장 한국어 문자열>"
-  },
-  "directionality": {
-    "score": <-100~100 number>,
-    "explanation": "<1~2문장 한국어 문자열>"
-  },
-  "breakout_strength": {
-    "score": <0-100 number>,
-    "explanation": "<1~2문장 한국어 문자열>"
-  },
-  "accumulation_distribution": {
-    "score": <-100~100 number>,
-    "explanation": "<1~2문장 한국어 문자열>"
-  }
+  "volatility_risk": "<1~2문장 한국어 문자열>",
+  "overextension": "<1~2문장 한국어 문자열>",
+  "directionality": "<1~2문장 한국어 문자열>",
+  "breakout_strength": "<1~2문장 한국어 문자열>",
+  "accumulation_distribution": "<1~2문장 한국어 문자열>"
 }
 
 중요:
@@ -123,9 +94,13 @@ def _build_system_prompt() -> str:
 """
     return system_prompt
 
-def _build_user_prompt(chart_features: dict) -> str:
-    user_prompt = "다음은 암호화폐 차트의 기술적 지표(feature) 값들과 각 지표의 정의입니다.\n"
-    user_prompt += "이를 바탕으로 시장 상황을 해석하고 5가지 점수를 설명과 함께 산출해 주세요.\n\n"
+def _build_user_prompt(chart_features: dict, scores: dict) -> str:
+    user_prompt = "다음은 암호화폐 차트의 기술적 지표(feature) 값들과 각 지표의 정의, 그리고 계산된 5가지 점수입니다.\n"
+    user_prompt += "이를 바탕으로 시장 상황을 해석하고 각 점수에 대한 설명을 작성해 주세요.\n\n"
+    user_prompt += "[Scores]\n"
+    for k, v in scores.items():
+        user_prompt += f"- {k}: {v}\n"
+    user_prompt += "\n[Features]\n"
     for k, v in chart_features.items():
         user_prompt += f"- {k}: {v}\n"
     user_prompt += "\n[Feature Definitions]\n"
@@ -134,189 +109,6 @@ def _build_user_prompt(chart_features: dict) -> str:
         user_prompt += f"- {k}: {v}\n"
     return user_prompt
 
-def create_chart_features(inference_df: pd.DataFrame) -> dict:
-    chart_features = {}
-    for i in range(24):
-        row = inference_df.iloc[-i-1]
-        chart_features[f"close_{i}h"] = float(row['close'])
-        chart_features[f"volume_{i}h"] = float(row['volume'])
-        chart_features[f"high_{i}h"] = float(row['high'])
-        chart_features[f"low_{i}h"] = float(row['low'])
-        chart_features[f"open_{i}h"] = float(row['open'])
-
-    bb = ta.volatility.BollingerBands(inference_df['close'])
-    chart_features['bollinger_band_lower'] = float(bb.bollinger_lband().iloc[-1])
-    chart_features['bollinger_band_upper'] = float(bb.bollinger_hband().iloc[-1])
-    chart_features['bollinger_band_mavg'] = float(bb.bollinger_mavg().iloc[-1])
-    chart_features['rsi'] = float(ta.momentum.RSIIndicator(inference_df['close']).rsi().iloc[-1])
-    macd = ta.trend.MACD(inference_df['close'])
-    chart_features['macd'] = float(macd.macd().iloc[-1])
-    chart_features['macd_signal'] = float(macd.macd_signal().iloc[-1])
-    chart_features['macd_diff'] = float(macd.macd_diff().iloc[-1])
-
-    chart_features['ema_20'] = float(ta.trend.EMAIndicator(inference_df['close'], window=20).ema_indicator().iloc[-1])
-    chart_features['ema_60'] = float(ta.trend.EMAIndicator(inference_df['close'], window=60).ema_indicator().iloc[-1])
-
-    chart_features['adx'] = float(ta.trend.ADXIndicator(
-        high=inference_df['high'],
-        low=inference_df['low'],
-        close=inference_df['close']
-    ).adx().iloc[-1])
-    chart_features['atr'] = float(ta.volatility.AverageTrueRange(
-        high=inference_df['high'],
-        low=inference_df['low'],
-        close=inference_df['close']
-    ).average_true_range().iloc[-1])
-    return chart_features
-
-def create_additional_chart_features(inference_df: pd.DataFrame) -> dict:
-    features: dict[str, float] = {}
-
-    # 최신 값들
-    last = inference_df.iloc[-1]
-    close = inference_df["close"]
-    high = inference_df["high"]
-    low = inference_df["low"]
-    open_ = inference_df["open"]
-    volume = inference_df["volume"]
-
-    close_now = float(last["close"])
-    eps = 1e-12
-
-    returns = close.pct_change().dropna()
-    if len(returns) > 0:
-        realized_vol_24 = returns.tail(24).std()
-    else:
-        realized_vol_24 = np.nan
-
-    atr_series = ta.volatility.AverageTrueRange(
-        high=high,
-        low=low,
-        close=close
-    ).average_true_range()
-    atr_last = float(atr_series.iloc[-1])
-    atr_pct = float(atr_last / (close_now + eps))
-
-    bb = ta.volatility.BollingerBands(close)
-    bb_l = float(bb.bollinger_lband().iloc[-1])
-    bb_u = float(bb.bollinger_hband().iloc[-1])
-    bb_m = float(bb.bollinger_mavg().iloc[-1])
-    bb_width_pct = float((bb_u - bb_l) / (abs(bb_m) + eps))
-
-    features["realized_vol_24"] = float(realized_vol_24)
-    features["atr_pct"] = atr_pct
-    features["bollinger_band_width_pct"] = bb_width_pct
-
-    ema20_series = ta.trend.EMAIndicator(close, window=20).ema_indicator()
-    ema60_series = ta.trend.EMAIndicator(close, window=60).ema_indicator()
-    ema20_last = float(ema20_series.iloc[-1])
-    ema60_last = float(ema60_series.iloc[-1])
-
-    dist_from_upper_band_pct = float((close_now - bb_u) / (abs(bb_m) + eps))
-    dist_from_lower_band_pct = float((close_now - bb_l) / (abs(bb_m) + eps))
-    dist_from_ema20_pct = float((close_now - ema20_last) / (abs(ema20_last) + eps))
-    dist_from_ema60_pct = float((close_now - ema60_last) / (abs(ema60_last) + eps))
-
-    features["dist_from_upper_band_pct"] = dist_from_upper_band_pct
-    features["dist_from_lower_band_pct"] = dist_from_lower_band_pct
-    features["dist_from_ema20_pct"] = dist_from_ema20_pct
-    features["dist_from_ema60_pct"] = dist_from_ema60_pct
-
-    def safe_ret(lookback: int) -> float:
-        if len(close) > lookback:
-            past = float(close.iloc[-lookback-1])
-            return float(close_now / (past + eps) - 1.0)
-        return np.nan
-
-    ret_4h = safe_ret(4)
-    ret_24h = safe_ret(24)
-
-    ema_diff_pct = float((ema20_last - ema60_last) / (abs(ema60_last) + eps))
-
-    macd = ta.trend.MACD(close)
-    macd_hist_last = float(macd.macd_diff().iloc[-1])
-
-    features["ret_4h"] = ret_4h
-    features["ret_24h"] = ret_24h
-    features["ema_diff_pct"] = ema_diff_pct
-    features["macd_hist_last"] = macd_hist_last
-
-    window = min(len(inference_df), 24)
-    recent = inference_df.iloc[-window:]
-
-    range_high_24 = float(recent["high"].max())
-    range_low_24 = float(recent["low"].min())
-
-    breakout_from_high_pct = float((close_now - range_high_24) / (abs(range_high_24) + eps))
-    breakout_from_low_pct = float((close_now - range_low_24) / (abs(range_low_24) + eps))
-
-    last_high = float(last["high"])
-    last_low = float(last["low"])
-    last_open = float(last["open"])
-    last_volume = float(last["volume"])
-
-    full_range = max(last_high - last_low, 0.0)
-    body = abs(close_now - last_open)
-    upper_shadow = max(last_high - max(last_open, close_now), 0.0)
-    lower_shadow = max(min(last_open, close_now) - last_low, 0.0)
-
-    body_ratio = float(body / (full_range + eps))
-    upper_shadow_ratio = float(upper_shadow / (full_range + eps))
-    lower_shadow_ratio = float(lower_shadow / (full_range + eps))
-
-    volume_mean_24 = float(recent["volume"].mean())
-    volume_boost_24 = float(last_volume / (volume_mean_24 + eps))
-
-    features["range_high_24"] = range_high_24
-    features["range_low_24"] = range_low_24
-    features["breakout_from_high_pct"] = breakout_from_high_pct
-    features["breakout_from_low_pct"] = breakout_from_low_pct
-    features["last_body_ratio"] = body_ratio
-    features["last_upper_shadow_ratio"] = upper_shadow_ratio
-    features["last_lower_shadow_ratio"] = lower_shadow_ratio
-    features["volume_boost_24"] = volume_boost_24
-
-    obv_series = ta.volume.OnBalanceVolumeIndicator(close=close, volume=volume).on_balance_volume()
-    obv_last = float(obv_series.iloc[-1])
-    if len(obv_series) > window:
-        obv_prev = float(obv_series.iloc[-window-1])
-        obv_change_window = float(obv_last - obv_prev)
-    else:
-        obv_change_window = np.nan
-
-    try:
-        mfi_series = ta.volume.MFIIndicator(
-            high=high,
-            low=low,
-            close=close,
-            volume=volume,
-            window=14
-        ).money_flow_index()
-        mfi_last = float(mfi_series.iloc[-1])
-    except Exception:
-        mfi_last = np.nan
-
-    recent_high = recent["high"].to_numpy(dtype=float)
-    recent_low = recent["low"].to_numpy(dtype=float)
-    recent_open = recent["open"].to_numpy(dtype=float)
-    recent_close = recent["close"].to_numpy(dtype=float)
-    recent_volume = recent["volume"].to_numpy(dtype=float)
-
-    full_rng = np.maximum(recent_high - recent_low, 0.0)
-    upper = np.maximum(recent_high - np.maximum(recent_open, recent_close), 0.0)
-    lower = np.maximum(np.minimum(recent_open, recent_close) - recent_low, 0.0)
-
-    upper_wick_vol_sum = float(((upper / (full_rng + eps)) * recent_volume).sum())
-    lower_wick_vol_sum = float(((lower / (full_rng + eps)) * recent_volume).sum())
-
-    features["obv_last"] = obv_last
-    features["obv_change_window"] = obv_change_window
-    features["mfi_last"] = mfi_last
-    features["upper_wick_volume_sum_window"] = upper_wick_vol_sum
-    features["lower_wick_volume_sum_window"] = lower_wick_vol_sum
-
-    return features
-
 feature_description_dict = {
     "close_{i}h": 
         "과거 i시간 전의 종가. 총 24개(hour 0~23)의 최근 가격 흐름을 제공합니다.",
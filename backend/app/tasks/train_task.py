@@ -3,6 +3,7 @@ import pandas as pd
 from app.celery_app import celery_app
 from app.utils.model_load_utils import get_strategy_class, get_param_path
 from app.utils.data_utils import get_ohlcv_df
+from app.services.model_meta_service import ModelStats, get_model_meta_registry
 
 @celery_app.task(bind=True)
 def train_task(self, model_name: str, param_name: str, coin_symbol: str, timeframe: int, start: str, end: str, hyperparams: dict) -> None:
@@ -15,4 +16,14 @@ def train_task(self, model_name: str, param_name: str, coin_symbol: str, timefra
     cur_strategy.train(train_df, hyperparams)
     save_path = get_param_path(model_name, param_name)
     cur_strategy.save(save_path)
+
+    prediction_stats = getattr(cur_strategy, "prediction_stats", None)
+    if prediction_stats:
+        stats = ModelStats(
+            mean=prediction_stats["mean"],
+            std=prediction_stats["std"],
+            train_start=start.isoformat(),
+            train_end=end.isoformat(),
+        )
+        get_model_meta_registry().update(model_name, param_name, stats)
     return None
\ No newline at end of file
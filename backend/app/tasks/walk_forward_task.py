@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from app.celery_app import celery_app
+from app.utils.model_load_utils import get_strategy_class
+from app.utils.data_utils import get_ohlcv_df
+from app.utils.backtest_utils import run_vectorized_backtest
+from app.utils.parallel_utils import get_worker_budget, parallel_map
+
+
+@celery_app.task(bind=True)
+def walk_forward_task(self, model_name: str, coin_symbol: str, timeframe: int, start: str, end: str, train_days: int, test_days: int, step_days: int | None = None, hyperparams: dict | None = None, max_workers: int | None = None) -> dict:
+    strategy_class = get_strategy_class(model_name)
+    if not hasattr(strategy_class, "train_features"):
+        raise ValueError(f"Strategy '{model_name}' does not support walk-forward evaluation.")
+    start, end = pd.to_datetime(start), pd.to_datetime(end)
+    folds = make_walk_forward_folds(start, end, train_days, test_days, step_days)
+    if not folds:
+        raise ValueError("Range is shorter than one train + test window.")
+
+    # 첫 봉도 inference window 전체를 보도록 앞선 봉을 함께 읽는다
+    data_df = get_ohlcv_df(coin_symbol, timeframe)
+    warmup = pd.Timedelta(minutes=timeframe * (strategy_class.inference_window - 1))
+    data_df = data_df.loc[start - warmup:end]
+    # 창별 feature는 창 안의 봉만 보므로 전 구간에서 한 번만 계산하고 fold마다 잘라 쓴다
+    features_df = strategy_class().build_features(data_df)
+
+    budget = get_worker_budget(max_workers)
+    concurrent_folds = min(budget, len(folds))
+    shared = {
+        "model_name": model_name,
+        "hyperparams": hyperparams or {},
+        "data": data_df,
+        "features": features_df,
+        "n_jobs": max(1, budget // concurrent_folds),
+    }
+    fold_results = parallel_map(_run_fold, folds, shared=shared, max_workers=concurrent_folds)
+    return {"folds": fold_results, "summary": summarize_folds(fold_results)}
+
+
+def make_walk_forward_folds(start: pd.Timestamp, end: pd.Timestamp, train_days: int, test_days: int, step_days: int | None = None) -> list[tuple[pd.Timestamp, pd.Timestamp, pd.Timestamp]]:
+    train_span = pd.Timedelta(days=train_days)
+    test_span = pd.Timedelta(days=test_days)
+    step_span = pd.Timedelta(days=step_days or test_days)
+    if step_span < test_span:
+        raise ValueError("step_days must be at least test_days so test windows do not overlap.")
+    folds = []
+    cursor = start
+    while cursor + train_span + test_span <= end:
+        folds.append((cursor, cursor + train_span, cursor + train_span + test_span))
+        cursor += step_span
+    return folds
+
+
+def summarize_folds(fold_results: list[dict]) -> dict:
+    returns = np.array([fold["total_return"] for fold in fold_results])
+    trade_counts = np.array([fold["trade_count"] for fold in fold_results])
+    win_rates = np.array([fold["win_rate"] for fold in fold_results])
+    traded = trade_counts > 0
+    return {
+        "fold_count": len(fold_results),
+        # total_return은 로그 수익률이고 테스트 구간은 겹치지 않으므로 합이 연속 투자 시 누적 수익률이다
+        "compounded_return": float(returns.sum()),
+        "mean_return": float(returns.mean()),
+        "std_return": float(returns.std()),
+        "positive_fold_ratio": float((returns > 0).mean()),
+        "mean_win_rate": float(win_rates[traded].mean()) if traded.any() else 0.0,
+        "trade_count": int(trade_counts.sum()),
+    }
+
+
+def _run_fold(fold: tuple, shared: dict) -> dict:
+    # 운영과 같은 feature로 평가: train()과 같은 창별 feature로 학습하고, action과 같은 창별 출력으로 신호를 만든다
+    train_start, test_start, test_end = fold
+    data_df, features_df = shared["data"], shared["features"]
+    train_mask = (data_df.index >= train_start) & (data_df.index < test_start)
+    test_positions = np.flatnonzero((data_df.index >= test_start) & (data_df.index < test_end))
+
+    strategy = get_strategy_class(shared["model_name"])()
+    # target은 fold 안에서 만들어 마지막 학습 행(다음 봉이 테스트 구간 첫 봉)은 NaN으로 빠진다
+    target = strategy.build_target(data_df[train_mask])
+    strategy.train_features(features_df[train_mask], target, shared["hyperparams"], n_jobs=shared["n_jobs"])
+
+    # 행 i의 신호는 i번째 봉까지 본 창의 출력
+    predictions = strategy.predict_features(features_df.iloc[test_positions])
+    signals = strategy.signals_batch(None, predictions)
+    test_df = data_df.iloc[test_positions]
+    result = run_vectorized_backtest(test_df["open"].to_numpy(), test_df["close"].to_numpy(), signals)
+    return {
+        "train_start": train_start.isoformat(),
+        "test_start": test_start.isoformat(),
+        "test_end": test_end.isoformat(),
+        **result,
+    }
@@ -0,0 +1,34 @@
+import logging
+
+from app.celery_app import celery_app
+from app.services.ohlcv_service import timeframe_minutes
+from app.utils.data_utils import _get_ingest_service
+from app.utils.window_index_utils import DEFAULT_WINDOW_SIZES, get_ann_settings, refresh_window_index, update_ivf_index
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="ohlcv.update_window_index")
+def update_window_indexes_task() -> list[str]:
+    # 수집 직후 새 봉만 정규화해 차트 유사도 인덱스에 추가
+    updated = []
+    ann_min_windows = get_ann_settings()["min_windows"]
+    for cfg in _get_ingest_service().symbol_configs:
+        coin_symbol = cfg.symbol.replace("KRW-", "")
+        for tf in cfg.targets:
+            timeframe = timeframe_minutes(tf)
+            if timeframe is None:
+                continue
+            for window_size in DEFAULT_WINDOW_SIZES:
+                try:
+                    index = refresh_window_index(coin_symbol, timeframe, window_size)
+                except ValueError as exc:
+                    logger.warning("Skipping window index for %s %s: %s", cfg.symbol, tf.raw, exc)
+                    continue
+                if index is None:
+                    continue
+                updated.append(f"{coin_symbol}_{timeframe}m_w{window_size}")
+                # 근사 검색을 켠 경우 요청에서 k-means를 돌리지 않도록 IVF 인덱스도 여기서 갱신
+                if 0 < ann_min_windows <= len(index):
+                    update_ivf_index(coin_symbol, timeframe, window_size)
+    return updated
@@ -0,0 +1,86 @@
+"""Inverted-file (IVF) index over window embeddings for approximate chart search.
+
+Embeddings are clustered with k-means and every window is filed under its
+nearest centroid. A query probes the ``n_probe`` closest lists and ranks their
+windows by embedding distance; the resulting shortlist is re-ranked with exact
+DTW by the caller. More probes or a longer shortlist trade speed for recall.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+TRAIN_SAMPLES_PER_LIST = 256
+KMEANS_ITERATIONS = 10
+MAX_LISTS = 4096
+# 중심점 거리 계산을 나눠서 하는 행 수 (메모리 상한)
+ASSIGN_CHUNK_SIZE = 65536
+
+
+def default_n_lists(count: int) -> int:
+    return int(np.clip(np.sqrt(count), 1, MAX_LISTS))
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for begin in range(0, len(vectors), ASSIGN_CHUNK_SIZE):
+        chunk = np.asarray(vectors[begin:begin + ASSIGN_CHUNK_SIZE], dtype=np.float32)
+        # |x - c|^2 에서 |x|^2 는 순위에 영향이 없으므로 생략
+        labels[begin:begin + len(chunk)] = np.argmin(centroid_norms - 2 * chunk @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(embeddings: np.ndarray, n_lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(embeddings), n_lists * TRAIN_SAMPLES_PER_LIST)
+    sample = np.asarray(embeddings[np.sort(rng.choice(len(embeddings), sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(sample, centroids)
+        counts = np.bincount(labels, minlength=n_lists)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        # 빈 리스트는 이전 중심점을 유지
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, labels: np.ndarray) -> None:
+        self.centroids = centroids
+        self.labels = labels
+        self._order = np.argsort(labels, kind="stable")
+        self._offsets = np.searchsorted(labels[self._order], np.arange(len(centroids) + 1))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, n_lists: int | None = None, seed: int = 0) -> IVFIndex:
+        n_lists = min(n_lists or default_n_lists(len(embeddings)), len(embeddings))
+        centroids = train_centroids(embeddings, n_lists, seed=seed)
+        return cls(centroids, nearest_centroids(embeddings, centroids))
+
+    def extend(self, embeddings: np.ndarray) -> IVFIndex:
+        # 새 창은 기존 중심점에 배정만 한다
+        return IVFIndex(self.centroids, np.concatenate([self.labels, nearest_centroids(embeddings, self.centroids)]))
+
+    def shortlist(self, embeddings: np.ndarray, query_embedding: np.ndarray, n_probe: int, size: int,
+                  allowed: np.ndarray | None = None) -> np.ndarray:
+        """Up to ``size`` positions closest to the query in embedding space, sorted.
+
+        Only windows in the ``n_probe`` nearest lists (and set in the boolean
+        mask ``allowed``, if given) are considered.
+        """
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        centroid_distances = ((self.centroids - query_embedding) ** 2).sum(axis=1)
+        n_probe = min(n_probe, len(self.centroids))
+        probes = np.argpartition(centroid_distances, n_probe - 1)[:n_probe]
+        members = np.sort(np.concatenate([self._order[self._offsets[probe]:self._offsets[probe + 1]] for probe in probes]))
+        if allowed is not None:
+            members = members[allowed[members]]
+        if len(members) > size:
+            distances = ((np.asarray(embeddings[members], dtype=np.float32) - query_embedding) ** 2).sum(axis=1)
+            members = np.sort(members[np.argpartition(distances, size - 1)[:size]])
+        return members.astype(np.int64)
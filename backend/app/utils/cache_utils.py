@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.utils.data_utils import _get_data_path
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU cache."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def artifact_key(path: str) -> tuple[str, int]:
+    # 같은 경로라도 파일이 교체되면(mtime 변경) 다른 키가 된다
+    path = os.path.abspath(path)
+    return path, os.stat(path).st_mtime_ns
+
+
+def _cache_entries(cache_dir: str) -> list[os.DirEntry]:
+    # 항목은 하위 디렉터리; 점으로 시작하는 이름은 임시 디렉터리나 관리용 파일이다
+    return [
+        entry for entry in os.scandir(cache_dir)
+        if entry.is_dir() and not entry.name.startswith(".")
+    ]
+
+
+def evict_old_entries(cache_dir: str, max_entries: int) -> None:
+    # 캐시 디렉터리의 항목을 최근 사용(mtime) 순으로 max_entries 개만 남긴다
+    entries = _cache_entries(cache_dir)
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - max_entries]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class DiskCache:
+    """Directory-per-key cache under ``data/cache``, trimmed by last use.
+
+    The directory and the number of kept entries are read from ``dir_env`` and
+    ``max_entries_env`` on every call, so they can be changed at runtime.
+    """
+
+    def __init__(self, name: str, dir_env: str, max_entries_env: str, default_max_entries: int) -> None:
+        self.name = name
+        self.dir_env = dir_env
+        self.max_entries_env = max_entries_env
+        self.default_max_entries = default_max_entries
+
+    @property
+    def cache_dir(self) -> str:
+        cache_dir = os.getenv(self.dir_env) or os.path.join(_get_data_path(), "cache", self.name)
+        return os.path.abspath(cache_dir)
+
+    @property
+    def max_entries(self) -> int:
+        return int(os.getenv(self.max_entries_env, str(self.default_max_entries)))
+
+    def entry_dir(self, key: str, filenames: tuple[str, ...]) -> str | None:
+        """Directory of ``key`` if it holds every file in ``filenames``, else ``None``."""
+        entry_dir = os.path.join(self.cache_dir, key)
+        if not all(os.path.exists(os.path.join(entry_dir, filename)) for filename in filenames):
+            return None
+        # LRU 정리를 위해 사용 시각을 갱신
+        os.utime(entry_dir)
+        return entry_dir
+
+    def store(self, key: str, write: Callable[[str], None]) -> None:
+        """Create the entry of ``key`` by calling ``write`` on an empty directory."""
+        cache_dir = self.cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        entry_dir = os.path.join(cache_dir, key)
+        if os.path.exists(entry_dir):
+            return
+
+        # 임시 디렉터리에 쓰고 rename 해서 다른 워커가 반쯤 쓰인 캐시를 읽지 않게 한다
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+        try:
+            write(tmp_dir)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.exists(entry_dir):
+                raise
+        evict_old_entries(cache_dir, self.max_entries)
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    def __len__(self) -> int:
+        cache_dir = self.cache_dir
+        return len(_cache_entries(cache_dir)) if os.path.isdir(cache_dir) else 0
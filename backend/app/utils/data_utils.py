@@ -1,8 +1,8 @@
 import os
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, List, Tuple
 
 import pandas as pd
-import json
 from sqlalchemy import func, select
 
 if TYPE_CHECKING:
@@ -36,6 +36,15 @@ def _get_ingest_service():
     return _ingest_service
 
 
+def get_configured_coin_symbols(timeframe: int) -> list[str]:
+    # ohlcv_settings.yml에서 해당 timeframe을 수집하는 코인 목록
+    timeframe_label = _minutes_to_timeframe_label(timeframe)
+    coin_symbols = []
+    for cfg in _get_ingest_service().symbol_configs:
+        if timeframe_label in {tf.raw for tf in cfg.targets}:
+            coin_symbols.append(cfg.symbol.replace("KRW-", "").upper())
+    return coin_symbols
+
 def get_all_data_info() -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
     from app.db import models
     from app.db.database import SessionLocal
@@ -65,15 +74,13 @@ def get_all_data_info() -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
     return data_info
 
 def get_model_meta_info(coin_symbol: str, timeframe: int) -> dict:
+    from app.services.model_meta_service import get_model_meta_registry
+
     MODEL_NAME = "LightGBM"
     PARAM_NAME = f"{coin_symbol}_{timeframe}m"
-    MODEL_FULL_NAME = f"{MODEL_NAME}+{PARAM_NAME}"
-    data_path = _get_data_path()
-    model_meta_path = os.path.join(data_path, 'meta', 'model_stats.json')
-    meta_info = json.load(open(model_meta_path, 'r'))
-    return meta_info[MODEL_FULL_NAME]
+    return get_model_meta_registry().get(MODEL_NAME, PARAM_NAME).to_dict()
 
-def get_ohlcv_df(coin_symbol: str, timeframe: int) -> pd.DataFrame:
+def get_ohlcv_df(coin_symbol: str, timeframe: int, start: datetime | None = None, end: datetime | None = None) -> pd.DataFrame:
     symbol = "KRW-" + coin_symbol.upper()
     timeframe_label = _minutes_to_timeframe_label(timeframe)
 
@@ -88,10 +95,34 @@ def get_ohlcv_df(coin_symbol: str, timeframe: int) -> pd.DataFrame:
 
     session = SessionLocal()
     try:
-        df = ingest_service.dataframe_for_range(session, symbol, timeframe_label)
+        df = ingest_service.dataframe_for_range(session, symbol, timeframe_label, start=start, end=end)
     finally:
         session.close()
 
     if df.empty:
         raise ValueError(f"No OHLCV data available for {coin_symbol} at {timeframe_label}.")
     return df
+
+def get_ohlcv_history_df(coin_symbol: str, timeframe: int, timestamp: pd.Timestamp, rows: int) -> pd.DataFrame:
+    """At least the ``rows`` candles up to ``timestamp`` (all of them if there are fewer)."""
+    # 빠진 봉이 있어도 rows개는 남도록 넉넉히 읽고, 모자라면 그 시점까지 전체를 읽는다
+    end = timestamp.to_pydatetime()
+    start = (timestamp - pd.Timedelta(minutes=timeframe * rows * 2)).to_pydatetime()
+    df = get_ohlcv_df(coin_symbol, timeframe, start=start, end=end)
+    if len(df) < rows:
+        df = get_ohlcv_df(coin_symbol, timeframe, end=end)
+    return df
+
+def get_recent_ohlcv_df(coin_symbol: str, timeframe: int, rows: int) -> pd.DataFrame:
+    """At least the last ``rows`` candles (all of them if there are fewer)."""
+    from app.services.ohlcv_service import normalize_timestamp
+
+    # 빠진 봉이 있어도 rows개는 남도록 넉넉히 읽는다
+    start = normalize_timestamp(datetime.now(timezone.utc)) - timedelta(minutes=timeframe * rows * 2)
+    try:
+        df = get_ohlcv_df(coin_symbol, timeframe, start=start)
+    except ValueError:
+        df = None
+    if df is None or len(df) < rows:
+        df = get_ohlcv_df(coin_symbol, timeframe)
+    return df
@@ -0,0 +1,40 @@
+import hashlib
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from app.utils.cache_utils import DiskCache
+
+# 하이퍼파라미터만 바꿔 재학습할 때 같은 binning 결과를 재사용할 수 있도록 pre-filter를 끈다
+DATASET_PARAMS = {"feature_pre_filter": False, "verbose": -1}
+DATASET_FILE = "train.bin"
+MATRIX_FILE = "features.npy"
+
+_disk_cache = DiskCache("lgb_dataset", "LGB_DATASET_CACHE_DIR", "LGB_DATASET_CACHE_MAX_ENTRIES", 16)
+
+
+def dataset_cache_key(df: pd.DataFrame, feature_version: int) -> str:
+    # 구간(시작/끝/길이)과 feature 버전, 원본 OHLCV 내용으로 키를 만든다
+    digest = hashlib.sha1()
+    digest.update(f"{feature_version}|{df.index[0]}|{df.index[-1]}|{len(df)}".encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:24]
+
+
+def load_cached_dataset(key: str) -> tuple[lgb.Dataset, np.ndarray] | None:
+    entry_dir = _disk_cache.entry_dir(key, (DATASET_FILE, MATRIX_FILE))
+    if entry_dir is None:
+        return None
+    dataset = lgb.Dataset(os.path.join(entry_dir, DATASET_FILE), params=DATASET_PARAMS)
+    features = np.load(os.path.join(entry_dir, MATRIX_FILE), mmap_mode="r")
+    return dataset, features
+
+
+def store_cached_dataset(key: str, dataset: lgb.Dataset, features: np.ndarray) -> None:
+    def write(entry_dir: str) -> None:
+        dataset.save_binary(os.path.join(entry_dir, DATASET_FILE))
+        np.save(os.path.join(entry_dir, MATRIX_FILE), features)
+
+    _disk_cache.store(key, write)
@@ -0,0 +1,131 @@
+import numpy as np
+from dtaidistance import dtw
+from threadpoolctl import threadpool_limits
+
+from app.utils.parallel_utils import get_worker_budget
+
+# 정확한 DTW를 묶어서 계산할 창 수 (C 호출 오버헤드 분산). 상한은 코어당 값
+MIN_BATCH_SIZE = 64
+MAX_BATCH_SIZE = 4096
+# 이보다 작은 묶음은 OpenMP 스레드를 띄우는 비용이 더 크다
+PARALLEL_MIN_BATCH_SIZE = 2048
+
+
+def normalize_windows(values: np.ndarray, window_size: int) -> np.ndarray:
+    # 구간별 min-max 정규화 (평평한 구간은 0)
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(values, dtype=np.float64), window_size)
+    windows_min = windows.min(axis=1, keepdims=True)
+    windows_max = windows.max(axis=1, keepdims=True)
+    return (windows - windows_min) / (windows_max - windows_min + 1e-12)
+
+
+def normalize_query(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return (values - values.min()) / (values.max() - values.min() + 1e-12)
+
+
+def lb_kim(query: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """LB_Kim (first/last two cells) of unconstrained DTW for every window.
+
+    Every warping path contains cell (0, 0), one of (0, 1), (1, 0), (1, 1),
+    and the mirrored cells at the end, so the sum of their minimum squared
+    costs never exceeds the squared DTW distance. Needs at least 4 points.
+    """
+    def cost(i: int, j: int) -> np.ndarray:
+        return (query[i] - windows[:, j]) ** 2
+
+    lower = cost(0, 0) + cost(-1, -1)
+    lower += np.minimum(np.minimum(cost(0, 1), cost(1, 0)), cost(1, 1))
+    lower += np.minimum(np.minimum(cost(-1, -2), cost(-2, -1)), cost(-2, -2))
+    return np.sqrt(lower)
+
+
+def dtw_distances(query: np.ndarray, candidates: np.ndarray, max_dist: float | None = None, workers: int = 1) -> np.ndarray:
+    """DTW distance from ``query`` to every row of ``candidates`` in one C call.
+
+    Distances above ``max_dist`` are abandoned early and returned as ``inf``.
+    Large batches are split over ``workers`` OpenMP threads.
+    """
+    if len(candidates) == 0:
+        return np.zeros(0, dtype=np.float64)
+    series = np.vstack([query[None, :], candidates]).astype(np.float64, copy=False)
+    options = {
+        "block": ((0, 1), (1, len(series))),
+        "compact": True,
+        "max_dist": max_dist if max_dist is not None and np.isfinite(max_dist) else None,
+    }
+    if workers > 1 and len(candidates) >= PARALLEL_MIN_BATCH_SIZE:
+        with threadpool_limits(limits=workers, user_api="openmp"):
+            distances = dtw.distance_matrix_fast(series, parallel=True, **options)
+    else:
+        distances = dtw.distance_matrix_fast(series, parallel=False, **options)
+    return np.asarray(distances, dtype=np.float64)
+
+
+def top_k_dtw(query: np.ndarray, windows: np.ndarray, top_k: int, min_gap: int,
+              lower_bounds: np.ndarray | None = None,
+              candidates: np.ndarray | None = None,
+              max_workers: int | None = None,
+              max_dist: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Top-k windows by DTW distance, at least ``min_gap`` windows apart.
+
+    Same result as sorting all exact distances and greedily keeping windows ``min_gap`` away from every window kept so far. Exact DTW
+    runs, in batches of lowest bounds first, only on windows whose bound beats
+    the best unselected exact distance, abandoning early above it. An abandoned
+    window keeps that threshold as its new bound and may be computed again
+    once the best distance rises past it.
+
+    ``candidates`` restricts the search to those rows of ``windows`` (e.g. a
+    date range of a memory-mapped index) without copying; ``min_gap`` is still
+    measured in rows of ``windows``.
+
+    Exact DTW batches use up to ``get_worker_budget(max_workers)`` threads, and
+    the batch size cap grows with it so long ranges keep every core busy.
+
+    With ``max_dist`` only windows closer than it are returned, and windows
+    that cannot beat it are never computed (e.g. the k-th distance found so
+    far in another series).
+    """
+    query = np.asarray(query, dtype=np.float64)
+    available = np.ones(len(windows), dtype=bool)
+    if candidates is not None:
+        available[:] = False
+        available[candidates] = True
+    if lower_bounds is None:
+        lower_bounds = np.full(len(windows), np.inf)
+        rows = np.flatnonzero(available)
+        # LB_Kim은 앞뒤 두 점만 쓰므로 그 열만 읽는다
+        lower_bounds[rows] = lb_kim(query, windows[np.ix_(rows, [0, 1, -2, -1])])
+    bounds = np.array(lower_bounds, dtype=np.float64)
+    exact = np.full(len(windows), np.inf)
+    computed = np.zeros(len(windows), dtype=bool)
+    workers = get_worker_budget(max_workers)
+    ceiling = np.inf if max_dist is None else float(max_dist)
+    batch_size = MIN_BATCH_SIZE
+    selected: list[int] = []
+    distances: list[float] = []
+
+    while len(selected) < top_k:
+        known = np.where(available & computed, exact, np.inf)
+        best_idx = int(np.argmin(known)) if len(known) else 0
+        best = known[best_idx] if len(known) else np.inf
+        limit = min(best, ceiling)
+
+        candidates = np.flatnonzero(available & ~computed & (bounds < limit))
+        if len(candidates):
+            if len(candidates) > batch_size:
+                # 하한이 작은 창부터 계산해야 best가 빨리 줄어든다
+                candidates = candidates[np.argpartition(bounds[candidates], batch_size - 1)[:batch_size]]
+            batch = dtw_distances(query, windows[candidates], limit, workers)
+            finite = np.isfinite(batch)
+            exact[candidates[finite]] = batch[finite]
+            computed[candidates[finite]] = True
+            bounds[candidates[~finite]] = limit
+            batch_size = min(batch_size * 2, MAX_BATCH_SIZE * workers)
+            continue
+        if not best < ceiling:
+            break
+        selected.append(best_idx)
+        distances.append(float(best))
+        available[max(best_idx - min_gap + 1, 0):best_idx + min_gap] = False
+    return np.array(selected, dtype=np.int64), np.array(distances, dtype=np.float64)
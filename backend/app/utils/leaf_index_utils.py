@@ -0,0 +1,68 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.utils.cache_utils import DiskCache, LRUCache
+
+LEAVES_FILE = "leaves.npy"
+INDEX_FILE = "index.npy"
+
+# 디스크의 memmap을 프로세스 안에서 다시 열지 않도록 핸들을 보관
+_loaded = LRUCache(8)
+_disk_cache = DiskCache("leaf_index", "LEAF_INDEX_CACHE_DIR", "LEAF_INDEX_CACHE_MAX_ENTRIES", 32)
+
+
+def leaf_index_key(model_key: tuple, train_df: pd.DataFrame, feature_version: int) -> str:
+    # 모델 파일(경로 + mtime), 학습 구간, feature 버전으로 키를 만든다
+    payload = f"{model_key}|{train_df.index[0]}|{train_df.index[-1]}|{len(train_df)}|{feature_version}"
+    return hashlib.sha1(payload.encode()).hexdigest()[:24]
+
+
+def compact_leaf_matrix(leaves: np.ndarray) -> np.ndarray:
+    # 트리당 leaf 번호는 num_leaves 미만이므로 대부분 uint8로 충분하다
+    leaves = np.asarray(leaves)
+    max_leaf = int(leaves.max()) if leaves.size else 0
+    dtype = np.uint8 if max_leaf <= np.iinfo(np.uint8).max else np.uint16
+    return np.ascontiguousarray(leaves, dtype=dtype)
+
+
+def load_leaf_index(key: str) -> tuple[np.ndarray, np.ndarray] | None:
+    cached = _loaded.get(key)
+    if cached is not None:
+        return cached
+    entry_dir = _disk_cache.entry_dir(key, (LEAVES_FILE, INDEX_FILE))
+    if entry_dir is None:
+        return None
+    loaded = np.load(os.path.join(entry_dir, LEAVES_FILE), mmap_mode="r"), np.load(os.path.join(entry_dir, INDEX_FILE))
+    _loaded.put(key, loaded)
+    return loaded
+
+
+def store_leaf_index(key: str, leaves: np.ndarray, timestamps: np.ndarray) -> None:
+    def write(entry_dir: str) -> None:
+        np.save(os.path.join(entry_dir, LEAVES_FILE), leaves)
+        np.save(os.path.join(entry_dir, INDEX_FILE), timestamps)
+
+    _disk_cache.store(key, write)
+
+
+def top_k_matches(leaves: np.ndarray, ref_leaf: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Rows of ``leaves`` sharing the most leaves with ``ref_leaf``.
+
+    Returns row positions (most shared first, earlier rows first on ties) and
+    their match counts.
+    """
+    ref_leaf = np.asarray(ref_leaf, dtype=leaves.dtype)
+    matches = np.count_nonzero(leaves == ref_leaf, axis=1)
+    top_k = min(top_k, len(matches))
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=matches.dtype)
+    candidates = np.argpartition(-matches, top_k - 1)[:top_k]
+    # 동점 경계에 걸린 행까지 모아 (일치 수 내림차순, 시간순)으로 정렬
+    threshold = matches[candidates].min()
+    candidates = np.flatnonzero(matches >= threshold)
+    order = np.lexsort((candidates, -matches[candidates]))[:top_k]
+    rows = candidates[order]
+    return rows, matches[rows]
@@ -1,11 +1,14 @@
 import importlib
 import inspect
 import os
+import re
 
 from app.utils.data_utils import _get_data_path
 from app.strategies.strategy import Strategy
 
 STRATEGY_REGISTRY: dict[str, type[Strategy]] = {}
+# 심볼/타임프레임별 모델 파라미터 이름: <COIN>_<tf>m (예: BTC_60m)
+PARAM_NAME_PATTERN = re.compile(r"^([A-Za-z0-9]+)_(\d+)m$")
 
 def _get_strategies_dir() -> str:
     current_dir = os.path.dirname(__file__)
@@ -46,6 +49,12 @@ def get_param_path(model_name: str, param_name: str) -> str:
     params_file_dir = os.path.join(params_dir, file_name)
     return params_file_dir
 
+def parse_param_name(param_name: str) -> tuple[str, int] | None:
+    match = PARAM_NAME_PATTERN.match(param_name)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2))
+
 def get_all_param_names() -> dict[str, list[str]]:
     params_dir = _get_params_dir()
     params_dict: dict[str, list[str]] = {}
@@ -58,3 +67,13 @@ def get_all_param_names() -> dict[str, list[str]]:
             params_dict[model_class] = []
         params_dict[model_class].append(model_name)
     return params_dict
+
+def save_strategy_atomically(strategy: Strategy, path: str) -> None:
+    # 읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일에 쓰고 교체한다
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        strategy.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
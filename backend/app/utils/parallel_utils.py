@@ -0,0 +1,66 @@
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+# Celery prefork 워커는 daemon 프로세스라 multiprocessing/concurrent.futures로는
+# 자식 프로세스를 만들 수 없다. billiard(Celery의 multiprocessing 포크)는 허용한다.
+from billiard.pool import Pool
+
+from app.celery_app import celery_app
+
+_shared_state: Any = None
+
+
+def get_worker_budget(max_workers: int | None = None) -> int:
+    # 기본값은 CPU 코어를 prefork 워커 프로세스들이 나눠 쓰는 몫 (동시에 도는 태스크끼리 과할당하지 않도록)
+    budget = int(os.getenv("PARALLEL_MAX_WORKERS", "0")) or _per_worker_cpus()
+    if max_workers:
+        budget = min(budget, max_workers)
+    return max(1, budget)
+
+
+def _per_worker_cpus() -> int:
+    cpu_count = os.cpu_count() or 1
+    concurrency = celery_app.conf.worker_concurrency or cpu_count
+    return max(1, cpu_count // concurrency)
+
+
+def _init_worker(shared: Any) -> None:
+    global _shared_state
+    _shared_state = shared
+
+
+def _call_with_shared(payload: tuple[Callable, Any]) -> Any:
+    func, item = payload
+    return func(item, _shared_state)
+
+
+def parallel_map(func: Callable[[Any, Any], Any], items: Iterable, shared: Any = None, max_workers: int | None = None) -> list:
+    """Run ``func(item, shared)`` for every item across a process pool.
+
+    ``shared`` is handed to each worker once at start-up instead of being
+    pickled with every item, so large read-only inputs (signal arrays, feature
+    matrices) are not copied per task. ``func`` must be a module-level function.
+    """
+    items = list(items)
+    workers = min(get_worker_budget(max_workers), len(items))
+    if workers <= 1:
+        return [func(item, shared) for item in items]
+    with Pool(processes=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        return pool.map(_call_with_shared, [(func, item) for item in items])
+
+
+@contextmanager
+def worker_pool(shared: Any = None, max_workers: int | None = None) -> Iterator[Callable[[Callable, Iterable], Iterator]]:
+    """Keep one process pool open across several batches of ``func(item, shared)``.
+
+    Yields ``imap_unordered(func, items)``, which returns results as soon as
+    each item finishes (in completion order). Like ``parallel_map``, ``shared``
+    is handed to each worker once at start-up.
+    """
+    workers = get_worker_budget(max_workers)
+    if workers <= 1:
+        yield lambda func, items: (func(item, shared) for item in items)
+        return
+    with Pool(processes=workers, initializer=_init_worker, initargs=(shared,)) as pool:
+        yield lambda func, items: pool.imap_unordered(_call_with_shared, [(func, item) for item in items])
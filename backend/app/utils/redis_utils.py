@@ -0,0 +1,25 @@
+import os
+import threading
+
+import redis
+
+_clients: dict[tuple[int, str], redis.Redis] = {}
+_lock = threading.Lock()
+
+
+def get_cache_redis_url() -> str:
+    return os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/2")
+
+
+def get_redis(url: str | None = None) -> redis.Redis:
+    # fork 이후 자식 프로세스가 부모의 커넥션 풀을 공유하지 않도록 pid별로 만든다
+    url = url or get_cache_redis_url()
+    key = (os.getpid(), url)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=2)
+                _clients[key] = client
+    return client
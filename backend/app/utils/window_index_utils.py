@@ -0,0 +1,444 @@
+"""Persistent index of min-max normalised sliding windows for chart search.
+
+One directory per (symbol, timeframe, window size) holds raw little-endian
+arrays that are memory-mapped on read:
+
+- ``timestamps-<gen>.i8``: candle timestamps (ns); window ``i`` spans rows
+  ``i .. i + window_size - 1``
+- ``windows-<gen>.f8``: normalised closes, one row per window
+- ``embeddings-<gen>.f4``: PAA summary of each normalised window
+- ``ivf_centroids-<ivf gen>.f4`` / ``ivf_labels-<ivf gen>.i4``: optional IVF
+  index over the embeddings (k-means centroids and each window's list)
+
+``meta.json`` records the window count and the generation. New candles are
+appended to the files before ``meta.json`` is replaced, so readers never see a
+partial row; a rebuild writes a new generation instead.
+
+``MultiWindowIndex`` searches the indexes of several symbols as one. The
+approximate search is opt-in: when ``ANN_MIN_WINDOWS`` is set, the post-ingest
+task keeps an IVF index for every index with at least that many windows
+(``update_ivf_index``), and searches over that many candidates are narrowed to
+a shortlist that is re-ranked with exact DTW. Requests never train k-means;
+without a stored IVF index they search exactly.
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ann_index_utils import IVFIndex, nearest_centroids
+from app.utils.cache_utils import LRUCache
+from app.utils.data_utils import _get_data_path, get_ohlcv_df
+from app.utils.dtw_search_utils import lb_kim, normalize_windows, top_k_dtw
+
+INDEX_VERSION = 1
+DEFAULT_WINDOW_SIZES = (24,)
+EMBEDDING_SEGMENTS = 8
+META_FILE = "meta.json"
+
+# (디렉터리, generation, count, IVF 버전)별 memmap 핸들
+_loaded = LRUCache(16)
+
+
+def _get_index_root() -> str:
+    index_dir = os.getenv("WINDOW_INDEX_DIR") or os.path.join(_get_data_path(), "cache", "window_index")
+    return os.path.abspath(index_dir)
+
+
+def _index_dir(coin_symbol: str, timeframe: int, window_size: int) -> str:
+    return os.path.join(_get_index_root(), f"{coin_symbol.upper()}_{timeframe}m_w{window_size}")
+
+
+def paa_embeddings(windows: np.ndarray, segments: int = EMBEDDING_SEGMENTS) -> np.ndarray:
+    # 창을 segments개 구간 평균으로 요약 (Piecewise Aggregate Approximation)
+    window_size = windows.shape[1]
+    edges = np.linspace(0, window_size, segments + 1).round().astype(int)
+    sums = np.add.reduceat(windows, edges[:-1], axis=1)
+    return (sums / np.diff(edges)).astype(np.float32)
+
+
+class WindowIndex:
+    def __init__(self, timestamps: np.ndarray, windows: np.ndarray, embeddings: np.ndarray, window_size: int,
+                 ivf_centroids: np.ndarray | None = None, ivf_labels: np.ndarray | None = None) -> None:
+        self.timestamps = timestamps
+        self.windows = windows
+        self.embeddings = embeddings
+        self.window_size = window_size
+        self.ivf_centroids = ivf_centroids
+        self.ivf_labels = ivf_labels
+        self._ivf: IVFIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    @property
+    def start_timestamps(self) -> np.ndarray:
+        return self.timestamps[:len(self.windows)]
+
+    @property
+    def end_timestamps(self) -> np.ndarray:
+        return self.timestamps[self.window_size - 1:]
+
+    def positions_between(self, start: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+                          exclude: tuple[pd.Timestamp, pd.Timestamp] | None = None) -> np.ndarray:
+        """Windows lying entirely inside [start, end], minus those overlapping ``exclude``."""
+        first = 0 if start is None else int(np.searchsorted(self.start_timestamps, _to_ns(start), side="left"))
+        last = len(self) if end is None else int(np.searchsorted(self.end_timestamps, _to_ns(end), side="right"))
+        positions = np.arange(first, max(first, last), dtype=np.int64)
+        if exclude is not None:
+            overlaps = (self.start_timestamps[positions] <= _to_ns(exclude[1])) & (self.end_timestamps[positions] >= _to_ns(exclude[0]))
+            positions = positions[~overlaps]
+        return positions
+
+    def ivf_index(self) -> IVFIndex | None:
+        """The stored IVF index (``None`` until ``update_ivf_index`` has built one)."""
+        if self.ivf_centroids is None:
+            return None
+        if self._ivf is None:
+            labels = np.asarray(self.ivf_labels[:len(self)])
+            # IVF 갱신 전에 추가된 창은 저장된 중심점에 배정만 한다
+            if len(labels) < len(self):
+                labels = np.concatenate([labels, nearest_centroids(self.embeddings[len(labels):], self.ivf_centroids)])
+            self._ivf = IVFIndex(self.ivf_centroids, labels)
+        return self._ivf
+
+    def shortlist(self, query: np.ndarray, positions: np.ndarray, min_windows: int | None = None,
+                  n_probe: int | None = None, size: int | None = None) -> np.ndarray:
+        """Approximate nearest ``positions`` to the normalised ``query`` for exact re-ranking.
+
+        Returns ``positions`` unchanged when ANN is off (``min_windows`` 0),
+        there are fewer than ``min_windows`` or no IVF index is stored.
+        """
+        settings = get_ann_settings()
+        min_windows = settings["min_windows"] if min_windows is None else min_windows
+        ivf = self.ivf_index()
+        if min_windows <= 0 or len(positions) < min_windows or ivf is None:
+            return positions
+        allowed = np.zeros(len(self), dtype=bool)
+        allowed[positions] = True
+        query_embedding = paa_embeddings(np.asarray(query, dtype=np.float64)[None, :])[0]
+        return ivf.shortlist(
+            self.embeddings, query_embedding, n_probe or settings["n_probe"], size or settings["shortlist_size"], allowed
+        )
+
+
+def get_ann_settings() -> dict:
+    return {
+        # 0이면 근사 검색을 쓰지 않는다 (기본값; 재현율이 정확 검색보다 낮음)
+        "min_windows": int(os.getenv("ANN_MIN_WINDOWS", "0")),
+        "n_probe": int(os.getenv("ANN_PROBES", "32")),
+        "shortlist_size": int(os.getenv("ANN_SHORTLIST_SIZE", "16384")),
+    }
+
+
+class MultiWindowIndex:
+    """Per-symbol window indexes (same timeframe and window size) searched together.
+
+    The memory-mapped windows of each symbol are used in place; selecting
+    symbols or a date range never copies or rebuilds anything.
+    """
+
+    def __init__(self, indexes: dict[str, WindowIndex]) -> None:
+        sizes = {index.window_size for index in indexes.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"Window sizes differ across symbols: {sorted(sizes)}")
+        self.indexes = {coin_symbol.upper(): index for coin_symbol, index in indexes.items()}
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.indexes)
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.indexes.values())
+
+    def top_k(self, query: np.ndarray, top_k: int, min_gap: int, symbols: list[str] | None = None,
+              start: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+              exclude: dict[str, tuple[pd.Timestamp, pd.Timestamp]] | None = None,
+              max_workers: int | None = None) -> list[tuple[str, int, float]]:
+        """Top-k (symbol, position, distance) over all selected symbols, closest first.
+
+        ``min_gap`` applies within a symbol only. Large symbols are narrowed
+        by :meth:`WindowIndex.shortlist` first. Symbols are searched in order
+        of their smallest LB_Kim bound, and each search only considers windows
+        closer than the k-th distance found so far.
+        """
+        exclude = {coin_symbol.upper(): span for coin_symbol, span in (exclude or {}).items()}
+        selected = self.symbols if symbols is None else [coin_symbol.upper() for coin_symbol in symbols]
+        searches = []
+        for coin_symbol in selected:
+            index = self.indexes.get(coin_symbol)
+            if index is None:
+                continue
+            positions = index.shortlist(query, index.positions_between(start, end, exclude.get(coin_symbol)))
+            if len(positions) == 0:
+                continue
+            bounds = np.full(len(index), np.inf)
+            bounds[positions] = lb_kim(query, index.windows[np.ix_(positions, [0, 1, -2, -1])])
+            searches.append((float(bounds[positions].min()), coin_symbol, positions, bounds))
+
+        results: list[tuple[str, int, float]] = []
+        for lowest, coin_symbol, positions, bounds in sorted(searches, key=lambda search: search[0]):
+            threshold = results[top_k - 1][2] if len(results) >= top_k else None
+            if threshold is not None and lowest >= threshold:
+                break
+            index = self.indexes[coin_symbol]
+            found, distances = top_k_dtw(query, index.windows, top_k, min_gap, lower_bounds=bounds,
+                                         candidates=positions, max_workers=max_workers, max_dist=threshold)
+            results = sorted(results + [(coin_symbol, int(i), float(d)) for i, d in zip(found, distances)],
+                             key=lambda result: result[2])[:top_k]
+        return results
+
+
+def load_multi_window_index(coin_symbols: list[str], timeframe: int, window_size: int) -> MultiWindowIndex:
+    # 수집 후 갱신된 인덱스를 그대로 읽는다. 인덱스가 없는 심볼은 건너뜀
+    indexes = {}
+    for coin_symbol in coin_symbols:
+        index = load_window_index(coin_symbol, timeframe, window_size)
+        if index is not None and len(index):
+            indexes[coin_symbol] = index
+    return MultiWindowIndex(indexes)
+
+
+def _to_ns(timestamp) -> np.int64:
+    return np.int64(pd.Timestamp(timestamp).tz_localize(None).value)
+
+
+def _paths(index_dir: str, generation: int) -> dict[str, str]:
+    return {
+        "timestamps": os.path.join(index_dir, f"timestamps-{generation}.i8"),
+        "windows": os.path.join(index_dir, f"windows-{generation}.f8"),
+        "embeddings": os.path.join(index_dir, f"embeddings-{generation}.f4"),
+    }
+
+
+def _ivf_paths(index_dir: str, generation: int) -> dict[str, str]:
+    return {
+        "ivf_centroids": os.path.join(index_dir, f"ivf_centroids-{generation}.f4"),
+        "ivf_labels": os.path.join(index_dir, f"ivf_labels-{generation}.i4"),
+    }
+
+
+def read_index_meta(coin_symbol: str, timeframe: int, window_size: int) -> dict | None:
+    try:
+        with open(os.path.join(_index_dir(coin_symbol, timeframe, window_size), META_FILE), "r", encoding="utf-8") as fp:
+            meta = json.load(fp)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return meta if meta.get("version") == INDEX_VERSION else None
+
+
+def load_window_index(coin_symbol: str, timeframe: int, window_size: int) -> WindowIndex | None:
+    meta = read_index_meta(coin_symbol, timeframe, window_size)
+    if meta is None:
+        return None
+    index_dir = _index_dir(coin_symbol, timeframe, window_size)
+    ivf_version = (meta["ivf"]["generation"], meta["ivf"]["count"]) if "ivf" in meta else None
+    key = (index_dir, meta["generation"], meta["count"], ivf_version)
+    cached = _loaded.get(key)
+    if cached is not None:
+        return cached
+    count = meta["count"]
+    paths = _paths(index_dir, meta["generation"])
+    ivf_centroids = ivf_labels = None
+    if "ivf" in meta:
+        ivf_meta = meta["ivf"]
+        ivf_paths = _ivf_paths(index_dir, ivf_meta["generation"])
+        ivf_centroids = np.fromfile(ivf_paths["ivf_centroids"], dtype=np.float32).reshape(ivf_meta["lists"], EMBEDDING_SEGMENTS)
+        ivf_labels = _open_array(ivf_paths["ivf_labels"], np.int32, (ivf_meta["count"],))
+    index = WindowIndex(
+        timestamps=_open_array(paths["timestamps"], np.int64, (count + window_size - 1,) if count else (0,)),
+        windows=_open_array(paths["windows"], np.float64, (count, window_size)),
+        embeddings=_open_array(paths["embeddings"], np.float32, (count, EMBEDDING_SEGMENTS)),
+        window_size=window_size,
+        ivf_centroids=ivf_centroids,
+        ivf_labels=ivf_labels,
+    )
+    _loaded.put(key, index)
+    return index
+
+
+def _open_array(path: str, dtype, shape: tuple) -> np.ndarray:
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+def update_window_index(coin_symbol: str, timeframe: int, window_size: int, df: pd.DataFrame) -> WindowIndex | None:
+    """Bring the index up to date with ``df`` (full history or a recent tail).
+
+    When an index exists, ``df`` must start at or before the first of the last
+    ``window_size - 1`` indexed candles; only candles after the indexed ones are
+    normalised and appended. Without an index, or when ``df`` is the full
+    history and does not line up with the index, the index is rebuilt from
+    ``df``. Returns ``None`` when ``df`` is only a tail that does not line up;
+    the caller should retry with the full history.
+    """
+    index_dir = _index_dir(coin_symbol, timeframe, window_size)
+    os.makedirs(index_dir, exist_ok=True)
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    timestamps = index.as_unit("ns").asi8
+    closes = np.asarray(df["close"], dtype=np.float64)
+    with _locked(index_dir):
+        meta = read_index_meta(coin_symbol, timeframe, window_size)
+        if meta is not None:
+            appended = _append(index_dir, meta, timestamps, closes, window_size)
+            if appended is not None:
+                if appended is not meta:
+                    _write_meta(index_dir, appended)
+                return load_window_index(coin_symbol, timeframe, window_size)
+            # 최근 구간만 받은 경우는 전체 이력으로 다시 호출해야 재생성할 수 있다
+            if len(timestamps) == 0 or timestamps[0] > meta["first_timestamp"]:
+                return None
+        if len(closes) < window_size:
+            return None
+        _write_meta(index_dir, _build(index_dir, meta, timestamps, closes, window_size))
+        _remove_stale_files(index_dir, read_index_meta(coin_symbol, timeframe, window_size))
+    return load_window_index(coin_symbol, timeframe, window_size)
+
+
+def update_ivf_index(coin_symbol: str, timeframe: int, window_size: int) -> bool:
+    """Train or extend the stored IVF index of an existing window index.
+
+    Runs k-means when there is no IVF index yet or the window count has more
+    than doubled since the centroids were trained; otherwise only the new
+    windows are assigned to the stored centroids. Meant for the post-ingest
+    task, not for requests. Returns whether anything was written.
+    """
+    index_dir = _index_dir(coin_symbol, timeframe, window_size)
+    if not os.path.isdir(index_dir):
+        return False
+    with _locked(index_dir):
+        meta = read_index_meta(coin_symbol, timeframe, window_size)
+        if meta is None or meta["count"] == 0:
+            return False
+        count = meta["count"]
+        embeddings = _open_array(_paths(index_dir, meta["generation"])["embeddings"], np.float32, (count, EMBEDDING_SEGMENTS))
+        ivf_meta = meta.get("ivf")
+        if ivf_meta is None or count > 2 * ivf_meta["trained_count"]:
+            generation = ivf_meta["generation"] + 1 if ivf_meta is not None else 0
+            ivf = IVFIndex.build(embeddings)
+            paths = _ivf_paths(index_dir, generation)
+            for name, array in (("ivf_centroids", ivf.centroids.astype(np.float32)), ("ivf_labels", ivf.labels.astype(np.int32))):
+                with open(paths[name], "wb") as fp:
+                    fp.write(np.ascontiguousarray(array).tobytes())
+            ivf_meta = {"generation": generation, "lists": len(ivf.centroids), "count": count, "trained_count": count}
+        elif ivf_meta["count"] < count:
+            paths = _ivf_paths(index_dir, ivf_meta["generation"])
+            centroids = np.fromfile(paths["ivf_centroids"], dtype=np.float32).reshape(ivf_meta["lists"], EMBEDDING_SEGMENTS)
+            # 이전 추가가 meta 갱신 전에 중단되었으면 남은 바이트를 잘라낸다
+            os.truncate(paths["ivf_labels"], ivf_meta["count"] * 4)
+            _append_bytes(paths["ivf_labels"], nearest_centroids(embeddings[ivf_meta["count"]:], centroids).astype(np.int32))
+            ivf_meta = {**ivf_meta, "count": count}
+        else:
+            return False
+        meta = {**meta, "ivf": ivf_meta}
+        _write_meta(index_dir, meta)
+        _remove_stale_files(index_dir, meta)
+    return True
+
+
+def _append(index_dir: str, meta: dict, timestamps: np.ndarray, closes: np.ndarray, window_size: int) -> dict | None:
+    tail_timestamps = np.array(meta["tail_timestamps"], dtype=np.int64)
+    tail_closes = np.array(meta["tail_closes"], dtype=np.float64)
+    start = int(np.searchsorted(timestamps, tail_timestamps[0]))
+    overlap = slice(start, start + len(tail_timestamps))
+    # 기존 마지막 (window_size - 1)개 봉이 그대로인지 확인 (값이 바뀌었으면 재생성)
+    if (len(timestamps[overlap]) != len(tail_timestamps)
+            or not np.array_equal(timestamps[overlap], tail_timestamps)
+            or not np.array_equal(closes[overlap], tail_closes)):
+        return None
+    new_timestamps = timestamps[overlap.stop:]
+    if len(new_timestamps) == 0:
+        return meta
+    context = closes[start:]
+    windows = normalize_windows(context, window_size)
+    paths = _paths(index_dir, meta["generation"])
+    # 이전 추가가 meta 갱신 전에 중단되었으면 남은 바이트를 잘라낸다
+    count = meta["count"]
+    os.truncate(paths["timestamps"], (count + window_size - 1) * 8)
+    os.truncate(paths["windows"], count * window_size * 8)
+    os.truncate(paths["embeddings"], count * EMBEDDING_SEGMENTS * 4)
+    _append_bytes(paths["timestamps"], new_timestamps.astype(np.int64))
+    _append_bytes(paths["windows"], windows)
+    _append_bytes(paths["embeddings"], paa_embeddings(windows))
+    return {
+        **meta,
+        "count": meta["count"] + len(windows),
+        "tail_timestamps": timestamps[-(window_size - 1):].tolist(),
+        "tail_closes": closes[-(window_size - 1):].tolist(),
+    }
+
+
+def _build(index_dir: str, meta: dict | None, timestamps: np.ndarray, closes: np.ndarray, window_size: int) -> dict:
+    generation = (meta["generation"] + 1) if meta is not None else 0
+    windows = normalize_windows(closes, window_size)
+    paths = _paths(index_dir, generation)
+    for name, array in (("timestamps", timestamps.astype(np.int64)), ("windows", windows), ("embeddings", paa_embeddings(windows))):
+        with open(paths[name], "wb") as fp:
+            fp.write(np.ascontiguousarray(array).tobytes())
+    return {
+        "version": INDEX_VERSION,
+        "window_size": window_size,
+        "generation": generation,
+        "count": len(windows),
+        "first_timestamp": int(timestamps[0]),
+        "tail_timestamps": timestamps[-(window_size - 1):].tolist(),
+        "tail_closes": closes[-(window_size - 1):].tolist(),
+    }
+
+
+def _append_bytes(path: str, array: np.ndarray) -> None:
+    with open(path, "ab") as fp:
+        fp.write(np.ascontiguousarray(array).tobytes())
+        fp.flush()
+        os.fsync(fp.fileno())
+
+
+def _write_meta(index_dir: str, meta: dict) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+        json.dump(meta, fp)
+    os.replace(tmp_path, os.path.join(index_dir, META_FILE))
+
+
+def _remove_stale_files(index_dir: str, meta: dict) -> None:
+    # 열려 있는 memmap은 파일이 지워져도 계속 읽을 수 있다
+    current = _paths(index_dir, meta["generation"])
+    if "ivf" in meta:
+        current.update(_ivf_paths(index_dir, meta["ivf"]["generation"]))
+    current = set(os.path.basename(path) for path in current.values())
+    for name in os.listdir(index_dir):
+        if name.split("-")[0] in ("timestamps", "windows", "embeddings", "ivf_centroids", "ivf_labels") and name not in current:
+            os.remove(os.path.join(index_dir, name))
+
+
+@contextmanager
+def _locked(index_dir: str):
+    with open(os.path.join(index_dir, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def refresh_window_index(coin_symbol: str, timeframe: int, window_size: int, df: pd.DataFrame | None = None) -> WindowIndex | None:
+    """Update the index from ``df`` (full history) or, if omitted, from the database.
+
+    Without ``df`` only candles from the indexed tail onward are read.
+    """
+    if df is not None:
+        return update_window_index(coin_symbol, timeframe, window_size, df)
+    meta = read_index_meta(coin_symbol, timeframe, window_size)
+    if meta is not None:
+        tail_start = pd.Timestamp(meta["tail_timestamps"][0]).to_pydatetime()
+        index = update_window_index(coin_symbol, timeframe, window_size, get_ohlcv_df(coin_symbol, timeframe, start=tail_start))
+        if index is not None:
+            return index
+    return update_window_index(coin_symbol, timeframe, window_size, get_ohlcv_df(coin_symbol, timeframe))
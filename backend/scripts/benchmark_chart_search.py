@@ -0,0 +1,107 @@
+"""Recall and latency of the ANN prefilter against exact similar-chart search.
+
+    PYTHONPATH=. python scripts/benchmark_chart_search.py --windows 500000
+    PYTHONPATH=. python scripts/benchmark_chart_search.py --coin BTC --timeframe 60
+
+Without ``--coin`` a synthetic random-walk index is built in a temporary
+directory. Queries are held-out windows that are not in the index. For every
+(probes, shortlist size) pair it prints mean latency of exact and ANN search,
+recall@k (share of the exact top-k windows the ANN search also returns) and
+the mean ratio of ANN to exact distances.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.dtw_search_utils import normalize_query, normalize_windows, top_k_dtw  # noqa: E402
+from app.utils.window_index_utils import load_window_index, update_ivf_index, update_window_index  # noqa: E402
+
+MIN_GAP = 12
+
+
+def _synthetic_closes(count: int, seed: int) -> np.ndarray:
+    # 변동성 국면이 바뀌는 로그 랜덤워크
+    rng = np.random.default_rng(seed)
+    volatility = np.repeat(rng.uniform(0.002, 0.02, count // 500 + 1), 500)[:count]
+    return 100 * np.exp(np.cumsum(rng.normal(0, 1, count) * volatility))
+
+
+def _load_index(args):
+    if args.coin:
+        index = load_window_index(args.coin, args.timeframe, args.window_size)
+        if index is None:
+            sys.exit(f"No window index for {args.coin} {args.timeframe}m; run the ingest task first.")
+        # 최근 구간의 창을 질의로 쓰고 검색 대상에서는 그 구간을 뺀다
+        held_out = len(index) - args.queries * MIN_GAP * 2
+        queries = np.asarray(index.windows[held_out::MIN_GAP * 2])
+        return index, queries, np.arange(held_out - args.window_size, dtype=np.int64)
+    closes = _synthetic_closes(args.windows + args.window_size - 1 + args.queries * MIN_GAP * 2, args.seed)
+    split = args.windows + args.window_size - 1
+    timestamps = pd.date_range("2020-01-01", periods=split, freq="min")
+    index = update_window_index("BENCH", 1, args.window_size, pd.DataFrame({"close": closes[:split]}, index=timestamps))
+    queries = normalize_windows(closes[split:], args.window_size)[::MIN_GAP * 2][:args.queries]
+    return index, queries, np.arange(len(index), dtype=np.int64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coin")
+    parser.add_argument("--timeframe", type=int, default=60)
+    parser.add_argument("--window-size", type=int, default=24)
+    parser.add_argument("--windows", type=int, default=500000, help="synthetic index size")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--shortlist", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not args.coin:
+            os.environ["WINDOW_INDEX_DIR"] = tmp_dir
+        index, queries, positions = _load_index(args)
+        print(f"{len(positions)} windows, {len(queries)} queries, top-{args.top_k}")
+
+        # 수집 task가 저장하는 것과 같은 IVF 인덱스를 만들거나 갱신한다
+        coin_symbol, timeframe = (args.coin, args.timeframe) if args.coin else ("BENCH", 1)
+        started = time.perf_counter()
+        update_ivf_index(coin_symbol, timeframe, args.window_size)
+        index = load_window_index(coin_symbol, timeframe, args.window_size)
+        ivf = index.ivf_index()
+        print(f"IVF update: {time.perf_counter() - started:.2f}s ({len(ivf.centroids)} lists)")
+
+        exact = []
+        started = time.perf_counter()
+        for query in queries:
+            query = normalize_query(query)
+            exact.append(top_k_dtw(query, index.windows, args.top_k, MIN_GAP, candidates=positions))
+        exact_ms = (time.perf_counter() - started) / len(queries) * 1000
+        print(f"exact: {exact_ms:.1f} ms/query")
+
+        print(f"{'probes':>6} {'shortlist':>9} {'ms/query':>9} {'recall':>7} {'dist ratio':>10}")
+        for n_probe in args.probes:
+            for size in args.shortlist:
+                hits, ratios, results = 0, [], []
+                started = time.perf_counter()
+                for query in queries:
+                    query = normalize_query(query)
+                    shortlist = index.shortlist(query, positions, min_windows=1, n_probe=n_probe, size=size)
+                    results.append(top_k_dtw(query, index.windows, args.top_k, MIN_GAP, candidates=shortlist))
+                ann_ms = (time.perf_counter() - started) / len(queries) * 1000
+                for (exact_idx, exact_dist), (ann_idx, ann_dist) in zip(exact, results):
+                    hits += len(set(exact_idx.tolist()) & set(ann_idx.tolist()))
+                    if len(ann_dist) == len(exact_dist) and exact_dist.sum() > 0:
+                        ratios.append(ann_dist.sum() / exact_dist.sum())
+                recall = hits / sum(len(exact_idx) for exact_idx, _ in exact)
+                print(f"{n_probe:>6} {size:>9} {ann_ms:>9.1f} {recall:>7.3f} {np.mean(ratios) if ratios else np.nan:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
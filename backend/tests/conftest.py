@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from celery.backends.cache import CacheBackend
+
+from app.celery_app import celery_app
+
+
+def _make_ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="60min")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.001, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.lognormal(3, 0.5, n)
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume, "value": volume * close},
+        index=index,
+    )
+
+
+class MemoryRedis:
+    """The subset of redis.Redis the caches and task dedup use, in memory."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def hset(self, key, field, value):
+        self.store.setdefault(key, {})[field.encode("utf-8")] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def pipeline(self, transaction=True):
+        return _MemoryPipeline(self)
+
+
+class _MemoryPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        pass
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def multi(self):
+        pass
+
+    def delete(self, key):
+        self.commands.append((self.client.delete, (key,)))
+
+    def hset(self, key, field, value):
+        self.commands.append((self.client.hset, (key, field, value)))
+
+    def expire(self, key, seconds):
+        self.commands.append((self.client.expire, (key, seconds)))
+
+    def execute(self):
+        for command, args in self.commands:
+            command(*args)
+        self.commands = []
+
+
+@pytest.fixture
+def make_ohlcv():
+    """Synthetic hourly OHLCV: ``make_ohlcv(n, seed=0)``."""
+    return _make_ohlcv
+
+
+@pytest.fixture
+def memory_redis():
+    return MemoryRedis()
+
+
+@pytest.fixture
+def eager_celery():
+    """Run ``delay``/``apply_async`` (and canvases) in-process, with an in-memory result backend."""
+    previous_always_eager = celery_app.conf.task_always_eager
+    previous_propagates = celery_app.conf.task_eager_propagates
+    previous_backend = celery_app._backend_cache
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+    # replace()로 만든 chord의 결과 객체도 Redis 없이 등록되도록
+    celery_app._backend_cache = CacheBackend(app=celery_app, backend="memory")
+    try:
+        yield
+    finally:
+        celery_app.conf.task_always_eager = previous_always_eager
+        celery_app.conf.task_eager_propagates = previous_propagates
+        celery_app._backend_cache = previous_backend
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.utils.ann_index_utils import IVFIndex, nearest_centroids
+from app.utils.dtw_search_utils import normalize_query
+from app.utils.window_index_utils import load_window_index, update_ivf_index, update_window_index
+
+
+def _make_index(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="60min")
+    df = pd.DataFrame({"close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=index)
+    return update_window_index("BTC", 60, 24, df)
+
+
+def test_extend_assigns_new_windows_to_existing_centroids():
+    embeddings = np.random.default_rng(0).random((2000, 8), dtype=np.float32)
+    ivf = IVFIndex.build(embeddings[:1500], n_lists=16)
+    extended = ivf.extend(embeddings[1500:])
+
+    assert len(extended) == 2000
+    np.testing.assert_array_equal(extended.labels, nearest_centroids(embeddings, ivf.centroids))
+
+
+def test_shortlist_respects_allowed_positions_and_size():
+    embeddings = np.random.default_rng(1).random((3000, 8), dtype=np.float32)
+    ivf = IVFIndex.build(embeddings, n_lists=20)
+    allowed = np.zeros(len(embeddings), dtype=bool)
+    allowed[500:2500] = True
+
+    everything = ivf.shortlist(embeddings, embeddings[0], n_probe=20, size=len(embeddings), allowed=allowed)
+    np.testing.assert_array_equal(everything, np.arange(500, 2500))
+
+    shortlist = ivf.shortlist(embeddings, embeddings[1000], n_probe=4, size=50, allowed=allowed)
+    assert len(shortlist) == 50 and 1000 in shortlist
+    assert np.all(allowed[shortlist]) and np.all(np.diff(shortlist) > 0)
+
+
+def test_window_shortlist_finds_indexed_window_and_skips_small_ranges(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    index = _make_index(5000)
+    positions = np.arange(len(index), dtype=np.int64)
+    query = normalize_query(np.asarray(index.windows[3210]))
+
+    # IVF 인덱스가 저장되기 전에는 (요청에서 학습하지 않고) 정확 검색 후보를 그대로 쓴다
+    assert index.shortlist(query, positions, min_windows=1) is positions
+    assert update_ivf_index("BTC", 60, 24)
+    index = load_window_index("BTC", 60, 24)
+    assert index.shortlist(query, positions, min_windows=len(positions) + 1) is positions
+    assert index.shortlist(query, positions, min_windows=0) is positions
+    shortlist = index.shortlist(query, positions, min_windows=1, n_probe=4, size=200)
+    assert len(shortlist) == 200 and 3210 in shortlist
+
+
+def test_ivf_index_is_extended_after_appends_and_retrained_when_doubled(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    rng = np.random.default_rng(2)
+    timestamps = pd.date_range("2024-01-01", periods=5000, freq="60min")
+    df = pd.DataFrame({"close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))}, index=timestamps)
+    update_window_index("BTC", 60, 24, df.iloc[:2000])
+    assert update_ivf_index("BTC", 60, 24)
+    trained = load_window_index("BTC", 60, 24)
+    assert not update_ivf_index("BTC", 60, 24)
+
+    # 추가된 창은 저장된 중심점에 배정만 한다
+    index = update_window_index("BTC", 60, 24, df.iloc[:2500])
+    assert len(index.ivf_index()) == len(index)
+    assert update_ivf_index("BTC", 60, 24)
+    extended = load_window_index("BTC", 60, 24)
+    np.testing.assert_array_equal(extended.ivf_centroids, trained.ivf_centroids)
+    np.testing.assert_array_equal(extended.ivf_index().labels, nearest_centroids(extended.embeddings, trained.ivf_centroids))
+
+    # 학습 당시보다 두 배 넘게 늘면 중심점을 다시 학습하고 이전 파일은 지운다
+    update_window_index("BTC", 60, 24, df)
+    assert update_ivf_index("BTC", 60, 24)
+    retrained = load_window_index("BTC", 60, 24)
+    assert len(retrained.ivf_index()) == len(retrained)
+    assert sorted(name for name in os.listdir(tmp_path / "BTC_60m_w24") if name.startswith("ivf_")) == ["ivf_centroids-1.f4", "ivf_labels-1.i4"]
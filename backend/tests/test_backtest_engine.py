@@ -0,0 +1,70 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.tasks.backtest_task import _run_backtrader, backtest_task
+from app.utils.backtest_utils import run_vectorized_backtest
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+backtest_task_module = importlib.import_module("app.tasks.backtest_task")
+
+
+class FixedSignalStrategy:
+    inference_window = 1
+
+    def __init__(self, data_df: pd.DataFrame, signals: np.ndarray):
+        self.data_df = data_df
+        self.signals = signals
+
+    def action(self, inference_df, cash_balance, coin_balance):
+        action = int(self.signals[self.data_df.index.get_loc(inference_df.index[-1])])
+        current_price = inference_df.iloc[-1]["close"]
+        if action == -1:
+            return action, coin_balance
+        if action == 1:
+            return action, (cash_balance / current_price) * 0.9
+        return action, 0.0
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_vectorized_backtest_matches_backtrader(seed, make_ohlcv):
+    df = make_ohlcv(600, seed)
+    rng = np.random.default_rng(seed)
+    signals = rng.choice([-1, 0, 1], size=len(df), p=[0.1, 0.7, 0.2])
+    if seed == 2:
+        # 갭 상승으로 체결 시 현금이 부족한 매수 주문(Margin) 재현
+        df.loc[df.index[::5], "open"] *= 1.2
+        df["high"] = np.maximum(df["high"], df["open"])
+
+    expected = _run_backtrader(FixedSignalStrategy(df, signals), df)
+    result = run_vectorized_backtest(df["open"].to_numpy(), df["close"].to_numpy(), signals)
+
+    assert result["trade_count"] == expected["trade_count"]
+    assert result["win_rate"] == pytest.approx(expected["win_rate"])
+    assert result["total_return"] == pytest.approx(expected["total_return"], abs=1e-9)
+
+
+def test_vectorized_backtest_without_trades(make_ohlcv):
+    df = make_ohlcv(50, 0)
+    signals = np.zeros(len(df), dtype=np.int8)
+    signals[-1] = 1  # 마지막 봉 주문은 체결되지 않는다
+
+    result = run_vectorized_backtest(df["open"].to_numpy(), df["close"].to_numpy(), signals)
+
+    assert result == {"win_rate": 0.0, "total_return": 0.0, "trade_count": 0}
+
+
+def test_engines_agree_on_trained_model(monkeypatch, make_ohlcv):
+    df = make_ohlcv(500, seed=3)
+    monkeypatch.setattr(backtest_task_module, "get_ohlcv_df", lambda coin_symbol, timeframe: df)
+    args = ("LightGBM", "BTC_60m", "BTC", 60, str(df.index[0]), str(df.index[-1]))
+
+    expected = backtest_task.run(*args, engine="backtrader")
+    result = backtest_task.run(*args, engine="vectorized")
+
+    assert expected["trade_count"] > 0
+    assert result["trade_count"] == expected["trade_count"]
+    assert result["win_rate"] == pytest.approx(expected["win_rate"])
+    assert result["total_return"] == pytest.approx(expected["total_return"], abs=1e-9)
@@ -0,0 +1,59 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.tasks.backtest_sweep_task import backtest_sweep_task, expand_param_grid
+from app.utils.backtest_utils import run_vectorized_backtest
+from app.utils.model_load_utils import get_param_path
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+backtest_sweep_task_module = importlib.import_module("app.tasks.backtest_sweep_task")
+
+
+def test_expand_param_grid_casts_and_takes_the_product():
+    schema = LightGBMStrategy.hyperparam_schema
+
+    combinations = expand_param_grid(schema, {"buy_threshold": [0, "0.01"], "sell_threshold": [-0.01]})
+
+    assert combinations == [
+        {"buy_threshold": 0.0, "sell_threshold": -0.01},
+        {"buy_threshold": 0.01, "sell_threshold": -0.01},
+    ]
+    assert all(isinstance(combo["buy_threshold"], float) for combo in combinations)
+
+
+@pytest.mark.parametrize("param_grid", [
+    # 모델 학습 파라미터는 공유 예측값에 반영되지 않으므로 거절
+    {"learning_rate": [0.01, 0.1]},
+    {"buy_threshold": [0.01], "unknown": [1]},
+    {"buy_threshold": []},
+])
+def test_expand_param_grid_rejects_non_signal_params(param_grid):
+    with pytest.raises(ValueError):
+        expand_param_grid(LightGBMStrategy.hyperparam_schema, param_grid)
+
+
+def test_sweep_ranks_every_threshold_combination(monkeypatch, make_ohlcv):
+    df = make_ohlcv(400, seed=5)
+    monkeypatch.setattr(backtest_sweep_task_module, "get_ohlcv_df", lambda coin_symbol, timeframe: df)
+    param_grid = {"buy_threshold": [0.0, 0.001, 0.01], "sell_threshold": [-0.001, 0.0]}
+
+    rows = backtest_sweep_task.run(
+        "LightGBM", "BTC_60m", "BTC", 60, str(df.index[0]), str(df.index[-1]), param_grid, rank_by="total_return",
+    )
+
+    assert len(rows) == 6
+    assert [row["rank"] for row in rows] == list(range(1, 7))
+    assert [row["total_return"] for row in rows] == sorted((row["total_return"] for row in rows), reverse=True)
+    strategy = LightGBMStrategy()
+    strategy.load(get_param_path("LightGBM", "BTC_60m"))
+    window = strategy.inference_window
+    outputs = [strategy.window_outputs(df, [end])[0] for end in range(window, len(df) + 1)]
+    predictions = np.r_[np.full(window - 1, np.nan), outputs]
+    for row in rows:
+        strategy.hyperparams.update(row["params"])
+        expected = run_vectorized_backtest(df["open"].to_numpy(), df["close"].to_numpy(), strategy.signals_batch(None, predictions))
+        assert row["total_return"] == pytest.approx(expected["total_return"])
+        assert row["trade_count"] == expected["trade_count"]
@@ -2,22 +2,10 @@ from types import SimpleNamespace
 
 import pytest
 
-from app.celery_app import celery_app
 from app.tasks import ohlcv_ingest_task
 from app.tasks.ohlcv_ingest_task import collect_latest_ohlcv
 
-
-@pytest.fixture(autouse=True)
-def eager_celery():
-    previous_always_eager = celery_app.conf.task_always_eager
-    previous_propagates = celery_app.conf.task_eager_propagates
-    celery_app.conf.task_always_eager = True
-    celery_app.conf.task_eager_propagates = True
-    try:
-        yield
-    finally:
-        celery_app.conf.task_always_eager = previous_always_eager
-        celery_app.conf.task_eager_propagates = previous_propagates
+pytestmark = pytest.mark.usefixtures("eager_celery")
 
 
 def test_collect_latest_task_invokes_service(monkeypatch):
@@ -0,0 +1,58 @@
+import redis
+
+from app.utils import data_utils
+from app.services.chart_feature_service import chart_feature_key, get_chart_features, refresh_latest_chart_features
+
+
+class _BrokenRedis:
+    def get(self, key):
+        raise redis.ConnectionError("down")
+
+
+def _no_database(*args, **kwargs):
+    raise AssertionError("OHLCV should not be loaded on a cache hit")
+
+
+def test_snapshot_is_computed_once_per_candle(monkeypatch, make_ohlcv, memory_redis):
+    client, df = memory_redis, make_ohlcv(300)
+    inference_time = df.index[250]
+
+    first = get_chart_features("btc", 60, inference_time, 120, total_df=df, client=client)
+    assert list(client.store) == [chart_feature_key("BTC", 60, inference_time, 120)]
+
+    monkeypatch.setattr(data_utils, "get_ohlcv_df", _no_database)
+    second = get_chart_features("BTC", 60, inference_time.isoformat(), 120, client=client)
+    assert second == first and second["close_0h"] == df["close"].iloc[250]
+
+
+def test_post_ingest_refresh_serves_latest_candle(monkeypatch, make_ohlcv, memory_redis):
+    client, df = memory_redis, make_ohlcv(300)
+
+    timestamp, features = refresh_latest_chart_features("BTC", 60, 120, total_df=df, client=client)
+
+    assert timestamp == df.index[-1]
+    monkeypatch.setattr(data_utils, "get_ohlcv_df", _no_database)
+    assert get_chart_features("BTC", 60, timestamp, 120, client=client) == features
+    assert features["close_0h"] == df["close"].iloc[-1]
+
+
+def test_features_are_computed_without_redis(make_ohlcv):
+    df = make_ohlcv(200)
+    features = get_chart_features("BTC", 60, df.index[-1], 120, total_df=df, client=_BrokenRedis())
+    assert features["close_0h"] == df["close"].iloc[-1]
+
+
+def test_cache_miss_loads_only_the_history_window(monkeypatch, make_ohlcv, memory_redis):
+    df = make_ohlcv(2000)
+    inference_time = df.index[1500]
+    loads = []
+
+    def get_ohlcv_df(coin_symbol, timeframe, start=None, end=None):
+        loads.append((start, end))
+        return df.loc[start:end]
+
+    monkeypatch.setattr(data_utils, "get_ohlcv_df", get_ohlcv_df)
+    features = get_chart_features("BTC", 60, inference_time, 120, client=memory_redis)
+
+    assert loads == [(df.index[1260], inference_time)]
+    assert features == get_chart_features("BTC", 60, inference_time, 120, total_df=df, client=_BrokenRedis())
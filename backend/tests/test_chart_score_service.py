@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from app.services.chart_score_service import SCORE_RANGES, score_chart_features
+from app.services.chart_feature_service import compute_chart_features
+
+
+def _make_trend(n: int, drift: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="60min")
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    volume = rng.lognormal(3, 0.3, n)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def _features(df: pd.DataFrame) -> dict:
+    return compute_chart_features(df)
+
+
+def test_scores_are_bounded_and_deterministic():
+    features = _features(_make_trend(120, 0.0))
+
+    scores = score_chart_features(features)
+
+    assert scores == score_chart_features(features)
+    for name, (low, high) in SCORE_RANGES.items():
+        assert low <= scores[name] <= high
+
+
+def test_scores_follow_trend_direction():
+    up = score_chart_features(_features(_make_trend(120, 0.004)))
+    down = score_chart_features(_features(_make_trend(120, -0.004)))
+
+    assert up["directionality"] > 50 > -50 > down["directionality"]
+    assert up["overextension"] > 0 > down["overextension"]
+
+
+def test_missing_features_are_neutral():
+    features = _features(_make_trend(120, 0.0))
+    features["mfi_last"] = float("nan")
+    features["obv_change_window"] = None
+
+    scores = score_chart_features(features)
+
+    assert all(np.isfinite(list(scores.values())))
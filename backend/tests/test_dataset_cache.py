@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+
+
+def test_lightgbm_training_dataset_is_cached(tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setenv("LGB_DATASET_CACHE_DIR", str(tmp_path))
+    df = make_ohlcv(1500, seed=3)
+    hyperparams = {"num_boost_round": 20}
+
+    first = LightGBMStrategy()
+    first.train(df, hyperparams)
+    assert len(os.listdir(tmp_path)) == 1
+
+    second = LightGBMStrategy()
+    train_set, features = second.build_training_dataset(df)
+    assert features.dtype == np.float32
+    second.train(df, hyperparams)
+
+    assert second.model.feature_name() == first.model.feature_name()
+    np.testing.assert_array_equal(second.predict_batch(df), first.predict_batch(df))
+    assert second.prediction_stats == first.prediction_stats
+
+
+def test_lightgbm_dataset_cache_key_depends_on_data(tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setenv("LGB_DATASET_CACHE_DIR", str(tmp_path))
+    strategy = LightGBMStrategy()
+    strategy.build_training_dataset(make_ohlcv(600, seed=0))
+    strategy.build_training_dataset(make_ohlcv(600, seed=1))
+
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from dtaidistance import dtw
+
+from app.utils.dtw_search_utils import (
+    PARALLEL_MIN_BATCH_SIZE, dtw_distances, lb_kim, normalize_query, normalize_windows, top_k_dtw,
+)
+
+
+def _brute_force_top_k(query, windows, top_k, min_gap):
+    # 기존 get_similar_charts 방식: 모든 창의 DTW 후 거리순 greedy MIN_GAP 필터
+    dists = np.array([dtw.distance_fast(query, window) for window in windows])
+    filtered = []
+    for i in np.argsort(dists, kind="stable"):
+        if all(abs(i - j) >= min_gap for j in filtered):
+            filtered.append(i)
+            if len(filtered) >= top_k:
+                break
+    return np.array(filtered), dists[filtered]
+
+
+@pytest.mark.parametrize("seed,top_k,min_gap", [(0, 4, 12), (1, 10, 12), (2, 4, 1), (3, 50, 30)])
+def test_top_k_dtw_matches_brute_force(seed, top_k, min_gap):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1500)))
+    windows = normalize_windows(close[:-100], 24)
+    query = normalize_query(close[-24:])
+
+    expected_idx, expected_dist = _brute_force_top_k(query, windows, top_k, min_gap)
+    idx, dist = top_k_dtw(query, windows, top_k, min_gap)
+
+    np.testing.assert_array_equal(idx, expected_idx)
+    np.testing.assert_allclose(dist, expected_dist)
+
+
+def test_lb_kim_is_a_lower_bound():
+    rng = np.random.default_rng(7)
+    windows = normalize_windows(rng.normal(size=600).cumsum(), 24)
+    query = normalize_query(rng.normal(size=24).cumsum())
+    exact = np.array([dtw.distance_fast(query, window) for window in windows])
+    assert np.all(lb_kim(query, windows) <= exact + 1e-12)
+
+
+def test_top_k_dtw_returns_fewer_when_gap_exhausts_windows():
+    windows = normalize_windows(np.sin(np.arange(60) / 3.0), 24)
+    idx, _ = top_k_dtw(normalize_query(np.cos(np.arange(24) / 3.0)), windows, top_k=10, min_gap=12)
+    assert len(idx) == 3
+    assert np.all(np.diff(np.sort(idx)) >= 12)
+
+
+def test_dtw_distances_parallel_matches_serial():
+    rng = np.random.default_rng(11)
+    windows = normalize_windows(rng.normal(size=PARALLEL_MIN_BATCH_SIZE + 200).cumsum(), 24)
+    query = normalize_query(rng.normal(size=24).cumsum())
+
+    serial = dtw_distances(query, windows, max_dist=2.0)
+    parallel = dtw_distances(query, windows, max_dist=2.0, workers=2)
+
+    np.testing.assert_array_equal(parallel, serial)
+    assert np.isinf(serial).any() and np.isfinite(serial).any()
+
+
+def test_top_k_dtw_max_dist_keeps_only_closer_windows():
+    rng = np.random.default_rng(5)
+    windows = normalize_windows(rng.normal(size=1200).cumsum(), 24)
+    query = normalize_query(rng.normal(size=24).cumsum())
+    all_idx, all_dist = top_k_dtw(query, windows, 10, 12)
+
+    idx, dist = top_k_dtw(query, windows, 10, 12, max_dist=all_dist[5])
+
+    np.testing.assert_array_equal(idx, all_idx[:5])
+    np.testing.assert_allclose(dist, all_dist[:5])
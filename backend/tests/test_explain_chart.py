@@ -0,0 +1,91 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.explain_schema import ExplainChartRequest
+from app.tasks.explain_chart_task import SIMILAR_CHART_WINDOW_SIZE, explain_chart_task
+from app.utils import data_utils, window_index_utils
+from app.utils.window_index_utils import update_window_index
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+explain_chart_task_module = importlib.import_module("app.tasks.explain_chart_task")
+
+
+def _closes(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="60min")
+    return pd.DataFrame({"close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=index)
+
+
+def _serve_ohlcv(monkeypatch, df: pd.DataFrame) -> list:
+    loads = []
+
+    def get_ohlcv_df(coin_symbol, timeframe, start=None, end=None):
+        loads.append((start, end))
+        return df.loc[start:end]
+
+    monkeypatch.setattr(data_utils, "get_ohlcv_df", get_ohlcv_df)
+    monkeypatch.setattr(window_index_utils, "get_ohlcv_df", get_ohlcv_df)
+    return loads
+
+
+def test_cross_symbol_search_excludes_the_inference_span_on_every_symbol(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    btc = _closes(2000)
+    # 같은 시각 ETH 차트는 정규화하면 BTC와 똑같아 제외하지 않으면 거리 0으로 뽑힌다
+    eth = btc * 3
+    for coin_symbol, df in (("BTC", btc), ("ETH", eth)):
+        update_window_index(coin_symbol, 60, SIMILAR_CHART_WINDOW_SIZE, df)
+    loads = _serve_ohlcv(monkeypatch, btc)
+    monkeypatch.setattr(explain_chart_task_module, "get_chart_features", lambda *args, **kwargs: {})
+    monkeypatch.setattr(explain_chart_task_module, "get_chart_explanation_text", lambda *args, **kwargs: "")
+    inference_time = btc.index[1500]
+
+    result = explain_chart_task.run(
+        "BTC", 60, str(inference_time), str(btc.index[0]), str(btc.index[-1]),
+        cross_symbol=True, similar_symbols=["BTC", "ETH"],
+    )
+
+    inference_start = btc.index[1500 - 99]
+    # 인덱스가 있으면 추론 시점까지의 짧은 구간만 읽는다
+    assert len(loads) == 1 and loads[0][0] is not None and loads[0][1] == inference_time
+    assert len(result["similar_charts"]) == 4
+    for chart in result["similar_charts"]:
+        window_start = chart["timestamp"] - pd.Timedelta(hours=SIMILAR_CHART_WINDOW_SIZE - 1)
+        assert chart["timestamp"] < inference_start or window_start > inference_time
+
+
+def test_similar_symbols_require_cross_symbol():
+    request = {
+        "coin_symbol": "BTC", "timeframe": 60, "inference_time": "2024-03-01T00:00:00",
+        "start": "2024-01-01T00:00:00", "end": "2024-03-01T00:00:00", "similar_symbols": ["ETH"],
+    }
+    with pytest.raises(ValidationError):
+        ExplainChartRequest(**request)
+    assert ExplainChartRequest(**request, cross_symbol=True).similar_symbols == ["ETH"]
+    with pytest.raises(ValueError):
+        explain_chart_task.run("BTC", 60, request["inference_time"], request["start"], request["end"], similar_symbols=["ETH"])
+
+
+def test_existing_index_is_only_read(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    btc = _closes(600)
+    loads = _serve_ohlcv(monkeypatch, btc)
+    monkeypatch.setattr(explain_chart_task_module, "get_chart_features", lambda *args, **kwargs: {})
+    monkeypatch.setattr(explain_chart_task_module, "get_chart_explanation_text", lambda *args, **kwargs: "")
+    builds = []
+    refresh = explain_chart_task_module.refresh_window_index
+    monkeypatch.setattr(explain_chart_task_module, "refresh_window_index", lambda *args: builds.append(args) or refresh(*args))
+    args = ("BTC", 60, str(btc.index[500]), str(btc.index[0]), str(btc.index[-1]))
+
+    # 인덱스가 없을 때만 요청에서 만들고, 이후 요청은 저장된 인덱스를 읽는다
+    first = explain_chart_task.run(*args)
+    second = explain_chart_task.run(*args)
+
+    assert len(builds) == 1
+    assert first["similar_charts"] == second["similar_charts"]
+    # 전체 이력은 인덱스를 처음 만들 때 한 번만 읽는다
+    assert sum(start is None for start, _ in loads) == 1
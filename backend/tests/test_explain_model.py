@@ -0,0 +1,97 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers import explain_router
+from app.schemas.explain_schema import ExplainModelResult
+from app.services.model_meta_service import ModelStats
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.tasks.explain_model_task import explain_model_task, get_partial_results
+from app.utils import data_utils
+from app.utils.model_load_utils import get_param_path
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+explain_model_task_module = importlib.import_module("app.tasks.explain_model_task")
+
+
+class _RecordingPublisher:
+    task_ids = []
+
+    def __init__(self, task_id):
+        self.task_ids.append(task_id)
+
+    def delta(self, text):
+        pass
+
+    def done(self, text):
+        pass
+
+
+@pytest.fixture
+def explain_inputs(monkeypatch, make_ohlcv, memory_redis):
+    df = make_ohlcv(1200, seed=7)
+    stats = ModelStats(mean=0.0, std=0.01, train_start=str(df.index[0]), train_end=str(df.index[900]))
+    monkeypatch.setattr(explain_model_task_module, "get_redis", lambda: memory_redis)
+    loads = []
+
+    def get_ohlcv_df(coin_symbol, timeframe, start=None, end=None):
+        loads.append((start, end))
+        return df.loc[start:end]
+
+    monkeypatch.setattr(explain_model_task_module, "get_ohlcv_df", get_ohlcv_df)
+    monkeypatch.setattr(data_utils, "get_ohlcv_df", get_ohlcv_df)
+    monkeypatch.setattr(explain_model_task_module, "get_model_meta_registry", lambda: SimpleNamespace(get=lambda *args: stats))
+    monkeypatch.setattr(explain_model_task_module, "get_model_explanation_text", lambda **kwargs: "설명")
+    _RecordingPublisher.task_ids = []
+    monkeypatch.setattr(explain_model_task_module, "LLMStreamPublisher", _RecordingPublisher)
+    return df, memory_redis, loads
+
+
+def test_explain_canvas_stores_partials_and_keeps_the_task_id(eager_celery, explain_inputs):
+    df, client, loads = explain_inputs
+
+    # eager apply_async는 태스크 안의 join을 막으므로, replace가 chord를 동기로 실행하도록 apply를 쓴다
+    async_result = explain_model_task.apply(args=("BTC", 60, str(df.index[1100])))
+    result = async_result.get()
+
+    # 최종 결과는 두 단계 결과를 합친 것이고 API 응답 스키마를 만족한다
+    final = ExplainModelResult(**result)
+    assert final.explanation_text == "설명" and len(final.reference_charts) == 5
+    # LLM 단계는 replace로 원래 task id를 이어받아 같은 스트림 키에 발행한다
+    assert _RecordingPublisher.task_ids == [async_result.id]
+    # 단계에는 데이터를 넘기지 않고, 각 단계가 학습 구간과 추론 창만 DB에서 읽는다
+    assert not any(key.startswith("explain-model:inputs") for key in client.store)
+    assert len(loads) == 4 and all(start is not None and end is not None for start, end in loads)
+    strategy = LightGBMStrategy()
+    strategy.load(get_param_path("LightGBM", "BTC_60m"))
+    window = strategy.inference_window
+    expected = strategy.explain(train_df=df.loc[:df.index[900]], inference_df=df.iloc[1100 - window:1100])
+    assert result["shap_values"] == pytest.approx(expected["shap_values"])
+
+    partial = get_partial_results(async_result.id)
+    assert set(partial) == {"shap", "reference_charts"}
+    assert partial["shap"]["recommendation"] == result["recommendation"]
+    assert partial["shap"]["shap_values"] == pytest.approx(result["shap_values"])
+    assert len(partial["reference_charts"]) == 5
+
+
+def test_pending_explanation_merges_partial_results(monkeypatch, explain_inputs):
+    _, client, _ = explain_inputs
+    explain_model_task_module.store_partial_result("task-1", "shap", {
+        "prediction_percentile": 91.0, "recommendation": "Buy", "shap_values": {"rsi": 0.1}, "feature_values": {"rsi": 55.0},
+    })
+    monkeypatch.setattr(explain_model_task, "AsyncResult", lambda task_id, app=None: SimpleNamespace(
+        id=task_id, status="PENDING", successful=lambda: False,
+    ))
+
+    response = asyncio.run(explain_router.get_explanation("task-1"))
+    assert response.status == "PENDING" and response.results is None
+    assert response.partial_results.recommendation == "Buy"
+    assert response.partial_results.reference_charts is None
+
+    explain_model_task_module.store_partial_result("task-1", "reference_charts", [{"timestamp": "2024-01-02T00:00:00", "similarity": 0.9}])
+    response = asyncio.run(explain_router.get_explanation("task-1"))
+    assert response.partial_results.shap_values == {"rsi": 0.1}
+    assert response.partial_results.reference_charts[0].similarity == 0.9
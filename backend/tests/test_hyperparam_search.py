@@ -0,0 +1,115 @@
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.tasks.hyperparam_search_task import halving_budgets, hyperparam_search_task, sample_hyperparams
+from app.utils.model_load_utils import get_strategy_class
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+hyperparam_search_task_module = importlib.import_module("app.tasks.hyperparam_search_task")
+
+
+def test_sampled_hyperparams_stay_in_search_range():
+    schema = LightGBMStrategy.hyperparam_schema
+    rng = np.random.default_rng(0)
+
+    for _ in range(50):
+        params = sample_hyperparams(schema, rng)
+        for name, spec in schema.items():
+            if "search_range" not in spec:
+                assert params[name] == spec["default"]
+                continue
+            low, high = spec["search_range"]
+            assert low <= params[name] <= high
+            assert isinstance(params[name], int if spec["type"] == "int" else float)
+
+
+def test_halving_budgets_grow_to_max_rounds():
+    assert halving_budgets(9, 500) == [55, 166, 500]
+    assert halving_budgets(1, 500) == [500]
+
+
+def test_halving_budgets_keep_every_rung_at_exact_powers():
+    # log(243, 3)은 4.999...라 int()로 자르면 한 단계가 빠진다
+    assert len(halving_budgets(243, 729)) == 6
+    assert halving_budgets(243, 729)[0] == 3
+    assert len(halving_budgets(26, 500)) == 3
+
+
+def _run_search(tmp_path, monkeypatch, df, holdout_scores=None):
+    param_path = tmp_path / "LightGBM+BTC_60m.crlb"
+    updates, backfills = [], []
+    monkeypatch.setattr(hyperparam_search_task_module, "get_ohlcv_df", lambda coin_symbol, timeframe: df)
+    monkeypatch.setattr(hyperparam_search_task_module, "get_param_path", lambda model_name, param_name: str(param_path))
+    monkeypatch.setattr(hyperparam_search_task_module, "get_model_meta_registry",
+                        lambda: SimpleNamespace(update=lambda *args: updates.append(args)))
+    monkeypatch.setattr(hyperparam_search_task_module, "queue_model_output_backfill", lambda *args: backfills.append(args))
+    monkeypatch.setattr(hyperparam_search_task, "update_state", lambda **kwargs: None)
+    if holdout_scores is not None:
+        scores = iter(holdout_scores)
+        monkeypatch.setattr(hyperparam_search_task_module, "holdout_l1", lambda *args: next(scores))
+    result = hyperparam_search_task.run(
+        "LightGBM", "BTC_60m", "BTC", 60, str(df.index[0]), str(df.index[-1]),
+        n_trials=3, method="halving", max_workers=1,
+    )
+    return param_path, result, updates, backfills
+
+
+def test_search_saves_only_when_it_beats_the_current_model(tmp_path, monkeypatch, make_ohlcv):
+    df = make_ohlcv(800, seed=3)
+
+    param_path, result, updates, backfills = _run_search(tmp_path, monkeypatch, df)
+    assert result["status"] == "saved"
+    assert param_path.exists()
+    assert len(updates) == 1 and backfills == [("LightGBM", "BTC_60m", "BTC", 60)]
+    # 임시 파일을 남기지 않는다
+    assert [path.name for path in tmp_path.iterdir()] == [param_path.name]
+
+    # 검증 구간 L1이 운영 모델(두 번째 호출)보다 나쁘면 덮어쓰지 않는다
+    saved_mtime = param_path.stat().st_mtime_ns
+    _, result, updates, backfills = _run_search(tmp_path, monkeypatch, df, holdout_scores=[0.2, 0.1])
+    assert result["status"] == "rejected"
+    assert (result["candidate_l1"], result["previous_l1"]) == (0.2, 0.1)
+    assert param_path.stat().st_mtime_ns == saved_mtime
+    assert updates == [] and backfills == []
+
+
+
+def test_search_fits_the_features_train_would_use(tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setenv("LGB_DATASET_CACHE_DIR", str(tmp_path / "datasets"))
+    strategy_class = get_strategy_class("LightGBM")
+    datasets, holdouts = [], []
+    make_dataset = strategy_class.make_dataset
+    holdout_l1 = hyperparam_search_task_module.holdout_l1
+
+    def record_dataset(X, y, feature_names, reference=None):
+        datasets.append((np.array(X), np.array(y)))
+        return make_dataset(X, y, feature_names, reference)
+
+    def record_holdout(strategy, features_df, target):
+        holdouts.append(features_df.index)
+        return holdout_l1(strategy, features_df, target)
+
+    monkeypatch.setattr(strategy_class, "make_dataset", staticmethod(record_dataset))
+    monkeypatch.setattr(hyperparam_search_task_module, "holdout_l1", record_holdout)
+    df = make_ohlcv(800, seed=4)
+
+    _, result, updates, _ = _run_search(tmp_path, monkeypatch, df)
+    assert result["status"] == "saved"
+    stats = updates[0][2]
+    (search_X, search_y), (valid_X, _) = datasets
+
+    # 기록된 학습 구간으로 train()이 만드는 학습 행과 같아야 한다
+    datasets.clear()
+    strategy_class().build_training_dataset(df.loc[stats.train_start:stats.train_end])
+    train_X, train_y = datasets[0]
+    np.testing.assert_array_equal(search_X, train_X)
+    np.testing.assert_array_equal(search_y, train_y)
+
+    # 검증 구간은 holdout 앞에서 끝나고, holdout은 저장 여부 판단에만 쓰인다
+    features = strategy_class().build_features(df).dropna().astype(np.float32)
+    valid_end = features.index[(features.to_numpy() == valid_X[-1]).all(axis=1)][0]
+    assert pd.Timestamp(stats.train_end) < valid_end < holdouts[0][0]
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+from app.utils.leaf_index_utils import compact_leaf_matrix, load_leaf_index, store_leaf_index, top_k_matches
+
+
+def test_compact_leaf_matrix_dtype():
+    assert compact_leaf_matrix(np.array([[0, 14], [3, 255]])).dtype == np.uint8
+    assert compact_leaf_matrix(np.array([[0, 256]])).dtype == np.uint16
+
+
+def test_top_k_matches_equals_full_sort():
+    rng = np.random.default_rng(0)
+    leaves = compact_leaf_matrix(rng.integers(0, 4, size=(2000, 50)))
+    ref_leaf = rng.integers(0, 4, size=50)
+
+    rows, counts = top_k_matches(leaves, ref_leaf, 10)
+
+    shared = (leaves.astype(np.int64) == ref_leaf).sum(axis=1)
+    expected = np.lexsort((np.arange(len(shared)), -shared))[:10]
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_array_equal(counts, shared[expected])
+
+
+def test_leaf_index_store_keeps_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("LEAF_INDEX_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("LEAF_INDEX_CACHE_MAX_ENTRIES", "2")
+    leaves = compact_leaf_matrix(np.arange(12).reshape(4, 3))
+    timestamps = np.arange(4)
+    for key in ("a", "b"):
+        store_leaf_index(key, leaves, timestamps)
+    os.utime(tmp_path / "b", (0, 0))
+    store_leaf_index("c", leaves, timestamps)
+
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+    loaded_leaves, loaded_index = load_leaf_index("c")
+    np.testing.assert_array_equal(loaded_leaves, leaves)
+    np.testing.assert_array_equal(loaded_index, timestamps)
@@ -0,0 +1,50 @@
+import os
+
+from app.services import llm_cache_service
+from app.services.llm_cache_service import DiskLLMCacheBackend, LLMCache, llm_cache_key
+
+
+def test_disk_cache_hits_on_identical_prompts(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    cache = LLMCache(DiskLLMCacheBackend(ttl_seconds=60))
+
+    assert cache.get("model", "system", "user") is None
+    cache.set("model", "system", "user", "answer")
+    assert cache.get("model", "system", "user") == "answer"
+    assert cache.get("model", "system", "other user") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+    assert llm_cache_key("model", "system", "user") != llm_cache_key("model", "system", "other user")
+
+
+def test_disk_cache_counters_are_shared_across_processes(tmp_path, monkeypatch):
+    # API 프로세스의 캐시 객체도 워커가 센 횟수를 본다
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    worker = LLMCache(DiskLLMCacheBackend(ttl_seconds=60))
+    worker.get("model", "system", "user")
+    worker.set("model", "system", "user", "answer")
+    worker.get("model", "system", "user")
+
+    api = LLMCache(DiskLLMCacheBackend(ttl_seconds=60))
+    stats = api.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_cache_expires_and_evicts(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("LLM_CACHE_MAX_ENTRIES", "2")
+    backend = DiskLLMCacheBackend(ttl_seconds=60)
+    now = [1_000.0]
+    monkeypatch.setattr(llm_cache_service.time, "time", lambda: now[0])
+
+    for i, key in enumerate(["a", "b"]):
+        backend.set(key, key)
+        os.utime(tmp_path / key, (i, i))
+    backend.set("c", "c")
+    assert sorted(name for name in os.listdir(tmp_path) if not name.startswith(".")) == ["b", "c"]
+
+    now[0] += 61
+    assert backend.get("c") is None
+    assert not (tmp_path / "c").exists()
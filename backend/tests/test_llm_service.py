@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import redis.asyncio
+
+from types import SimpleNamespace
+
+from app.services import llm_cache_service, llm_service, llm_stream_service
+from app.services.llm_cache_service import DiskLLMCacheBackend, LLMCache
+from app.services.llm_stream_service import format_sse, relay_llm_stream
+from app.utils.cache_utils import LRUCache
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # 첫 요청은 500으로 실패하고 이후에는 받은 user 프롬프트를 그대로 돌려준다
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        if len(self.requests) == 1:
+            self.send_response(500)
+            self.end_headers()
+            return
+        content = body["messages"][-1]["content"]
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for word in content.split(" "):
+                chunk = {
+                    "id": "stand-in",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": None, "delta": {"content": word + " "}}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        payload = json.dumps({
+            "id": "stand-in",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(tmp_path, monkeypatch):
+    _StandInHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_RETRY_BASE_SECONDS", "0.01")
+    monkeypatch.setattr(llm_service, "_clients", {})
+    monkeypatch.setattr(llm_service, "_async_clients", LRUCache(2))
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llm_cache_service, "_cache", LLMCache(DiskLLMCacheBackend(60)))
+    yield _StandInHandler.requests
+    server.shutdown()
+
+
+def test_chat_completion_retries_and_caches(stand_in):
+    assert llm_service.chat_completion("system", "hello") == "hello"
+    assert llm_service.chat_completion("system", "hello") == "hello"
+    # 500 한 번 + 성공 한 번, 두 번째 호출은 캐시
+    assert len(stand_in) == 2
+    assert llm_service.get_llm_client() is llm_service.get_llm_client()
+
+
+def test_chat_completion_does_not_cache_invalid_output(stand_in):
+    with pytest.raises(json.JSONDecodeError):
+        llm_service.chat_completion("system", "not json", validate=json.loads)
+    assert llm_service.chat_completion("system", '{"a": 1}', validate=json.loads) == '{"a": 1}'
+    assert len(stand_in) == 3
+
+
+def test_async_chat_completion_does_not_cache_invalid_output(stand_in):
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(llm_service.async_chat_completion("system", "not json", validate=json.loads))
+    assert asyncio.run(llm_service.async_chat_completion("system", '{"a": 1}', validate=json.loads)) == '{"a": 1}'
+    assert asyncio.run(llm_service.async_chat_completion("system", '{"a": 1}', validate=json.loads)) == '{"a": 1}'
+    assert len(stand_in) == 3
+
+
+def test_async_clients_are_per_loop_and_bounded(stand_in):
+    async def two_lookups():
+        return llm_service.get_async_llm_client(), llm_service.get_async_llm_client()
+
+    clients = []
+    for _ in range(5):
+        first, second = asyncio.run(two_lookups())
+        assert first is second
+        clients.append(first)
+
+    # 루프마다 새 클라이언트를 만들고, 끝난 루프의 클라이언트는 최근 2개까지만 남는다
+    assert len({id(client) for client in clients}) == 5
+    assert len(llm_service._async_clients) == 2
+
+
+def test_stream_chat_completion_delivers_deltas(stand_in):
+    deltas = []
+    text = llm_service.stream_chat_completion("system", "streamed reply text", deltas.append)
+    assert deltas == ["streamed ", "reply ", "text "]
+    assert text == "streamed reply text "
+
+    # 캐시 적중은 한 번에 전달
+    cached = []
+    llm_service.stream_chat_completion("system", "streamed reply text", cached.append)
+    assert cached == [text]
+    assert len(stand_in) == 2
+
+
+def test_format_sse():
+    assert format_sse("delta", {"text": "a\nb"}, event_id="1-0") == 'id: 1-0\nevent: delta\ndata: {"text": "a\\nb"}\n\n'
+
+
+class _EmptyStreamRedis:
+    # 항목이 없는 스트림: xread가 블록 시간 없이 바로 빈 결과를 돌려준다
+    async def xread(self, streams, block=None, count=None):
+        return []
+
+    async def aclose(self):
+        pass
+
+
+async def _relay(task_result, last_event_id=None) -> list[str]:
+    return [message async for message in relay_llm_stream(task_result, last_event_id)]
+
+
+def test_relay_gives_up_on_tasks_that_stay_pending(monkeypatch):
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", staticmethod(lambda url: _EmptyStreamRedis()))
+    monkeypatch.setattr(llm_stream_service, "IDLE_CHECK_SECONDS", 0)
+    monkeypatch.setenv("LLM_STREAM_PENDING_TIMEOUT_SECONDS", "0")
+    unknown_task = SimpleNamespace(id="unknown", state="PENDING", result=None)
+
+    messages = asyncio.run(_relay(unknown_task))
+    assert messages[-1].startswith("event: error") and '"status": "PENDING"' in messages[-1]
+
+    # 이미 이벤트를 받은 뒤의 이어받기는 PENDING이어도 전체 상한까지 기다린다
+    monkeypatch.setenv("LLM_STREAM_MAX_SECONDS", "0.05")
+    messages = asyncio.run(_relay(unknown_task, last_event_id="1-0"))
+    assert messages[-1].startswith("event: error") and '"status": "TIMEOUT"' in messages[-1]
+    assert ": keep-alive\n\n" in messages
@@ -0,0 +1,75 @@
+import math
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.database import Base
+from app.services import chart_feature_service, market_snapshot_service
+from app.services.market_snapshot_service import (
+    build_market_snapshot, get_market_snapshot, list_market_snapshots, store_market_snapshot,
+)
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.utils.model_load_utils import get_param_path
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[models.MarketSnapshot.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_snapshot_is_stored_and_queried_by_timestamp(monkeypatch, make_ohlcv, memory_redis):
+    client = memory_redis
+    monkeypatch.setattr(chart_feature_service, "get_redis", lambda: client)
+    monkeypatch.setattr(market_snapshot_service, "models_for_symbol", lambda coin_symbol, timeframe: [])
+    session = _session()
+    df = make_ohlcv(200)
+
+    for end in (198, 199, 200):
+        snapshot = build_market_snapshot("BTC", 60, df.iloc[:end])
+        store_market_snapshot(session, "BTC", 60, snapshot)
+    # 같은 봉을 다시 저장하면 덮어쓴다
+    store_market_snapshot(session, "BTC", 60, build_market_snapshot("BTC", 60, df))
+
+    latest = get_market_snapshot(session, "BTC", 60)
+    assert latest.timestamp == df.index[-1].to_pydatetime()
+    assert latest.symbol == "KRW-BTC" and latest.timeframe == "60m"
+    assert latest.predictions == {}
+    assert set(latest.scores) == set(snapshot["scores"])
+    assert math.isclose(latest.chart_features["close_0h"], float(df["close"].iloc[-1]))
+    # 캐시에도 같은 스냅샷이 올라간다
+    assert len(client.store) == 3
+
+    previous = get_market_snapshot(session, "BTC", 60, df.index[-2])
+    assert math.isclose(previous.chart_features["close_0h"], float(df["close"].iloc[-2]))
+    assert get_market_snapshot(session, "ETH", 60) is None
+
+    history = list_market_snapshots(session, "BTC", 60, start=df.index[-2], limit=10)
+    assert [row.timestamp for row in history] == [ts.to_pydatetime() for ts in df.index[-1:-3:-1]]
+    assert len(list_market_snapshots(session, "BTC", 60, limit=2)) == 2
+
+
+def test_snapshot_needs_full_history(monkeypatch, make_ohlcv, memory_redis):
+    monkeypatch.setattr(chart_feature_service, "get_redis", lambda: memory_redis)
+    monkeypatch.setattr(market_snapshot_service, "models_for_symbol", lambda coin_symbol, timeframe: [])
+    assert build_market_snapshot("BTC", 60, make_ohlcv(50)) is None
+
+
+def test_snapshot_predictions_match_decide_and_skip_inexact_models(monkeypatch, make_ohlcv, memory_redis):
+    monkeypatch.setattr(chart_feature_service, "get_redis", lambda: memory_redis)
+    monkeypatch.setattr(market_snapshot_service, "models_for_symbol",
+                        lambda coin_symbol, timeframe: [("LightGBM", "BTC_60m"), ("Random", "BTC_60m")])
+    df = make_ohlcv(300)
+
+    snapshot = build_market_snapshot("BTC", 60, df)
+
+    # Random은 창별로 정해진 출력이 없어 /decide와 같은 값을 낼 수 없으므로 넣지 않는다
+    assert list(snapshot["predictions"]) == ["LightGBM+BTC_60m"]
+    strategy = LightGBMStrategy()
+    strategy.load(get_param_path("LightGBM", "BTC_60m"))
+    inference_df = df.iloc[-1 - strategy.inference_window:-1]
+    prediction = snapshot["predictions"]["LightGBM+BTC_60m"]["prediction"]
+    assert prediction == strategy.window_outputs(df, [len(df) - 1])[0]
+    expected_action = strategy.action(inference_df, cash_balance=1_000_000.0, coin_balance=1.0)
+    assert strategy.action_from_output(prediction, float(inference_df["close"].iloc[-1]), 1_000_000.0, 1.0) == expected_action
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+from app.services.model_meta_service import ModelMetaRegistry, ModelStats
+
+
+def _write_stats(path, payload, mtime_ns):
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(payload, fp)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / "model_stats.json"
+    _write_stats(path, {"LightGBM+BTC_60m": {"mean": 0.1, "std": 0.2}}, 1_000_000_000)
+    registry = ModelMetaRegistry(str(path))
+
+    stats = registry.get("LightGBM", "BTC_60m")
+    assert stats == ModelStats(mean=0.1, std=0.2)
+    assert registry.get("LightGBM", "BTC_60m") is stats
+
+    _write_stats(path, {"LightGBM+BTC_60m": {"mean": 0.3, "std": 0.4}}, 2_000_000_000)
+    reloaded = registry.get("LightGBM", "BTC_60m")
+    assert (reloaded.mean, reloaded.std) == (0.3, 0.4)
+
+    with pytest.raises(KeyError):
+        registry.get("LightGBM", "ETH_60m")
+
+
+def test_registry_update_preserves_other_entries(tmp_path):
+    path = tmp_path / "model_stats.json"
+    _write_stats(path, {"LightGBM+BTC_60m": {"mean": 0.1, "std": 0.2}}, 1_000_000_000)
+    registry = ModelMetaRegistry(str(path))
+    registry.get("LightGBM", "BTC_60m")
+
+    registry.update("LightGBM", "ETH_60m", ModelStats(mean=-0.5, std=0.6, train_end="2025-01-01T00:00:00"))
+
+    assert registry.get("LightGBM", "ETH_60m").train_end == "2025-01-01T00:00:00"
+    assert registry.get("LightGBM", "BTC_60m").mean == 0.1
+    with open(path, "r", encoding="utf-8") as fp:
+        raw = json.load(fp)
+    assert raw["LightGBM+ETH_60m"] == {"mean": -0.5, "std": 0.6, "train_end": "2025-01-01T00:00:00"}
@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.database import Base
+from app.services import model_output_service
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.services.model_output_service import (
+    append_model_outputs, backfill_model_outputs, get_model_output, load_strategy,
+)
+from app.utils.model_load_utils import get_param_path
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[models.ModelOutput.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def _stored_count(session) -> int:
+    return session.execute(select(func.count()).select_from(models.ModelOutput)).scalar()
+
+
+def test_window_outputs_match_action(make_ohlcv):
+    # 캐시된 전략 인스턴스는 다른 호출과 공유하므로 별도로 로드해 임계값을 바꾼다
+    strategy = LightGBMStrategy()
+    strategy.load(get_param_path("LightGBM", "BTC_60m"))
+    strategy.hyperparams.update({"buy_threshold": 0.02, "sell_threshold": -0.02})
+    df = make_ohlcv(160)
+    window = strategy.inference_window
+    ends = np.arange(window, len(df), 3)
+
+    outputs = strategy.window_outputs(df, ends)
+
+    for end, output in zip(ends, outputs):
+        inference_df = df.iloc[end - window:end]
+        expected = strategy.action(inference_df, cash_balance=1_000_000.0, coin_balance=2.0)
+        price = float(inference_df["close"].iloc[-1])
+        assert strategy.action_from_output(output, price, cash_balance=1_000_000.0, coin_balance=2.0) == expected
+
+
+def test_outputs_are_backfilled_then_appended_per_model_version(tmp_path, monkeypatch, make_ohlcv):
+    param_path = tmp_path / "LightGBM+BTC_60m.crlb"
+    shutil.copy(get_param_path("LightGBM", "BTC_60m"), param_path)
+    monkeypatch.setattr(model_output_service, "get_param_path", lambda model_name, param_name: str(param_path))
+    session = _session()
+    df = make_ohlcv(150)
+    window = load_strategy("LightGBM", "BTC_60m")[0].inference_window
+
+    # 전체 구간 채우기 전에는 새 봉만 추가하지 않는다
+    assert append_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df.iloc[:140]) is None
+    assert backfill_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df.iloc[:140], max_workers=1) == 40
+    assert append_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df) == 10
+    assert _stored_count(session) == len(df) - window
+
+    strategy, version = load_strategy("LightGBM", "BTC_60m")
+    inference_time = df.index[120]
+    stored = get_model_output(session, "LightGBM", "BTC_60m", "BTC", 60, inference_time, version)
+    assert stored.price == df["close"].iloc[119]
+    assert np.isclose(stored.output, strategy.window_outputs(df, [120])[0])
+    assert get_model_output(session, "LightGBM", "BTC_60m", "ETH", 60, inference_time, version) is None
+    assert get_model_output(session, "LightGBM", "BTC_60m", "BTC", 60, df.index[window - 1], version) is None
+
+    # 모델 파일이 바뀌면 이전 출력은 쓰지 않고, 다시 채울 때까지 추가도 하지 않는다
+    os.utime(param_path, ns=(version + 1_000_000_000, version + 1_000_000_000))
+    _, new_version = load_strategy("LightGBM", "BTC_60m")
+    assert get_model_output(session, "LightGBM", "BTC_60m", "BTC", 60, inference_time, new_version) is None
+    assert append_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df) is None
+    assert backfill_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df, max_workers=1) == len(df) - window
+    assert _stored_count(session) == len(df) - window
+    assert get_model_output(session, "LightGBM", "BTC_60m", "BTC", 60, inference_time, new_version) is not None
+
+
+def test_backfill_does_not_lock_database_while_computing(tmp_path, monkeypatch, make_ohlcv):
+    db_url = f"sqlite:///{tmp_path / 'outputs.db'}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine, tables=[models.ModelOutput.__table__, models.MarketSnapshot.__table__])
+    session = sessionmaker(bind=engine)()
+    # 다른 프로세스의 쓰기 (대기 없이 실패하도록 timeout 0)
+    other = create_engine(db_url, connect_args={"timeout": 0})
+    df = make_ohlcv(120)
+    backfill_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df.iloc[:110], max_workers=1)
+
+    compute = model_output_service.compute_model_outputs
+    writes = []
+
+    def compute_while_other_writes(*args, **kwargs):
+        with other.begin() as connection:
+            connection.execute(models.MarketSnapshot.__table__.insert().values(
+                timeframe="60m", symbol="KRW-BTC", timestamp=df.index[len(writes)].to_pydatetime(),
+                chart_features={}, scores={}, predictions={},
+            ))
+        writes.append(True)
+        return compute(*args, **kwargs)
+
+    monkeypatch.setattr(model_output_service, "compute_model_outputs", compute_while_other_writes)
+    assert backfill_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df, max_workers=1) == 20
+    assert append_model_outputs(session, "LightGBM", "BTC_60m", "BTC", 60, total_df=df) == 0
+    assert _stored_count(session) == 20
+    assert len(writes) == 2
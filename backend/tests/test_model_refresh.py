@@ -0,0 +1,71 @@
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.model_meta_service import ModelStats
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.tasks.model_refresh_task import refresh_model_task
+from app.utils.model_load_utils import get_strategy_class, parse_param_name
+
+# app.tasks가 같은 이름의 task를 export하므로 모듈은 import_module로 가져온다
+model_refresh_task_module = importlib.import_module("app.tasks.model_refresh_task")
+
+
+def test_parse_param_name():
+    assert parse_param_name("BTC_60m") == ("BTC", 60)
+    assert parse_param_name("custom") is None
+
+
+def test_continue_training_appends_trees(make_ohlcv):
+    df = make_ohlcv(1500, seed=4)
+    strategy = LightGBMStrategy()
+    features_df = strategy.build_features(df)
+    target = strategy.build_target(df)
+    strategy.train_features(features_df.iloc[:1000], target.iloc[:1000], {"num_boost_round": 30})
+    before = strategy.model.predict(features_df.iloc[-5:].to_numpy())
+
+    strategy.continue_training(features_df.iloc[1000:], target.iloc[1000:], num_boost_round=10)
+
+    assert strategy.model.num_trees() == 40
+    assert strategy.model.feature_name() == list(features_df.columns)
+    # 앞쪽 30개 트리는 그대로이므로 첫 30 라운드 예측은 동일하다
+    np.testing.assert_allclose(strategy.model.predict(features_df.iloc[-5:].to_numpy(), num_iteration=30), before)
+
+
+@pytest.mark.parametrize("mode", ["incremental", "window"])
+def test_refresh_fits_the_features_train_would_use(mode, tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setenv("LGB_DATASET_CACHE_DIR", str(tmp_path / "datasets"))
+    strategy_class = get_strategy_class("LightGBM")
+    df = make_ohlcv(1200, seed=5)
+    param_path = tmp_path / "LightGBM+BTC_60m.crlb"
+    previous = strategy_class()
+    previous.train(df.iloc[:600], {"num_boost_round": 20})
+    previous.save(str(param_path))
+    meta = ModelStats(mean=0.0, std=1.0, train_start=df.index[0].isoformat(), train_end=df.index[599].isoformat())
+    monkeypatch.setattr(model_refresh_task_module, "get_ohlcv_df", lambda coin_symbol, timeframe: df)
+    monkeypatch.setattr(model_refresh_task_module, "get_param_path", lambda model_name, param_name: str(param_path))
+    monkeypatch.setattr(model_refresh_task_module, "get_model_meta_registry",
+                        lambda: SimpleNamespace(find=lambda *args: meta, update=lambda *args: None))
+    monkeypatch.setattr(model_refresh_task_module, "queue_model_output_backfill", lambda *args: None)
+    fitted = []
+
+    def recording(method):
+        def wrapper(self, features_df, target, *args, **kwargs):
+            fitted.append((features_df, target))
+            return method(self, features_df, target, *args, **kwargs)
+        return wrapper
+
+    for name in ("continue_training", "train_features"):
+        monkeypatch.setattr(strategy_class, name, recording(getattr(strategy_class, name)))
+
+    refresh_model_task.run("LightGBM", "BTC_60m", mode)
+
+    # train()에 같은 행을 (창 warm-up 포함) 주면 같은 feature로 학습한다
+    features_df, target = fitted[0]
+    window = previous.inference_window
+    first, last = df.index.get_loc(features_df.index[0]), df.index.get_loc(features_df.index[-1])
+    _, train_X = strategy_class().build_training_dataset(df.iloc[max(first - window + 1, 0):last + 2])
+    X, _ = previous.prepare_training_data(features_df, target, balance=False)
+    np.testing.assert_array_equal(X, train_X)
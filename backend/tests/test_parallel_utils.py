@@ -0,0 +1,28 @@
+from app.celery_app import celery_app
+from app.utils import parallel_utils
+from app.utils.parallel_utils import get_worker_budget
+
+
+def test_default_budget_splits_cpus_across_worker_processes(monkeypatch):
+    monkeypatch.delenv("PARALLEL_MAX_WORKERS", raising=False)
+    monkeypatch.setattr(parallel_utils.os, "cpu_count", lambda: 16)
+
+    # prefork 동시성 4면 태스크 하나는 16 / 4 = 4개까지 쓴다
+    monkeypatch.setattr(celery_app.conf, "worker_concurrency", 4)
+    assert get_worker_budget() == 4
+    assert get_worker_budget(max_workers=2) == 2
+
+    # 동시성을 지정하지 않으면 Celery 기본값(코어 수)이라 태스크당 1개
+    monkeypatch.setattr(celery_app.conf, "worker_concurrency", None)
+    assert get_worker_budget() == 1
+
+    monkeypatch.setattr(celery_app.conf, "worker_concurrency", 32)
+    assert get_worker_budget() == 1
+
+
+def test_explicit_budget_overrides_the_default(monkeypatch):
+    monkeypatch.setenv("PARALLEL_MAX_WORKERS", "6")
+    monkeypatch.setattr(celery_app.conf, "worker_concurrency", 4)
+
+    assert get_worker_budget() == 6
+    assert get_worker_budget(max_workers=3) == 3
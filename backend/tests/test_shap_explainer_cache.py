@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.strategies.LightGBM_strategy as lgb_strategy
+from app.strategies.LightGBM_strategy import LightGBMStrategy, summarize_background
+from app.tasks.explain_range_task import top_k_attributions
+from app.utils.model_load_utils import get_param_path
+
+
+def test_summarize_background_keeps_real_rows():
+    features_df = pd.DataFrame(np.random.default_rng(0).normal(size=(500, 4)), columns=list("abcd"))
+
+    for method in ("kmeans", "sample"):
+        background = summarize_background(features_df, 20, method)
+        assert 0 < len(background) <= 20
+        pd.testing.assert_frame_equal(background, features_df.loc[background.index])
+
+
+def test_explainer_is_cached_per_artifact(tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setattr(lgb_strategy, "SHAP_TOLERANCE_PROBE_ROWS", 0)
+    lgb_strategy._explainer_cache.clear()
+    param_path = tmp_path / "LightGBM+BTC_60m.crlb"
+    shutil.copy(get_param_path("LightGBM", "BTC_60m"), param_path)
+    df = make_ohlcv(1200)
+    train_df, inference_df = df.iloc[:1000], df.iloc[-100:]
+
+    strategy = LightGBMStrategy()
+    strategy.load(str(param_path))
+    first = strategy.explain(train_df, inference_df)
+    second = strategy.explain(train_df, inference_df)
+    assert len(lgb_strategy._explainer_cache) == 1
+    assert first == second
+
+    # 모델 파일이 교체되면 새 explainer를 만든다
+    stat = os.stat(param_path)
+    os.utime(param_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    strategy.load(str(param_path))
+    strategy.explain(train_df, inference_df)
+    assert len(lgb_strategy._explainer_cache) == 2
+
+
+def test_explain_range_matches_single_explain(tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setattr(lgb_strategy, "SHAP_TOLERANCE_PROBE_ROWS", 0)
+    lgb_strategy._shap_row_cache.clear()
+    param_path = tmp_path / "LightGBM+BTC_60m.crlb"
+    shutil.copy(get_param_path("LightGBM", "BTC_60m"), param_path)
+    df = make_ohlcv(1300, seed=1)
+    train_df = df.iloc[:1000]
+    timestamps = df.index[1100:1120]
+
+    strategy = LightGBMStrategy()
+    strategy.load(str(param_path))
+    feature_names, predictions, shap_values = strategy.explain_range(train_df, df, timestamps)
+
+    # 모든 시점이 explain과 같은 window의 값이다
+    window = strategy.inference_window
+    for i in (0, 10, 19):
+        single = strategy.explain(train_df, df.iloc[1100 + i - window:1100 + i])
+        assert predictions[i] == pytest.approx(single["prediction"])
+        for name, value in single["shap_values"].items():
+            assert shap_values[i, feature_names.index(name)] == pytest.approx(value, abs=1e-9)
+
+    # 요청 구간이 달라도 같은 시점의 값은 같다
+    lgb_strategy._shap_row_cache.clear()
+    _, shifted_predictions, shifted_shap = strategy.explain_range(train_df, df, df.index[1110:1115])
+    np.testing.assert_allclose(shifted_predictions, predictions[10:15])
+    np.testing.assert_allclose(shifted_shap, shap_values[10:15], atol=1e-6)
+
+    # 두 번째 호출은 시점별 캐시에서 같은 값을 돌려준다
+    _, cached_predictions, cached_shap = strategy.explain_range(train_df, df, timestamps)
+    np.testing.assert_array_equal(cached_predictions, predictions)
+    np.testing.assert_array_equal(cached_shap, shap_values)
+
+
+def test_top_k_attributions_orders_by_magnitude():
+    shap_values = np.array([[0.1, -0.5, 0.2, 0.0], [0.0, 0.0, -0.3, 0.4]])
+
+    top_features, top_values = top_k_attributions(shap_values, 2)
+
+    np.testing.assert_array_equal(top_features, [[1, 2], [3, 2]])
+    np.testing.assert_allclose(top_values, [[-0.5, 0.2], [0.4, -0.3]])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import ta
+
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.strategies.random_strategy import RandomStrategy
+from app.utils.model_load_utils import get_param_path
+
+
+def test_lightgbm_predict_batch_matches_action_exactly(make_ohlcv):
+    strategy = LightGBMStrategy()
+    strategy.load(get_param_path("LightGBM", "BTC_60m"))
+    strategy.hyperparams.update({"buy_threshold": 0.02, "sell_threshold": -0.02})
+    df = make_ohlcv(260)
+    # 범위가 0인 봉이 있으면 action은 창 안의 이전 완전한 행을 쓴다
+    df.iloc[200, :4] = df["close"].iloc[200]
+    window = strategy.inference_window
+
+    predictions = strategy.predict_batch(df)
+    signals = strategy.signals_batch(df, predictions)
+
+    assert np.isnan(predictions[:window - 1]).all()
+    for i in range(window - 1, len(df)):
+        inference_df = df.iloc[i - window + 1:i + 1]
+        model_input = strategy._window_features(inference_df).to_numpy(dtype=np.float64)
+        assert predictions[i] == strategy._to_pct_change(strategy.model.predict(model_input)[0])
+        assert strategy.action(inference_df, cash_balance=1_000_000.0, coin_balance=1.0)[0] == signals[i]
+
+
+def test_window_features_follow_ta_indicators(make_ohlcv):
+    strategy = LightGBMStrategy()
+    inference_df = make_ohlcv(100, seed=2)
+    close = inference_df["close"]
+
+    features = strategy._window_features(inference_df).iloc[-1]
+
+    macd = ta.trend.MACD(close)
+    bollinger = ta.volatility.BollingerBands(close)
+    assert features["rsi"] == ta.momentum.RSIIndicator(close).rsi().iloc[-1]
+    assert features["adx"] == ta.trend.ADXIndicator(inference_df["high"], inference_df["low"], close).adx().iloc[-1]
+    assert features["rel_dist_to_signal"] == ((macd.macd() - macd.macd_signal()) / macd.macd()).iloc[-1]
+    assert features["rel_dist_to_bb_upper"] == ((bollinger.bollinger_hband() - close) / close).iloc[-1]
+    trade_value = close * inference_df["volume"]
+    assert features["trade_value_z_score"] == ((trade_value - trade_value.mean()) / trade_value.std()).iloc[-1]
+
+
+def test_build_features_is_slice_invariant(make_ohlcv):
+    strategy = LightGBMStrategy()
+    df = make_ohlcv(400, seed=1)
+    window = strategy.inference_window
+
+    features_df = strategy.build_features(df)
+    sliced = strategy.build_features(df.iloc[150:])
+
+    assert features_df.iloc[:window - 1].isna().all().all()
+    pd.testing.assert_frame_equal(sliced.iloc[window - 1:], features_df.iloc[150 + window - 1:])
+
+
+def test_random_signals_follow_probabilities():
+    strategy = RandomStrategy()
+    strategy.train(pd.DataFrame(), {"buy_prob": 0.2, "sell_prob": 0.5})
+    draws = np.array([0.1, 0.2, 0.3, 0.69, 0.7, 0.95])
+
+    signals = strategy.signals_batch(pd.DataFrame(index=range(len(draws))), draws)
+
+    assert signals.tolist() == [1, -1, -1, -1, 0, 0]
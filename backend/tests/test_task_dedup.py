@@ -0,0 +1,49 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services import task_dedup_service
+from app.services.task_dedup_service import submit_deduplicated, task_fingerprint
+
+
+class _RecordingTask:
+    name = "app.tasks.explain_model_task.explain_model_task"
+
+    def __init__(self):
+        self.submitted = []
+
+    def apply_async(self, kwargs, task_id=None):
+        self.submitted.append(task_id)
+        return SimpleNamespace(id=task_id)
+
+
+def test_identical_requests_share_one_task(monkeypatch, memory_redis):
+    states = {}
+    monkeypatch.setattr(task_dedup_service, "AsyncResult", lambda task_id, app=None: SimpleNamespace(state=states.get(task_id, "PENDING")))
+    client, task = memory_redis, _RecordingTask()
+    kwargs = {"coin_symbol": "KRW-BTC", "timeframe": 60, "inference_time": datetime(2025, 1, 1)}
+
+    first = submit_deduplicated(task, client=client, **kwargs)
+    states[first] = "SUCCESS"
+    assert submit_deduplicated(task, client=client, **kwargs) == first
+    other = submit_deduplicated(task, client=client, **{**kwargs, "timeframe": 240})
+    assert other != first
+
+    # 실패한 작업은 재사용하지 않고 새로 제출
+    states[first] = "FAILURE"
+    retried = submit_deduplicated(task, client=client, **kwargs)
+    assert retried not in (first, other)
+    assert task.submitted == [first, other, retried]
+
+
+def test_fingerprint_ignores_argument_order():
+    assert task_fingerprint("t", {"a": 1, "b": "x"}) == task_fingerprint("t", {"b": "x", "a": 1})
+    assert task_fingerprint("t", {"a": 1}) != task_fingerprint("u", {"a": 1})
+
+
+def test_ttl_can_be_overridden_for_long_tasks(monkeypatch, memory_redis):
+    monkeypatch.setattr(task_dedup_service, "AsyncResult", lambda task_id, app=None: SimpleNamespace(state="STARTED"))
+    client, task = memory_redis, _RecordingTask()
+
+    first = submit_deduplicated(task, client=client, ttl_seconds=3600, model_name="LightGBM")
+    assert submit_deduplicated(task, client=client, ttl_seconds=3600, model_name="LightGBM") == first
+    assert list(client.ttls.values()) == [3600]
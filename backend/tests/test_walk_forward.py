@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.train_schema import WalkForwardRequest
+from app.strategies.LightGBM_strategy import LightGBMStrategy
+from app.tasks.walk_forward_task import _run_fold, make_walk_forward_folds, summarize_folds
+from app.utils.backtest_utils import run_vectorized_backtest
+
+
+def test_folds_step_forward_without_overlapping_tests():
+    start, end = pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01")
+
+    folds = make_walk_forward_folds(start, end, train_days=30, test_days=7)
+    assert folds[0] == (start, start + pd.Timedelta(days=30), start + pd.Timedelta(days=37))
+    assert all(fold[2] <= end for fold in folds)
+    # 기본 step은 test_days라 테스트 구간이 이어 붙는다
+    assert all(prev[2] == cur[1] for prev, cur in zip(folds, folds[1:]))
+    assert len(make_walk_forward_folds(start, end, 30, 7, step_days=14)) < len(folds)
+
+    with pytest.raises(ValueError):
+        make_walk_forward_folds(start, end, 30, 7, step_days=3)
+    with pytest.raises(ValidationError):
+        WalkForwardRequest(
+            model_name="LightGBM", coin_symbol="BTC", timeframe=60, start=start, end=end,
+            train_days=30, test_days=7, step_days=3,
+        )
+
+
+def test_summarize_folds():
+    folds = [
+        {"total_return": 0.1, "trade_count": 4, "win_rate": 0.5},
+        {"total_return": -0.05, "trade_count": 0, "win_rate": 0.0},
+        {"total_return": 0.02, "trade_count": 2, "win_rate": 1.0},
+    ]
+
+    summary = summarize_folds(folds)
+
+    assert summary["fold_count"] == 3
+    assert summary["compounded_return"] == pytest.approx(0.07)
+    assert summary["mean_return"] == pytest.approx(0.07 / 3)
+    assert summary["positive_fold_ratio"] == pytest.approx(2 / 3)
+    # 거래가 없는 fold는 승률 평균에서 뺀다
+    assert summary["mean_win_rate"] == pytest.approx(0.75)
+    assert summary["trade_count"] == 6
+
+
+@pytest.mark.parametrize("offset_days", [0, 5])
+def test_fold_evaluates_the_production_train_and_action_path(offset_days, tmp_path, monkeypatch, make_ohlcv):
+    monkeypatch.setenv("LGB_DATASET_CACHE_DIR", str(tmp_path))
+    df = make_ohlcv(1000, seed=5)
+    hyperparams = {"num_boost_round": 10, "buy_threshold": 0.05, "sell_threshold": -0.05}
+    start = df.index[0] + pd.Timedelta(days=offset_days)
+    fold = (start, start + pd.Timedelta(days=30), start + pd.Timedelta(days=35))
+    features_df = LightGBMStrategy().build_features(df)
+
+    result = _run_fold(fold, {"model_name": "LightGBM", "hyperparams": hyperparams, "data": df, "features": features_df, "n_jobs": 1})
+
+    # fold 첫 학습 행도 온전한 창을 보므로 train()에는 창 길이만큼 앞선 봉부터 넘긴다
+    strategy = LightGBMStrategy()
+    window = strategy.inference_window
+    first = max(df.index.get_loc(start) - window + 1, 0)
+    strategy.train(df.iloc[first:df.index.get_loc(fold[1])], hyperparams, n_jobs=1)
+    test_positions = np.flatnonzero((df.index >= fold[1]) & (df.index < fold[2]))
+    signals = np.array([
+        strategy.action(df.iloc[p + 1 - window:p + 1], cash_balance=1_000_000.0, coin_balance=1.0)[0]
+        for p in test_positions
+    ])
+    test_df = df.iloc[test_positions]
+    expected = run_vectorized_backtest(test_df["open"].to_numpy(), test_df["close"].to_numpy(), signals)
+    assert {key: result[key] for key in expected} == pytest.approx(expected)
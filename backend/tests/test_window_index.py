@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.utils.dtw_search_utils import normalize_query, normalize_windows, top_k_dtw
+from app.utils.window_index_utils import load_multi_window_index, load_window_index, read_index_meta, update_window_index
+
+
+def _make_close_df(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="60min")
+    return pd.DataFrame({"close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=index)
+
+
+def test_incremental_append_matches_full_build(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    df = _make_close_df(500)
+
+    update_window_index("BTC", 60, 24, df.iloc[:400])
+    generation = read_index_meta("BTC", 60, 24)["generation"]
+    # 꼬리 구간만 넘겨도 이어 붙일 수 있어야 한다
+    index = update_window_index("BTC", 60, 24, df.iloc[377:])
+
+    assert read_index_meta("BTC", 60, 24)["generation"] == generation
+    np.testing.assert_array_equal(index.windows, normalize_windows(df["close"].to_numpy(), 24))
+    np.testing.assert_array_equal(index.end_timestamps, df.index[23:].as_unit("ns").asi8)
+    assert index.embeddings.shape == (len(index), 8)
+
+
+def test_tail_that_does_not_line_up_requires_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    df = _make_close_df(300)
+    update_window_index("BTC", 60, 24, df)
+
+    changed = df.copy()
+    changed.iloc[-5, 0] *= 1.01
+    assert update_window_index("BTC", 60, 24, changed.iloc[250:]) is None
+
+    index = update_window_index("BTC", 60, 24, changed)
+    assert read_index_meta("BTC", 60, 24)["generation"] == 1
+    np.testing.assert_array_equal(index.windows, normalize_windows(changed["close"].to_numpy(), 24))
+    assert sorted(name for name in os.listdir(tmp_path / "BTC_60m_w24") if name.endswith(".f8")) == ["windows-1.f8"]
+
+
+def test_positions_between_excludes_overlapping_windows(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    df = _make_close_df(200)
+    update_window_index("BTC", 60, 24, df)
+    index = load_window_index("BTC", 60, 24)
+
+    positions = index.positions_between(df.index[10], df.index[150], exclude=(df.index[100], df.index[109]))
+    starts, ends = index.start_timestamps[positions], index.end_timestamps[positions]
+    assert starts.min() >= df.index[10].value and ends.max() <= df.index[150].value
+    assert not np.any((starts <= df.index[109].value) & (ends >= df.index[100].value))
+    assert positions[0] == 10 and positions[-1] == 127
+
+
+def test_multi_symbol_top_k_matches_merged_per_symbol_search(tmp_path, monkeypatch):
+    monkeypatch.setenv("WINDOW_INDEX_DIR", str(tmp_path))
+    for seed, coin_symbol in enumerate(["BTC", "ETH", "XRP"]):
+        update_window_index(coin_symbol, 60, 24, _make_close_df(800, seed=seed))
+    multi_index = load_multi_window_index(["BTC", "ETH", "XRP", "DOGE"], 60, 24)
+    assert multi_index.symbols == ["BTC", "ETH", "XRP"]
+    query = normalize_query(_make_close_df(24, seed=9)["close"].to_numpy())
+    df = _make_close_df(800)
+    start, end = df.index[100], df.index[700]
+    exclude = {"btc": (df.index[300], df.index[330])}
+
+    results = multi_index.top_k(query, 6, 12, symbols=["BTC", "XRP"], start=start, end=end, exclude=exclude)
+
+    expected = []
+    for coin_symbol in ["BTC", "XRP"]:
+        index = load_window_index(coin_symbol, 60, 24)
+        positions = index.positions_between(start, end, exclude.get(coin_symbol.lower()))
+        found, distances = top_k_dtw(query, index.windows, 6, 12, candidates=positions)
+        expected += [(coin_symbol, int(i), float(d)) for i, d in zip(found, distances)]
+    expected = sorted(expected, key=lambda result: result[2])[:6]
+    assert [(s, i) for s, i, _ in results] == [(s, i) for s, i, _ in expected]
+    np.testing.assert_allclose([d for *_, d in results], [d for *_, d in expected])